@@ -22,12 +22,39 @@ class Settings(BaseSettings):
     llm_api_key: str = Field(default="", alias="LLM_API_KEY")
     llm_api_base_url: str = Field(default="https://api.openai.com/v1", alias="LLM_API_BASE_URL")
     llm_default_model: str = Field(default="gpt-oss-120b", alias="LLM_DEFAULT_MODEL")
+    llm_request_timeout: float = Field(default=60.0, alias="LLM_REQUEST_TIMEOUT")
+    llm_max_retries: int = Field(default=2, alias="LLM_MAX_RETRIES")
+    llm_retry_backoff_seconds: float = Field(default=0.5, alias="LLM_RETRY_BACKOFF_SECONDS")
+    llm_max_connections: int = Field(default=16, alias="LLM_MAX_CONNECTIONS")
+    llm_cache_db_path: str = Field(default="assets/llm_cache/llm_cache.db", alias="LLM_CACHE_DB_PATH")
+    llm_cache_ttl_hours: float = Field(default=168.0, alias="LLM_CACHE_TTL_HOURS")
+    llm_cache_max_mb: int = Field(default=64, alias="LLM_CACHE_MAX_MB")
+    llm_bundle_batch_size: int = Field(default=4, alias="LLM_BUNDLE_BATCH_SIZE")
+    llm_planning_concurrency: int = Field(default=3, alias="LLM_PLANNING_CONCURRENCY")
+    llm_streaming_enabled: bool = Field(default=True, alias="LLM_STREAMING_ENABLED")
+    smart_segment_window_chars: int = Field(default=3000, alias="SMART_SEGMENT_WINDOW_CHARS")
+    smart_segment_overlap_sentences: int = Field(default=3, alias="SMART_SEGMENT_OVERLAP_SENTENCES")
+    smart_segment_concurrency: int = Field(default=4, alias="SMART_SEGMENT_CONCURRENCY")
 
     image_api_key: str = Field(default="", alias="IMAGE_API_KEY")
     image_api_url: str = Field(default="https://api.poe.com/v1", alias="IMAGE_API_URL")
     image_model: str = Field(default="nano-banana", alias="IMAGE_MODEL")
+    image_reference_max_side: int = Field(default=1024, alias="IMAGE_REFERENCE_MAX_SIDE")
+    image_providers_json: str = Field(default="", alias="IMAGE_PROVIDERS_JSON")
+    image_request_timeout: float = Field(default=60.0, alias="IMAGE_REQUEST_TIMEOUT")
+    image_hedging_enabled: bool = Field(default=True, alias="IMAGE_HEDGING_ENABLED")
+    image_hedge_default_seconds: float = Field(default=20.0, alias="IMAGE_HEDGE_DEFAULT_SECONDS")
+    image_early_download: bool = Field(default=True, alias="IMAGE_EARLY_DOWNLOAD")
+    image_speculative_lookahead: int = Field(default=2, alias="IMAGE_SPECULATIVE_LOOKAHEAD")
+    image_speculative_waste_budget: int = Field(default=4, alias="IMAGE_SPECULATIVE_WASTE_BUDGET")
 
     tts_api_url: str = Field(default="", alias="TTS_API_URL")
+    tts_max_concurrency: int = Field(default=4, alias="TTS_MAX_CONCURRENCY")
+    tts_piece_pause_ms: int = Field(default=0, alias="TTS_PIECE_PAUSE_MS")
+    tts_prefetch_concurrency: int = Field(default=2, alias="TTS_PREFETCH_CONCURRENCY")
+    tts_prefetch_lookahead: int = Field(default=8, alias="TTS_PREFETCH_LOOKAHEAD")
+    tts_chapter_mode: bool = Field(default=False, alias="TTS_CHAPTER_MODE")
+    tts_chapter_max_chars: int = Field(default=1000, alias="TTS_CHAPTER_MAX_CHARS")
     subtitle_font_path: str = Field(default="", alias="SUBTITLE_FONT_PATH")
 
     output_dir: str = Field(default="outputs", alias="OUTPUT_DIR")
@@ -37,8 +64,17 @@ class Settings(BaseSettings):
     scene_cache_dir: str = Field(default="assets/scene_cache/images", alias="SCENE_CACHE_DIR")
     scene_cache_index_path: str = Field(default="assets/scene_cache/index.json", alias="SCENE_CACHE_INDEX_PATH")
     scene_cache_db_path: str = Field(default="assets/scene_cache/scene_cache.db", alias="SCENE_CACHE_DB_PATH")
+    scene_cache_dhash_threshold: int = Field(default=6, alias="SCENE_CACHE_DHASH_THRESHOLD")
+    image_variant_dir: str = Field(default="assets/scene_cache/variants", alias="IMAGE_VARIANT_DIR")
+    image_variant_max_mb: int = Field(default=1024, alias="IMAGE_VARIANT_MAX_MB")
+    tts_cache_dir: str = Field(default="assets/tts_cache/audio", alias="TTS_CACHE_DIR")
+    tts_cache_db_path: str = Field(default="assets/tts_cache/tts_cache.db", alias="TTS_CACHE_DB_PATH")
+    tts_cache_max_mb: int = Field(default=2048, alias="TTS_CACHE_MAX_MB")
     jobs_db_path: str = Field(default="assets/jobs/jobs.db", alias="JOBS_DB_PATH")
     job_clip_preview_limit: int = Field(default=200, alias="JOB_CLIP_PREVIEW_LIMIT")
+    final_encode_chunks: int = Field(default=0, alias="FINAL_ENCODE_CHUNKS")
+    circuit_breaker_failure_threshold: int = Field(default=5, alias="CIRCUIT_BREAKER_FAILURE_THRESHOLD")
+    circuit_breaker_reset_seconds: float = Field(default=60.0, alias="CIRCUIT_BREAKER_RESET_SECONDS")
     log_dir: str = Field(default="logs", alias="LOG_DIR")
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
     cors_allow_origins: str = Field(default="*", alias="CORS_ALLOW_ORIGINS")
@@ -53,7 +53,13 @@ from .services.llm_service import (
     analyze_characters,
     generate_novel_aliases,
 )
+from .services.circuit_breaker_service import circuit_breaker_stats
+from .services.http_client_service import close_http_clients, http_client_stats
+from .services.image_service import image_provider_stats
+from .services.llm_cache_service import llm_cache_stats
+from .services.llm_client_service import llm_client_stats
 from .services.segmentation_service import build_segment_plan
+from .services.tts_cache_service import tts_cache_stats
 from .services.segmentation_service import count_sentences
 from .services.model_service import get_models
 from .services.video_service import _render_final_sync, cancel_job, create_job, resume_interrupted_jobs, resume_job
@@ -392,6 +398,11 @@ async def _recover_jobs_on_startup() -> None:
         logger.info("Recovered interrupted jobs: %s", ", ".join(resumed))
 
 
+@app.on_event("shutdown")
+async def _close_http_clients_on_shutdown() -> None:
+    await close_http_clients()
+
+
 @app.exception_handler(Exception)
 async def unhandled_exception_handler(request: Request, exc: Exception):
     logger.exception("Unhandled error on %s %s", request.method, request.url.path)
@@ -403,6 +414,18 @@ async def health() -> dict:
     return {"status": "ok", "env": settings.app_env}
 
 
+@app.get("/api/metrics")
+async def metrics() -> dict:
+    return {
+        "tts_cache": await run_in_threadpool(tts_cache_stats),
+        "http_clients": http_client_stats(),
+        "image_providers": image_provider_stats(),
+        "circuit_breakers": circuit_breaker_stats(),
+        "llm": llm_client_stats(),
+        "llm_cache": await run_in_threadpool(llm_cache_stats),
+    }
+
+
 @app.get("/api/workspace-auth/status", response_model=WorkspaceAuthStatusResponse)
 async def workspace_auth_status() -> WorkspaceAuthStatusResponse:
     return WorkspaceAuthStatusResponse(required=_workspace_password_required())
@@ -158,6 +158,7 @@ class JobStatus(BaseModel):
     clip_preview_urls: list[str] = Field(default_factory=list)
     clip_image_sources: list[str] = Field(default_factory=list)
     image_source_report: dict[str, object] | None = None
+    estimated_duration_seconds: float | None = None
     created_at: str | None = None
     updated_at: str | None = None
 
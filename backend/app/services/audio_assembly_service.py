@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import re
+import wave
+from pathlib import Path
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# edge-tts produces 24kHz mono MP3, so assembling at that rate avoids resampling the common case.
+PCM_SAMPLE_RATE = 24000
+
+
+def tts_timing_path(audio_path: Path) -> Path:
+    return audio_path.with_suffix(".timing.json")
+
+
+def write_tts_timing(audio_path: Path, pieces: list[dict], words: list[dict] | None = None) -> None:
+    target = tts_timing_path(audio_path)
+    try:
+        target.write_text(json.dumps({"pieces": pieces, "words": words or []}, ensure_ascii=False), encoding="utf-8")
+    except Exception:
+        logger.exception("Failed to write TTS timing sidecar: %s", target)
+
+
+def load_tts_timing(audio_path: Path) -> dict | None:
+    target = tts_timing_path(audio_path)
+    if not target.exists():
+        return None
+    try:
+        payload = json.loads(target.read_text(encoding="utf-8"))
+    except Exception:
+        logger.warning("Failed to read TTS timing sidecar: %s", target)
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def spoken_char_count(text: str) -> int:
+    # Quotes and punctuation are not voiced, so only word characters count toward timing.
+    return len(re.sub(r"[\W_]+", "", str(text or "")))
+
+
+def word_char_spans(words: list[dict] | None) -> list[tuple[float, float]]:
+    spans: list[tuple[float, float]] = []
+    for item in words or []:
+        if not isinstance(item, dict):
+            continue
+        spoken = spoken_char_count(item.get("text"))
+        if spoken <= 0:
+            continue
+        start = float(item.get("start") or 0.0)
+        end = max(start, float(item.get("end") or start))
+        step = (end - start) / spoken
+        spans.extend((start + step * offset, start + step * (offset + 1)) for offset in range(spoken))
+    return spans
+
+
+def _write_wav_pcm(output_path: Path, samples: np.ndarray, sample_rate: int) -> None:
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with wave.open(str(output_path), "wb") as handle:
+        handle.setnchannels(1)
+        handle.setsampwidth(2)
+        handle.setframerate(sample_rate)
+        handle.writeframes(samples.astype("<i2", copy=False).tobytes())
+
+
+def _read_wav_pcm(path: Path, sample_rate: int) -> np.ndarray:
+    with wave.open(str(path), "rb") as handle:
+        channels = handle.getnchannels()
+        width = handle.getsampwidth()
+        rate = handle.getframerate()
+        raw = handle.readframes(handle.getnframes())
+    if width != 2:
+        raise ValueError(f"unsupported wav sample width: {width}")
+    samples = np.frombuffer(raw, dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    if rate != sample_rate and samples.size:
+        target_count = int(round(samples.size * sample_rate / float(rate)))
+        positions = np.linspace(0, samples.size - 1, num=max(1, target_count))
+        samples = np.interp(positions, np.arange(samples.size), samples).astype(np.int16)
+    return samples
+
+
+async def decode_audio_pcm(ffmpeg_bin: str, path: Path, sample_rate: int = PCM_SAMPLE_RATE) -> np.ndarray:
+    if path.suffix.lower() == ".wav":
+        try:
+            return _read_wav_pcm(path, sample_rate)
+        except Exception:
+            logger.debug("In-process wav decode failed, fallback to ffmpeg: %s", path)
+
+    proc = await asyncio.create_subprocess_exec(
+        ffmpeg_bin,
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-i",
+        str(path),
+        "-f",
+        "s16le",
+        "-acodec",
+        "pcm_s16le",
+        "-ac",
+        "1",
+        "-ar",
+        str(sample_rate),
+        "pipe:1",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg decode failed for {path}: {(stderr or b'').decode('utf-8', 'ignore')[:300]}")
+    return np.frombuffer(stdout, dtype=np.int16)
+
+
+def assemble_pcm_pieces(
+    pieces: list[tuple[str, str, np.ndarray, list[dict]]],
+    output_path: Path,
+    pause_ms: int = 0,
+    sample_rate: int = PCM_SAMPLE_RATE,
+) -> tuple[Path, float, list[dict], list[dict]]:
+    pause = np.zeros(max(0, int(sample_rate * pause_ms / 1000)), dtype=np.int16)
+    chunks: list[np.ndarray] = []
+    offsets: list[dict] = []
+    words: list[dict] = []
+    cursor = 0
+    for index, (piece_text, piece_voice, samples, piece_words) in enumerate(pieces):
+        if index > 0 and pause.size:
+            chunks.append(pause)
+            cursor += pause.size
+        chunks.append(samples)
+        piece_start = cursor / sample_rate
+        for word in piece_words or []:
+            words.append(
+                {
+                    "text": str(word.get("text") or ""),
+                    "start": round(piece_start + float(word.get("start") or 0.0), 4),
+                    "end": round(piece_start + float(word.get("end") or 0.0), 4),
+                }
+            )
+        offsets.append(
+            {
+                "text": piece_text,
+                "voice": piece_voice,
+                "start": round(cursor / sample_rate, 4),
+                "end": round((cursor + samples.size) / sample_rate, 4),
+            }
+        )
+        cursor += samples.size
+
+    _write_wav_pcm(output_path, np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int16), sample_rate)
+    return output_path, cursor / float(sample_rate), offsets, words
+
+
+def split_pcm_by_text(
+    samples: np.ndarray,
+    words: list[dict],
+    texts: list[str],
+    voice: str,
+    output_paths: list[Path],
+    sample_rate: int = PCM_SAMPLE_RATE,
+) -> list[tuple[Path, float]]:
+    spans = word_char_spans(words)
+    text_chars = [max(1, spoken_char_count(text)) for text in texts]
+    total_chars = sum(text_chars)
+    if not spans or total_chars <= 0:
+        raise ValueError("word boundaries are required to split audio by text")
+
+    # Cut in the gap between the last character of one text and the first of the next.
+    cut_points = [0]
+    consumed = 0
+    for chars in text_chars[:-1]:
+        consumed += chars
+        char_index = max(1, min(len(spans) - 1, round(consumed * len(spans) / total_chars)))
+        cut_time = (spans[char_index - 1][1] + spans[char_index][0]) / 2.0
+        cut_points.append(max(cut_points[-1], min(samples.size, int(round(cut_time * sample_rate)))))
+    cut_points.append(int(samples.size))
+
+    results: list[tuple[Path, float]] = []
+    for index, (text, output_path) in enumerate(zip(texts, output_paths)):
+        start_sample, end_sample = cut_points[index], cut_points[index + 1]
+        _write_wav_pcm(output_path, samples[start_sample:end_sample], sample_rate)
+        start_time = start_sample / float(sample_rate)
+        duration = (end_sample - start_sample) / float(sample_rate)
+        segment_words = [
+            {
+                "text": str(item.get("text") or ""),
+                "start": round(max(0.0, float(item.get("start") or 0.0) - start_time), 4),
+                "end": round(min(duration, float(item.get("end") or 0.0) - start_time), 4),
+            }
+            for item in words
+            if start_time <= float(item.get("start") or 0.0) < start_time + duration
+        ]
+        write_tts_timing(
+            output_path,
+            [{"text": text, "voice": voice, "start": 0.0, "end": round(duration, 4)}],
+            words=segment_words,
+        )
+        results.append((output_path, duration))
+    return results
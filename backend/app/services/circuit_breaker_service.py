@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+from ..config import settings
+
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+LLM_CIRCUIT = "llm"
+TTS_REMOTE_CIRCUIT = "tts-remote"
+TTS_EDGE_CIRCUIT = "tts-edge"
+
+
+def image_circuit(provider_name: str) -> str:
+    return f"image:{provider_name}"
+
+
+class CircuitBreaker:
+    # Shared by every job thread, so all state changes go through one lock.
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float) -> None:
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_seconds = max(1.0, float(reset_seconds))
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = 0.0
+        self._stats = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self._state == STATE_CLOSED:
+                return True
+            if self._state == STATE_OPEN and now - self._opened_at >= self.reset_seconds:
+                self._state = STATE_HALF_OPEN
+                self._probe_started_at = 0.0
+                logger.info("Circuit %s half-open, probing provider", self.name)
+            if self._state == STATE_HALF_OPEN:
+                # One probe at a time; a probe that never reports back frees the slot after reset_seconds.
+                if not self._probe_started_at or now - self._probe_started_at >= self.reset_seconds:
+                    self._probe_started_at = now
+                    return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._stats["successes"] += 1
+            self._consecutive_failures = 0
+            if self._state != STATE_CLOSED:
+                logger.info("Circuit %s closed", self.name)
+            self._state = STATE_CLOSED
+            self._probe_started_at = 0.0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._stats["failures"] += 1
+            self._consecutive_failures += 1
+            if self._state == STATE_HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != STATE_OPEN:
+                    self._stats["opened"] += 1
+                    logger.warning(
+                        "Circuit %s opened after %s consecutive failures, skipping for %.0fs",
+                        self.name,
+                        self._consecutive_failures,
+                        self.reset_seconds,
+                    )
+                self._state = STATE_OPEN
+                self._opened_at = time.monotonic()
+                self._probe_started_at = 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                **self._stats,
+            }
+
+
+_BREAKERS: dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                failure_threshold=settings.circuit_breaker_failure_threshold,
+                reset_seconds=settings.circuit_breaker_reset_seconds,
+            )
+            _BREAKERS[name] = breaker
+        return breaker
+
+
+def circuit_breaker_stats() -> dict:
+    with _BREAKERS_LOCK:
+        breakers = list(_BREAKERS.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import json
+import logging
+import shutil
+import subprocess
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+_SIDECAR_SCHEMA_VERSION = 1
+_STREAM_FIELDS = (
+    "index",
+    "codec_type",
+    "codec_name",
+    "profile",
+    "width",
+    "height",
+    "pix_fmt",
+    "r_frame_rate",
+    "time_base",
+    "sample_rate",
+    "channels",
+    "channel_layout",
+)
+
+
+def clip_metadata_path(clip_path: Path) -> Path:
+    return clip_path.with_suffix(".meta.json")
+
+
+def _probe_streams(clip_path: Path) -> dict | None:
+    ffprobe_bin = shutil.which("ffprobe")
+    if not ffprobe_bin:
+        return None
+
+    cmd = [
+        ffprobe_bin,
+        "-v",
+        "error",
+        "-show_entries",
+        f"format=duration:stream={','.join(_STREAM_FIELDS)}",
+        "-of",
+        "json",
+        str(clip_path),
+    ]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+    except Exception:
+        logger.exception("ffprobe failed to start for clip: %s", clip_path)
+        return None
+    if proc.returncode != 0:
+        logger.warning("ffprobe failed for clip %s: %s", clip_path, (proc.stderr or "")[:300])
+        return None
+
+    try:
+        parsed = json.loads(proc.stdout or "{}")
+    except Exception:
+        logger.exception("Failed to parse ffprobe output for clip: %s", clip_path)
+        return None
+
+    streams: list[dict] = []
+    for raw in parsed.get("streams") or []:
+        if not isinstance(raw, dict):
+            continue
+        streams.append({key: raw[key] for key in _STREAM_FIELDS if key in raw})
+
+    duration = 0.0
+    try:
+        duration = max(0.0, float((parsed.get("format") or {}).get("duration") or 0.0))
+    except Exception:
+        duration = 0.0
+    return {"duration": duration, "streams": streams}
+
+
+def record_clip_metadata(clip_path: Path) -> dict | None:
+    try:
+        stat = clip_path.stat()
+    except Exception:
+        return None
+
+    probed = _probe_streams(clip_path)
+    if probed is None:
+        return None
+
+    metadata = {
+        "schema_version": _SIDECAR_SCHEMA_VERSION,
+        "size": int(stat.st_size),
+        "mtime_ns": int(stat.st_mtime_ns),
+        **probed,
+    }
+    sidecar = clip_metadata_path(clip_path)
+    temp_sidecar = sidecar.with_name(f"{sidecar.name}.tmp")
+    try:
+        temp_sidecar.write_text(json.dumps(metadata, ensure_ascii=False), encoding="utf-8")
+        temp_sidecar.replace(sidecar)
+    except Exception:
+        logger.exception("Failed to write clip metadata sidecar: %s", sidecar)
+    return metadata
+
+
+def load_clip_metadata(clip_path: Path) -> dict | None:
+    try:
+        stat = clip_path.stat()
+    except Exception:
+        return None
+
+    sidecar = clip_metadata_path(clip_path)
+    if sidecar.exists():
+        try:
+            cached = json.loads(sidecar.read_text(encoding="utf-8"))
+        except Exception:
+            cached = None
+        if (
+            isinstance(cached, dict)
+            and int(cached.get("schema_version") or 0) == _SIDECAR_SCHEMA_VERSION
+            and int(cached.get("size") or -1) == int(stat.st_size)
+            and int(cached.get("mtime_ns") or -1) == int(stat.st_mtime_ns)
+        ):
+            return cached
+
+    return record_clip_metadata(clip_path)
+
+
+def clip_has_audio_stream(clip_path: Path) -> bool:
+    metadata = load_clip_metadata(clip_path)
+    if metadata is None:
+        # Without ffprobe there is nothing to validate against; keep the clip.
+        return shutil.which("ffprobe") is None
+    return any(str(stream.get("codec_type") or "") == "audio" for stream in metadata.get("streams") or [])
+
+
+def clip_video_size(clip_path: Path) -> tuple[int, int] | None:
+    metadata = load_clip_metadata(clip_path)
+    if metadata is None:
+        return None
+    for stream in metadata.get("streams") or []:
+        if str(stream.get("codec_type") or "") != "video":
+            continue
+        width = int(stream.get("width") or 0)
+        height = int(stream.get("height") or 0)
+        if width > 0 and height > 0:
+            return width, height
+    return None
+
+
+def clip_duration(clip_path: Path) -> float:
+    metadata = load_clip_metadata(clip_path)
+    if metadata is None:
+        return 0.0
+    return max(0.0, float(metadata.get("duration") or 0.0))
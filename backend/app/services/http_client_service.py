@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import threading
+import weakref
+
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+_CLIENTS_LOCK = threading.Lock()
+_STATS_LOCK = threading.Lock()
+_STATS: dict[str, dict[str, int]] = {}
+
+
+def _bump_stat(name: str, key: str, amount: int = 1) -> None:
+    with _STATS_LOCK:
+        bucket = _STATS.setdefault(name, {"clients_created": 0, "requests": 0, "connections_opened": 0, "bytes_streamed": 0})
+        bucket[key] = int(bucket.get(key, 0)) + amount
+
+
+def get_http_client(name: str, timeout: float, max_connections: int = 16) -> httpx.AsyncClient:
+    # httpx clients are bound to the event loop that opened their connections, and every job runs
+    # on its own loop, so clients are pooled per (loop, name).
+    loop = asyncio.get_running_loop()
+    with _CLIENTS_LOCK:
+        per_loop = _CLIENTS.setdefault(loop, {})
+        client = per_loop.get(name)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=timeout,
+                http2=_HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            )
+            per_loop[name] = client
+            _bump_stat(name, "clients_created")
+    return client
+
+
+def http_request_extensions(name: str) -> dict:
+    _bump_stat(name, "requests")
+
+    async def trace(event_name: str, info: dict) -> None:
+        if event_name.endswith("connect_tcp.complete"):
+            _bump_stat(name, "connections_opened")
+
+    return {"trace": trace}
+
+
+def record_bytes_streamed(name: str, amount: int) -> None:
+    if amount > 0:
+        _bump_stat(name, "bytes_streamed", amount)
+
+
+async def close_http_clients() -> None:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    with _CLIENTS_LOCK:
+        clients = list((_CLIENTS.pop(loop, None) or {}).values())
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception:
+            logger.debug("Failed to close pooled http client", exc_info=True)
+
+
+def http_client_stats() -> dict:
+    with _STATS_LOCK:
+        snapshot = {name: dict(values) for name, values in _STATS.items()}
+    for values in snapshot.values():
+        requests = int(values.get("requests") or 0)
+        reused = max(0, requests - int(values.get("connections_opened") or 0))
+        values["connection_reuse_rate"] = round(reused / requests, 4) if requests else 0.0
+    return {"http2_available": _HTTP2_AVAILABLE, "clients": snapshot}
@@ -2,8 +2,13 @@
 
 import asyncio
 import base64
+import json
 import logging
 import re
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
 
@@ -11,32 +16,147 @@ import httpx
 from PIL import Image
 
 from ..config import settings
+from .circuit_breaker_service import get_circuit_breaker, image_circuit
+from .http_client_service import get_http_client, http_request_extensions, record_bytes_streamed
 from .prompt_templates import DEFAULT_IMAGE_PROMPT, build_image_retry_prompt
 
 
 logger = logging.getLogger(__name__)
 
+_IMAGE_CLIENT_NAME = "image"
+_URL_PATTERN = re.compile(r"https?://[^\s\]\)]+")
+_REFERENCE_CACHE_LIMIT = 64
+_REFERENCE_JPEG_QUALITY = 85
+_REFERENCE_CACHE: "OrderedDict[tuple[str, int, int, int], str]" = OrderedDict()
+_REFERENCE_CACHE_LOCK = threading.Lock()
+_LATENCY_WINDOW = 50
+_MIN_LATENCY_SAMPLES = 5
+_PROVIDER_STATS: dict[str, dict] = {}
+_PROVIDER_STATS_LOCK = threading.Lock()
+
 
 class ImageGenerationError(RuntimeError):
     pass
 
 
-def _extract_first_url(text: str) -> str | None:
-    match = re.search(r"https?://[^\s\]\)]+", text)
-    if match:
-        return match.group(0)
-    return None
+def _encode_reference_image(ref: Path, max_side: int) -> str:
+    if max_side <= 0:
+        mime = "image/png" if ref.suffix.lower() == ".png" else "image/jpeg"
+        return f"data:{mime};base64,{base64.b64encode(ref.read_bytes()).decode('utf-8')}"
 
+    with Image.open(ref) as raw:
+        img = raw.convert("RGBA") if raw.mode in {"RGBA", "LA", "P"} else raw.convert("RGB")
+    if img.mode == "RGBA":
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[3])
+        img = background
+    if max(img.size) > max_side:
+        img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    img.save(buffer, format="JPEG", quality=_REFERENCE_JPEG_QUALITY, optimize=True)
+    return f"data:image/jpeg;base64,{base64.b64encode(buffer.getvalue()).decode('utf-8')}"
 
-def _build_messages(
-    prompt: str,
+
+def _reference_data_url(ref: Path) -> str | None:
+    max_side = max(0, int(settings.image_reference_max_side))
+    try:
+        stat = ref.stat()
+    except Exception:
+        return None
+    key = (str(ref.resolve()), int(stat.st_mtime_ns), int(stat.st_size), max_side)
+    with _REFERENCE_CACHE_LOCK:
+        cached = _REFERENCE_CACHE.get(key)
+        if cached is not None:
+            _REFERENCE_CACHE.move_to_end(key)
+            return cached
+
+    try:
+        data_url = _encode_reference_image(ref, max_side)
+    except Exception:
+        logger.warning("Failed to encode reference image: %s", ref, exc_info=True)
+        return None
+    logger.info("Encoded reference image %s: %s bytes on disk -> %s chars payload", ref.name, stat.st_size, len(data_url))
+    with _REFERENCE_CACHE_LOCK:
+        _REFERENCE_CACHE[key] = data_url
+        _REFERENCE_CACHE.move_to_end(key)
+        while len(_REFERENCE_CACHE) > _REFERENCE_CACHE_LIMIT:
+            _REFERENCE_CACHE.popitem(last=False)
+    return data_url
+
+
+def _last_stable_url(text: str) -> str | None:
+    # A URL is only complete once a terminator follows it; the tail may still be streaming in.
+    stable: str | None = None
+    for match in _URL_PATTERN.finditer(text):
+        if match.end() < len(text):
+            stable = match.group(0)
+    return stable
+
+
+def _parse_sse_content(line: str) -> str | None:
+    if not line.startswith("{"):
+        return None
+    try:
+        chunk = json.loads(line)
+    except Exception:
+        return None
+    choices = chunk.get("choices") if isinstance(chunk, dict) else None
+    if not choices or not isinstance(choices[0], dict):
+        return None
+    delta = choices[0].get("delta") or {}
+    content = delta.get("content") if isinstance(delta, dict) else None
+    return content if isinstance(content, str) and content else None
+
+
+def _save_downloaded_image(partial_path: Path, output_path: Path, resolution: tuple[int, int]) -> Path:
+    try:
+        with Image.open(partial_path) as raw:
+            img = raw.convert("RGB")
+        logger.info("Image upstream size=%sx%s, target frame=%sx%s", img.width, img.height, resolution[0], resolution[1])
+        img.save(output_path)
+    finally:
+        partial_path.unlink(missing_ok=True)
+    return output_path
+
+
+async def _download_image(
+    client: httpx.AsyncClient,
+    image_url: str,
+    output_path: Path,
+    resolution: tuple[int, int],
+) -> Path:
+    partial_path = output_path.with_name(f"{output_path.name}.download")
+    written = 0
+    try:
+        async with client.stream("GET", image_url, extensions=http_request_extensions(_IMAGE_CLIENT_NAME)) as response:
+            response.raise_for_status()
+            with partial_path.open("wb") as handle:
+                async for chunk in response.aiter_bytes():
+                    handle.write(chunk)
+                    written += len(chunk)
+        record_bytes_streamed(_IMAGE_CLIENT_NAME, written)
+        if written <= 0:
+            raise ImageGenerationError("image download returned empty body")
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+    return await asyncio.to_thread(_save_downloaded_image, partial_path, output_path, resolution)
+
+
+async def _cancel_task(task: asyncio.Task | None) -> None:
+    if task is None or task.done():
+        return
+    task.cancel()
+    try:
+        await task
+    except BaseException:
+        pass
+
+
+def _reference_data_urls(
     reference_image_path: str | None = None,
     extra_reference_image_paths: list[str] | None = None,
-) -> list[dict]:
-    prompt_text = str(prompt or "").strip()
-    if not prompt_text:
-        prompt_text = DEFAULT_IMAGE_PROMPT
-
+) -> list[str]:
     candidate_paths: list[str] = []
     if reference_image_path:
         candidate_paths.append(str(reference_image_path))
@@ -53,14 +173,22 @@ def _build_messages(
         seen.add(key)
         dedup_paths.append(raw)
 
-    image_parts: list[dict] = []
+    data_urls: list[str] = []
     for raw in dedup_paths[:4]:
         ref = Path(raw)
         if ref.exists() and ref.suffix.lower() in {".png", ".jpg", ".jpeg", ".webp"}:
-            mime = "image/png" if ref.suffix.lower() == ".png" else "image/jpeg"
-            encoded = base64.b64encode(ref.read_bytes()).decode("utf-8")
-            image_parts.append({"type": "image_url", "image_url": {"url": f"data:{mime};base64,{encoded}"}})
+            data_url = _reference_data_url(ref)
+            if data_url:
+                data_urls.append(data_url)
+    return data_urls
+
+
+def _build_messages(prompt: str, reference_data_urls: list[str] | None = None) -> list[dict]:
+    prompt_text = str(prompt or "").strip()
+    if not prompt_text:
+        prompt_text = DEFAULT_IMAGE_PROMPT
 
+    image_parts = [{"type": "image_url", "image_url": {"url": data_url}} for data_url in (reference_data_urls or [])]
     if image_parts:
         return [
             {
@@ -74,6 +202,214 @@ def _build_messages(
     return [{"role": "user", "content": prompt_text}]
 
 
+@dataclass(frozen=True)
+class ImageProvider:
+    name: str
+    api_url: str
+    api_key: str
+    model: str
+
+
+def _configured_providers() -> list[ImageProvider]:
+    providers: list[ImageProvider] = []
+    raw = str(settings.image_providers_json or "").strip()
+    if raw:
+        try:
+            parsed = json.loads(raw)
+        except Exception:
+            logger.warning("IMAGE_PROVIDERS_JSON is not valid JSON, using IMAGE_API_URL only")
+            parsed = []
+        for index, item in enumerate(parsed if isinstance(parsed, list) else []):
+            if not isinstance(item, dict):
+                continue
+            api_url = str(item.get("api_url") or "").strip()
+            api_key = str(item.get("api_key") or settings.image_api_key or "").strip()
+            if not api_url or not api_key:
+                continue
+            providers.append(
+                ImageProvider(
+                    name=str(item.get("name") or f"provider-{index + 1}").strip(),
+                    api_url=api_url,
+                    api_key=api_key,
+                    model=str(item.get("model") or settings.image_model).strip(),
+                )
+            )
+    if not providers and settings.image_api_key:
+        providers.append(ImageProvider("default", settings.image_api_url, settings.image_api_key, settings.image_model))
+    return providers
+
+
+def _provider_bucket(name: str) -> dict:
+    bucket = _PROVIDER_STATS.get(name)
+    if bucket is None:
+        bucket = {
+            "requests": 0,
+            "successes": 0,
+            "failures": 0,
+            "cancelled": 0,
+            "hedges": 0,
+            "wins": 0,
+            "latencies": deque(maxlen=_LATENCY_WINDOW),
+            "outcomes": deque(maxlen=_LATENCY_WINDOW),
+        }
+        _PROVIDER_STATS[name] = bucket
+    return bucket
+
+
+def _record_provider_outcome(name: str, outcome: str, latency: float = 0.0) -> None:
+    with _PROVIDER_STATS_LOCK:
+        bucket = _provider_bucket(name)
+        if outcome == "success":
+            bucket["successes"] += 1
+            bucket["latencies"].append(latency)
+            bucket["outcomes"].append(True)
+        elif outcome == "cancelled":
+            bucket["cancelled"] += 1
+            if latency > 0:
+                # Lost a hedge race: the real latency is at least this long.
+                bucket["latencies"].append(latency)
+        elif outcome == "failure":
+            bucket["failures"] += 1
+            bucket["outcomes"].append(False)
+        else:
+            bucket[outcome] = int(bucket.get(outcome, 0)) + 1
+
+
+def _percentile(values: list[float], fraction: float) -> float | None:
+    if len(values) < _MIN_LATENCY_SAMPLES:
+        return None
+    ordered = sorted(values)
+    return ordered[int(round(fraction * (len(ordered) - 1)))]
+
+
+def _provider_hedge_delay(name: str) -> float:
+    with _PROVIDER_STATS_LOCK:
+        latencies = list(_provider_bucket(name)["latencies"])
+    p90 = _percentile(latencies, 0.9)
+    default_delay = max(1.0, float(settings.image_hedge_default_seconds))
+    return max(1.0, p90) if p90 is not None else default_delay
+
+
+def _rank_providers(providers: list[ImageProvider]) -> list[ImageProvider]:
+    def expected_cost(provider: ImageProvider) -> tuple[float, float]:
+        with _PROVIDER_STATS_LOCK:
+            bucket = _provider_bucket(provider.name)
+            latencies = list(bucket["latencies"])
+            outcomes = list(bucket["outcomes"])
+        if not outcomes and not latencies:
+            # Unmeasured providers go first once so they get latency samples.
+            return 0.0, 0.0
+        success_rate = sum(1 for ok in outcomes if ok) / len(outcomes) if outcomes else 1.0
+        p50 = _percentile(latencies, 0.5)
+        if p50 is None:
+            p50 = sum(latencies) / len(latencies) if latencies else float(settings.image_hedge_default_seconds)
+        return p50 / max(0.05, success_rate), -success_rate
+
+    return sorted(providers, key=expected_cost)
+
+
+def image_provider_stats() -> dict:
+    with _PROVIDER_STATS_LOCK:
+        snapshot = {name: dict(bucket) for name, bucket in _PROVIDER_STATS.items()}
+    result: dict[str, dict] = {}
+    for name, bucket in snapshot.items():
+        latencies = list(bucket.pop("latencies"))
+        outcomes = list(bucket.pop("outcomes"))
+        result[name] = {
+            **bucket,
+            "recent_success_rate": round(sum(1 for ok in outcomes if ok) / len(outcomes), 4) if outcomes else None,
+            "p50_seconds": round(_percentile(latencies, 0.5), 3) if _percentile(latencies, 0.5) is not None else None,
+            "p90_seconds": round(_percentile(latencies, 0.9), 3) if _percentile(latencies, 0.9) is not None else None,
+        }
+    return result
+
+
+async def _generate_with_provider(
+    provider: ImageProvider,
+    req_payload: dict,
+    output_path: Path,
+    resolution: tuple[int, int],
+) -> Path:
+    client = get_http_client(_IMAGE_CLIENT_NAME, timeout=120)
+    headers = {
+        "Authorization": f"Bearer {provider.api_key}",
+        "Content-Type": "application/json",
+    }
+    url = f"{provider.api_url.rstrip('/')}/chat/completions"
+    content_parts: list[str] = []
+    early_url: str | None = None
+    early_task: asyncio.Task | None = None
+    try:
+        async with client.stream(
+            "POST",
+            url,
+            headers=headers,
+            json={**req_payload, "model": provider.model},
+            extensions=http_request_extensions(_IMAGE_CLIENT_NAME),
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                if line.startswith("data:"):
+                    line = line[len("data:") :].strip()
+                if line == "[DONE]":
+                    break
+                content = _parse_sse_content(line)
+                if not content:
+                    continue
+                content_parts.append(content)
+                if not settings.image_early_download or early_task is not None:
+                    continue
+                stable_url = _last_stable_url("".join(content_parts))
+                if stable_url:
+                    logger.info("Image stream URL stable, start early download: %s", stable_url[:500])
+                    early_url = stable_url
+                    early_task = asyncio.create_task(_download_image(client, stable_url, output_path, resolution))
+
+        full_content = "".join(content_parts)
+        urls = _URL_PATTERN.findall(full_content)
+        image_url = urls[-1] if urls else None
+        if not image_url:
+            detail = "no content" if not full_content else "content without image url"
+            raise ImageGenerationError(f"image stream finished but {detail}")
+        logger.info("Image stream URL candidate (%s): %s", provider.name, image_url[:500])
+
+        if early_task is not None and image_url == early_url:
+            return await early_task
+        await _cancel_task(early_task)
+        early_task = None
+        return await _download_image(client, image_url, output_path, resolution)
+    finally:
+        await _cancel_task(early_task)
+
+
+async def _timed_attempt(
+    provider: ImageProvider,
+    req_payload: dict,
+    output_path: Path,
+    resolution: tuple[int, int],
+) -> Path:
+    with _PROVIDER_STATS_LOCK:
+        _provider_bucket(provider.name)["requests"] += 1
+    breaker = get_circuit_breaker(image_circuit(provider.name))
+    started = time.monotonic()
+    try:
+        result = await _generate_with_provider(provider, req_payload, output_path, resolution)
+    except asyncio.CancelledError:
+        _record_provider_outcome(provider.name, "cancelled", time.monotonic() - started)
+        output_path.unlink(missing_ok=True)
+        raise
+    except Exception:
+        _record_provider_outcome(provider.name, "failure")
+        breaker.record_failure()
+        output_path.unlink(missing_ok=True)
+        raise
+    _record_provider_outcome(provider.name, "success", time.monotonic() - started)
+    breaker.record_success()
+    return result
+
+
 async def generate_image(
     prompt: str,
     output_path: Path,
@@ -82,94 +418,116 @@ async def generate_image(
     extra_reference_image_paths: list[str] | None = None,
     aspect_ratio: str | None = None,
 ) -> Path:
-    if not settings.image_api_key:
+    providers = _configured_providers()
+    if not providers:
         raise ImageGenerationError("image_api_key is not configured")
 
-    headers = {
-        "Authorization": f"Bearer {settings.image_api_key}",
-        "Content-Type": "application/json",
-    }
-    payload = {
-        "model": settings.image_model,
-        "messages": _build_messages(
-            prompt,
-            reference_image_path=reference_image_path,
-            extra_reference_image_paths=extra_reference_image_paths,
-        ),
-        "stream": True,
-    }
-    if aspect_ratio:
-        payload["extra_body"] = {"aspect_ratio": aspect_ratio}
-    url = f"{settings.image_api_url.rstrip('/')}/chat/completions"
+    # Decoding/resizing references is CPU work; do it once per call, off the loop, and share it across attempts.
+    reference_data_urls = await asyncio.to_thread(
+        _reference_data_urls,
+        reference_image_path,
+        extra_reference_image_paths,
+    )
+
+    def build_payload(prompt_text: str) -> dict:
+        payload = {
+            "messages": _build_messages(prompt_text, reference_data_urls),
+            "stream": True,
+        }
+        if aspect_ratio:
+            payload["extra_body"] = {"aspect_ratio": aspect_ratio}
+        return payload
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
+    ranked = _rank_providers(providers)
+    # Some proxy/image backends may return HTTP 200 but no image URL for pure CJK prompts,
+    # so a provider whose first attempt fails is retried with the prompt wrapped in English.
+    retry_prompt = build_image_retry_prompt(prompt)
+    queue: list[tuple[ImageProvider, str, bool]] = [(provider, prompt, False) for provider in ranked]
+    attempt_paths: list[Path] = []
+
+    deadline = time.monotonic() + max(5.0, float(settings.image_request_timeout))
+    max_in_flight = 2 if settings.image_hedging_enabled else 1
+    pending: dict[asyncio.Task, tuple[ImageProvider, bool]] = {}
+    last_error: Exception | None = None
+
+    def busy_providers() -> set[str]:
+        return {provider.name for provider, _ in pending.values()}
 
-    async def _remote_generate(req_payload: dict) -> Path:
-        image_url: str | None = None
-        seen_content = False
-        async with httpx.AsyncClient(timeout=120) as client:
-            async with client.stream("POST", url, headers=headers, json=req_payload) as response:
-                response.raise_for_status()
-                async for line in response.aiter_lines():
-                    if not line:
-                        continue
-                    if line.startswith("data:"):
-                        line = line[len("data:") :].strip()
-                    if line == "[DONE]":
-                        break
-                    if not line.startswith("{"):
-                        continue
-                    try:
-                        chunk = httpx.Response(200, content=line).json()
-                    except Exception:
-                        continue
-                    choices = chunk.get("choices") or []
-                    if not choices:
-                        continue
-                    delta = choices[0].get("delta") or {}
-                    content = delta.get("content")
-                    if not content:
-                        continue
-                    seen_content = True
-                    maybe_url = _extract_first_url(content)
-                    if maybe_url:
-                        logger.info("Image stream URL candidate: %s", maybe_url[:500])
-                        image_url = maybe_url
-
-            if not image_url:
-                detail = "no content" if not seen_content else "content without image url"
-                raise ImageGenerationError(f"image stream finished but {detail}")
-
-            image_response = await client.get(image_url)
-            image_response.raise_for_status()
-            img = Image.open(BytesIO(image_response.content)).convert("RGB")
-            logger.info("Image upstream size=%sx%s, target frame=%sx%s", img.width, img.height, resolution[0], resolution[1])
-            img.save(output_path)
-            return output_path
+    def can_hedge() -> bool:
+        busy = busy_providers()
+        return any(provider.name not in busy for provider, _, _ in queue)
 
+    def launch(hedge: bool) -> bool:
+        # At most one attempt per provider is in flight: a hedge only helps against a different backend,
+        # a second request to the same one just doubles the spend.
+        busy = busy_providers()
+        index = 0
+        while index < len(queue):
+            provider, prompt_text, is_retry = queue[index]
+            if provider.name in busy:
+                index += 1
+                continue
+            queue.pop(index)
+            if not get_circuit_breaker(image_circuit(provider.name)).allow():
+                continue
+            if hedge:
+                _record_provider_outcome(provider.name, "hedges")
+                logger.info("Image request hedged to provider %s", provider.name)
+            attempt_path = output_path.with_name(f"{output_path.stem}.attempt{len(attempt_paths)}{output_path.suffix}")
+            attempt_paths.append(attempt_path)
+            task = asyncio.create_task(_timed_attempt(provider, build_payload(prompt_text), attempt_path, resolution))
+            pending[task] = (provider, is_retry)
+            return True
+        return False
+
+    if not launch(hedge=False):
+        # Every provider is circuit-open: fail fast so callers go straight to cache fallbacks.
+        raise ImageGenerationError("all image providers are circuit-open")
     try:
-        return await asyncio.wait_for(_remote_generate(payload), timeout=45)
-    except Exception as first_error:
-        logger.warning("Primary image generation failed: %s", first_error)
-        # Some proxy/image backends may return HTTP 200 but no image URL for pure CJK prompts.
-        # Retry with an English wrapper before failing hard.
-        retry_prompt = build_image_retry_prompt(prompt)
-        retry_payload = {
-            "model": settings.image_model,
-            "messages": _build_messages(
-                retry_prompt,
-                reference_image_path=reference_image_path,
-                extra_reference_image_paths=extra_reference_image_paths,
-            ),
-            "stream": True,
-        }
-        if aspect_ratio:
-            retry_payload["extra_body"] = {"aspect_ratio": aspect_ratio}
-        try:
-            return await asyncio.wait_for(_remote_generate(retry_payload), timeout=45)
-        except Exception as retry_error:
-            logger.exception("Retry image generation failed: %s", retry_error)
-            raise ImageGenerationError(f"image generation failed after retry: {retry_error}") from retry_error
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            wait_timeout = remaining
+            hedge_possible = len(pending) < max_in_flight and can_hedge()
+            if hedge_possible:
+                latest_provider = list(pending.values())[-1][0]
+                wait_timeout = min(remaining, _provider_hedge_delay(latest_provider.name))
+
+            done, _ = await asyncio.wait(list(pending), timeout=wait_timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                provider, is_retry = pending.pop(task)
+                try:
+                    result = task.result()
+                except Exception as exc:
+                    last_error = exc
+                    logger.warning("Image generation failed on provider %s: %s", provider.name, exc)
+                    if not is_retry:
+                        queue.append((provider, retry_prompt, True))
+                    continue
+                _record_provider_outcome(provider.name, "wins")
+                result.replace(output_path)
+                return output_path
+
+            if done and len(pending) < max_in_flight:
+                # Replace the failed attempt with the next queued one (another provider or an English retry).
+                launch(hedge=False)
+            elif not done and hedge_possible:
+                # The in-flight attempt passed its provider's p90: hedge it on a different provider.
+                launch(hedge=True)
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        for attempt_path in attempt_paths:
+            attempt_path.unlink(missing_ok=True)
+
+    if last_error is None:
+        raise ImageGenerationError(f"image generation timed out after {settings.image_request_timeout}s")
+    logger.error("Image generation failed on all providers: %s", last_error)
+    raise ImageGenerationError(f"image generation failed after retry: {last_error}") from last_error
 
 
 async def use_reference_or_generate(
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from ..config import project_path, settings
+
+
+logger = logging.getLogger(__name__)
+
+VARIANT_SUFFIX = ".npy"
+_EVICT_LOCK = threading.Lock()
+# Running size of the store, seeded by one scan; writes add to it so the directory is only walked again to evict.
+_STORE_BYTES: int | None = None
+
+
+def _variant_root() -> Path:
+    return project_path(settings.image_variant_dir)
+
+
+def _budget_bytes() -> int:
+    return max(0, int(settings.image_variant_max_mb)) * 1024 * 1024
+
+
+def cover_fit_size(source_size: tuple[float, float], resolution: tuple[int, int]) -> tuple[int, int]:
+    target_w, target_h = resolution
+    source_w = max(1.0, float(source_size[0]))
+    source_h = max(1.0, float(source_size[1]))
+
+    # Cover fit: fill entire frame without distortion.
+    cover_scale = max(target_w / source_w, target_h / source_h)
+    scaled_w = source_w * cover_scale
+    scaled_h = source_h * cover_scale
+
+    # Prefer top-to-bottom movement. If there is no vertical overflow,
+    # apply a tiny extra zoom to create vertical travel.
+    min_vertical_pan = max(24.0, target_h * 0.08)
+    extra_zoom = 1.0
+    if (scaled_h - target_h) < min_vertical_pan:
+        extra_zoom = (target_h + min_vertical_pan) / max(1.0, scaled_h)
+
+    return int(round(scaled_w * extra_zoom)), int(round(scaled_h * extra_zoom))
+
+
+def is_image_variant(path: str | Path) -> bool:
+    return Path(path).suffix.lower() == VARIANT_SUFFIX
+
+
+def load_image_variant(path: str | Path) -> np.ndarray:
+    return np.load(str(path), allow_pickle=False)
+
+
+def _variant_path(source: Path, resolution: tuple[int, int]) -> Path:
+    stat = source.stat()
+    digest = hashlib.sha1(f"{source.resolve().as_posix()}|{stat.st_mtime_ns}|{stat.st_size}".encode("utf-8")).hexdigest()
+    # Camera motion only changes the pan path, not the pixels, so one variant per resolution covers every motion.
+    return _variant_root() / digest[:2] / f"{digest}_{resolution[0]}x{resolution[1]}{VARIANT_SUFFIX}"
+
+
+def _scan_store() -> tuple[int, list[tuple[float, int, Path]]]:
+    files: list[tuple[float, int, Path]] = []
+    total = 0
+    for path in _variant_root().glob(f"*/*{VARIANT_SUFFIX}"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+    return total, files
+
+
+def _account_variant(added_bytes: int, budget: int) -> None:
+    global _STORE_BYTES
+    if _STORE_BYTES is None:
+        # The new file is already on disk, so the seeding scan counts it.
+        _STORE_BYTES = _scan_store()[0]
+    else:
+        _STORE_BYTES += added_bytes
+    if _STORE_BYTES <= budget:
+        return
+
+    total, files = _scan_store()
+    evicted = 0
+    for _, size, path in sorted(files):
+        if total <= budget:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        evicted += 1
+    _STORE_BYTES = total
+    if evicted:
+        logger.info("Image variant store evicted %s files to stay under %s MB", evicted, settings.image_variant_max_mb)
+
+
+def _write_variant(source: Path, resolution: tuple[int, int], target: Path) -> None:
+    with Image.open(source) as raw:
+        image = raw.convert("RGB")
+    size = cover_fit_size(image.size, resolution)
+    if image.size != size:
+        image = image.resize(size, Image.Resampling.LANCZOS)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_target = target.with_name(f"{target.stem}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with temp_target.open("wb") as handle:
+            np.save(handle, np.ascontiguousarray(np.asarray(image, dtype=np.uint8)), allow_pickle=False)
+        temp_target.replace(target)
+    finally:
+        temp_target.unlink(missing_ok=True)
+
+
+def ensure_image_variant(source_image_path: str | Path, resolution: tuple[int, int]) -> Path:
+    source = Path(source_image_path)
+    target = _variant_path(source, resolution)
+    if target.exists():
+        try:
+            os.utime(target)
+        except Exception:
+            logger.debug("Failed to touch image variant: %s", target)
+        return target
+
+    _write_variant(source, resolution, target)
+    budget = _budget_bytes()
+    if budget > 0:
+        with _EVICT_LOCK:
+            try:
+                _account_variant(target.stat().st_size, budget)
+            except Exception:
+                logger.exception("Image variant eviction failed")
+    return target
+
+
+def link_image_variant(
+    source_image_path: str | Path,
+    output_path: str | Path,
+    resolution: tuple[int, int],
+    shared: bool = True,
+) -> Path:
+    dst = Path(output_path).with_suffix(VARIANT_SUFFIX)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if not shared or _budget_bytes() <= 0:
+        # Store disabled, or a per-job source no other job can key on: still hand the render a
+        # pre-sized array, just without putting it in the shared store.
+        _write_variant(Path(source_image_path), resolution, dst)
+        return dst
+
+    variant = ensure_image_variant(source_image_path, resolution)
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(variant, dst)
+    except OSError:
+        shutil.copyfile(variant, dst)
+    return dst
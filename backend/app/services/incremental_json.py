@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+
+
+class IncrementalJSONObject:
+    # Scans a streamed JSON object and reports each top-level field as soon as its value is complete.
+    # Top-level arrays additionally report every finished element, so a list of bundles can be consumed item by item.
+    # With item_fields, members of object elements are reported too, as ("<array>.<member>", element index, value),
+    # so a consumer can act on the first fields of an element before the whole element is written.
+    def __init__(self, item_fields: bool = False) -> None:
+        self._text = ""
+        self._pos = 0
+        self._started = False
+        self._finished = False
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._mode = "key"
+        self._key: str | None = None
+        self._value_start = -1
+        self._element_start = -1
+        self._element_index = 0
+        self._item_fields = item_fields
+        self._item_mode = ""
+        self._item_key: str | None = None
+        self._item_value_start = -1
+        self.fields: dict[str, object] = {}
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def _emit(self, events: list[tuple[str, int | None, object]], raw: str, index: int | None) -> None:
+        if self._key is None:
+            return
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return
+        if index is None:
+            self.fields[self._key] = value
+        events.append((self._key, index, value))
+
+    def _emit_item(self, events: list[tuple[str, int | None, object]], raw: str) -> None:
+        if self._key is None or self._item_key is None:
+            return
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return
+        events.append((f"{self._key}.{self._item_key}", self._element_index, value))
+
+    def _in_item(self, depth: int) -> bool:
+        # Directly inside an object that is an element of a top-level array.
+        return self._item_fields and depth == 3 and self._stack[1] == "[" and self._stack[2] == "{"
+
+    def _close_element(self, events: list[tuple[str, int | None, object]], end: int) -> None:
+        if self._element_start >= 0:
+            raw = self._text[self._element_start:end].strip()
+            if raw:
+                self._emit(events, raw, self._element_index)
+                self._element_index += 1
+        self._element_start = -1
+
+    def feed(self, chunk: str) -> list[tuple[str, int | None, object]]:
+        events: list[tuple[str, int | None, object]] = []
+        if self._finished or not chunk:
+            return events
+        self._text += chunk
+        text = self._text
+        while self._pos < len(text) and not self._finished:
+            pos = self._pos
+            char = text[pos]
+            self._pos += 1
+            depth = len(self._stack)
+
+            if not self._started:
+                # Skip anything before the object, e.g. a ```json fence.
+                if char == "{":
+                    self._started = True
+                    self._stack.append("{")
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if depth == 1 and self._mode == "key":
+                        try:
+                            self._key = str(json.loads(text[self._string_start:pos + 1]))
+                        except ValueError:
+                            self._key = None
+                        self._mode = "colon"
+                    elif depth == 1 and self._mode == "value":
+                        self._emit(events, text[self._value_start:pos + 1], None)
+                        self._mode = "after_value"
+                    elif self._in_item(depth) and self._item_mode == "key":
+                        try:
+                            self._item_key = str(json.loads(text[self._string_start:pos + 1]))
+                        except ValueError:
+                            self._item_key = None
+                        self._item_mode = "colon"
+                    elif self._in_item(depth) and self._item_mode == "value":
+                        self._emit_item(events, text[self._item_value_start:pos + 1])
+                        self._item_mode = "after_value"
+                continue
+
+            if char.isspace():
+                continue
+
+            if depth == 1 and self._mode == "value" and self._value_start < 0:
+                self._value_start = pos
+            if depth == 2 and self._stack[-1] == "[" and self._element_start < 0 and char not in ",]":
+                self._element_start = pos
+            if self._in_item(depth) and self._item_mode == "value" and self._item_value_start < 0:
+                self._item_value_start = pos
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif char == ":" and depth == 1 and self._mode == "colon":
+                self._mode = "value"
+                self._value_start = -1
+            elif char == ":" and self._in_item(depth) and self._item_mode == "colon":
+                self._item_mode = "value"
+                self._item_value_start = -1
+            elif char in "{[":
+                self._stack.append(char)
+                if depth == 1 and char == "[":
+                    self._element_start = -1
+                    self._element_index = 0
+                elif depth == 2 and char == "{" and self._stack[1] == "[":
+                    self._item_mode = "key"
+                    self._item_key = None
+            elif char in "}]":
+                if depth == 2 and char == "]":
+                    self._close_element(events, pos)
+                if depth == 1:
+                    if self._mode == "value" and self._value_start >= 0:
+                        self._emit(events, text[self._value_start:pos].strip(), None)
+                    self._stack.pop()
+                    self._finished = True
+                    continue
+                if self._in_item(depth) and self._item_mode == "value" and self._item_value_start >= 0:
+                    # Last member of the element object, a scalar closed by "}".
+                    self._emit_item(events, text[self._item_value_start:pos].strip())
+                    self._item_mode = ""
+                self._stack.pop()
+                if len(self._stack) == 1 and self._mode == "value":
+                    self._emit(events, text[self._value_start:pos + 1], None)
+                    self._mode = "after_value"
+                elif self._in_item(len(self._stack)) and self._item_mode == "value":
+                    # A nested array/object member of the element just closed.
+                    self._emit_item(events, text[self._item_value_start:pos + 1])
+                    self._item_mode = "after_value"
+            elif char == ",":
+                if depth == 1:
+                    if self._mode == "value" and self._value_start >= 0:
+                        self._emit(events, text[self._value_start:pos].strip(), None)
+                    self._mode = "key"
+                    self._key = None
+                elif depth == 2 and self._stack[-1] == "[":
+                    self._close_element(events, pos)
+                elif self._in_item(depth):
+                    if self._item_mode == "value" and self._item_value_start >= 0:
+                        self._emit_item(events, text[self._item_value_start:pos].strip())
+                    self._item_mode = "key"
+                    self._item_key = None
+        return events
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from ..config import project_path, settings
+
+
+logger = logging.getLogger(__name__)
+
+_CACHE_LOCK = threading.Lock()
+_STATS_LOCK = threading.Lock()
+_STATS = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+
+def _db_path() -> Path:
+    return project_path(settings.llm_cache_db_path)
+
+
+def _budget_bytes() -> int:
+    return max(0, int(settings.llm_cache_max_mb)) * 1024 * 1024
+
+
+def _ttl_seconds() -> float:
+    return max(0.0, float(settings.llm_cache_ttl_hours)) * 3600.0
+
+
+def llm_cache_enabled() -> bool:
+    return _budget_bytes() > 0 and _ttl_seconds() > 0
+
+
+def _connect_db() -> sqlite3.Connection:
+    path = _db_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    return conn
+
+
+def _ensure_db_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS llm_responses (
+            cache_key TEXT PRIMARY KEY,
+            purpose TEXT NOT NULL,
+            model TEXT NOT NULL,
+            body BLOB NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_access_at REAL NOT NULL,
+            hit_count INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_last_access ON llm_responses(last_access_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_created ON llm_responses(created_at)")
+    conn.commit()
+
+
+def _bump_stat(name: str, amount: int = 1) -> None:
+    with _STATS_LOCK:
+        _STATS[name] = int(_STATS.get(name, 0)) + amount
+
+
+def llm_cache_key(path: str, payload: dict) -> str:
+    # The whole payload is hashed (model, messages, temperature and any response_format etc.),
+    # together with the endpoint, so switching provider or prompt version never serves a stale answer.
+    fingerprint = json.dumps(
+        [settings.llm_api_base_url.rstrip("/"), path, payload],
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+
+def load_cached_llm_response(cache_key: str) -> bytes | None:
+    if not llm_cache_enabled():
+        return None
+
+    try:
+        with _CACHE_LOCK:
+            conn = _connect_db()
+            try:
+                _ensure_db_schema(conn)
+                row = conn.execute(
+                    "SELECT body, created_at FROM llm_responses WHERE cache_key = ?",
+                    (cache_key,),
+                ).fetchone()
+                if row is None:
+                    _bump_stat("misses")
+                    return None
+                now = time.time()
+                if now - float(row["created_at"] or 0.0) > _ttl_seconds():
+                    conn.execute("DELETE FROM llm_responses WHERE cache_key = ?", (cache_key,))
+                    conn.commit()
+                    _bump_stat("expired")
+                    _bump_stat("misses")
+                    return None
+                conn.execute(
+                    "UPDATE llm_responses SET last_access_at = ?, hit_count = hit_count + 1 WHERE cache_key = ?",
+                    (now, cache_key),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        _bump_stat("hits")
+        return bytes(row["body"])
+    except Exception:
+        logger.exception("LLM cache lookup failed")
+        return None
+
+
+def delete_cached_llm_response(cache_key: str) -> None:
+    if not llm_cache_enabled():
+        return
+    try:
+        with _CACHE_LOCK:
+            conn = _connect_db()
+            try:
+                _ensure_db_schema(conn)
+                conn.execute("DELETE FROM llm_responses WHERE cache_key = ?", (cache_key,))
+                conn.commit()
+            finally:
+                conn.close()
+    except Exception:
+        logger.exception("LLM cache delete failed")
+
+
+def _evict(conn: sqlite3.Connection) -> None:
+    expired = conn.execute("DELETE FROM llm_responses WHERE created_at < ?", (time.time() - _ttl_seconds(),)).rowcount
+    if expired and expired > 0:
+        _bump_stat("expired", expired)
+
+    budget = _budget_bytes()
+    total_row = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) AS total FROM llm_responses").fetchone()
+    total = int((total_row["total"] if total_row else 0) or 0)
+    if total <= budget:
+        return
+
+    evicted = 0
+    rows = conn.execute("SELECT cache_key, size_bytes FROM llm_responses ORDER BY last_access_at ASC").fetchall()
+    for row in rows:
+        if total <= budget:
+            break
+        conn.execute("DELETE FROM llm_responses WHERE cache_key = ?", (str(row["cache_key"]),))
+        total -= int(row["size_bytes"] or 0)
+        evicted += 1
+    if evicted:
+        _bump_stat("evictions", evicted)
+        logger.info("LLM cache evicted %s entries to stay under %s MB", evicted, settings.llm_cache_max_mb)
+
+
+def store_cached_llm_response(cache_key: str, purpose: str, model: str, body: bytes) -> None:
+    if not llm_cache_enabled() or not body:
+        return
+
+    try:
+        now = time.time()
+        with _CACHE_LOCK:
+            conn = _connect_db()
+            try:
+                _ensure_db_schema(conn)
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO llm_responses
+                        (cache_key, purpose, model, body, size_bytes, created_at, last_access_at, hit_count)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+                    """,
+                    (cache_key, purpose, model, sqlite3.Binary(body), len(body), now, now),
+                )
+                _evict(conn)
+                conn.commit()
+            finally:
+                conn.close()
+        _bump_stat("stores")
+    except Exception:
+        logger.exception("LLM cache store failed: purpose=%s", purpose)
+
+
+def llm_cache_stats() -> dict:
+    with _STATS_LOCK:
+        counters = dict(_STATS)
+    lookups = counters["hits"] + counters["misses"]
+    stats = {
+        **counters,
+        "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+        "enabled": llm_cache_enabled(),
+        "budget_bytes": _budget_bytes(),
+        "entries": 0,
+        "total_bytes": 0,
+    }
+    if not llm_cache_enabled():
+        return stats
+    try:
+        with _CACHE_LOCK:
+            conn = _connect_db()
+            try:
+                _ensure_db_schema(conn)
+                row = conn.execute("SELECT COUNT(1) AS cnt, COALESCE(SUM(size_bytes), 0) AS total FROM llm_responses").fetchone()
+            finally:
+                conn.close()
+        stats["entries"] = int(row["cnt"] or 0)
+        stats["total_bytes"] = int(row["total"] or 0)
+    except Exception:
+        logger.exception("Failed to read LLM cache stats")
+    return stats
@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import aclosing
+
+import httpx
+
+from ..config import settings
+from .http_client_service import get_http_client, http_request_extensions
+from .incremental_json import IncrementalJSONObject
+from .llm_cache_service import (
+    delete_cached_llm_response,
+    llm_cache_enabled,
+    llm_cache_key,
+    load_cached_llm_response,
+    store_cached_llm_response,
+)
+
+
+logger = logging.getLogger(__name__)
+
+_LLM_CLIENT_NAME = "llm"
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Read timeouts are not retried: the request may still be running upstream and a retry would only multiply the wait.
+_RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout, httpx.RemoteProtocolError)
+_LATENCY_WINDOW = 200
+_STATS_LOCK = threading.Lock()
+_STATS: dict[str, dict] = {}
+
+
+def llm_url(path: str) -> str:
+    return f"{settings.llm_api_base_url.rstrip('/')}{path}"
+
+
+def llm_headers() -> dict[str, str]:
+    return {
+        "Authorization": f"Bearer {settings.llm_api_key}",
+        "Content-Type": "application/json",
+    }
+
+
+def _stats_bucket(purpose: str) -> dict:
+    bucket = _STATS.get(purpose)
+    if bucket is None:
+        bucket = {
+            "calls": 0,
+            "errors": 0,
+            "retries": 0,
+            "cache_hits": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "latencies": deque(maxlen=_LATENCY_WINDOW),
+        }
+        _STATS[purpose] = bucket
+    return bucket
+
+
+def _record_call(purpose: str, latency: float, response: httpx.Response | None, retries: int) -> None:
+    usage: dict = {}
+    if response is not None and response.status_code < 400:
+        try:
+            body = json.loads(response.content)
+            usage = (body.get("usage") or {}) if isinstance(body, dict) else {}
+            usage = usage if isinstance(usage, dict) else {}
+        except Exception:
+            usage = {}
+    with _STATS_LOCK:
+        bucket = _stats_bucket(purpose)
+        bucket["calls"] += 1
+        bucket["retries"] += retries
+        bucket["latencies"].append(latency)
+        if response is None or response.status_code >= 400:
+            bucket["errors"] += 1
+        bucket["prompt_tokens"] += int(usage.get("prompt_tokens") or 0)
+        bucket["completion_tokens"] += int(usage.get("completion_tokens") or 0)
+    logger.debug(
+        "LLM call purpose=%s status=%s latency=%.2fs retries=%s tokens=%s/%s",
+        purpose,
+        response.status_code if response is not None else "error",
+        latency,
+        retries,
+        usage.get("prompt_tokens"),
+        usage.get("completion_tokens"),
+    )
+
+
+def _retry_delay(attempt: int, response: httpx.Response | None) -> float:
+    if response is not None:
+        retry_after = str(response.headers.get("retry-after") or "").strip()
+        try:
+            return min(30.0, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    base = max(0.05, float(settings.llm_retry_backoff_seconds)) * (2**attempt)
+    # Full jitter keeps concurrent jobs from retrying in lockstep against a rate-limited upstream.
+    return random.uniform(0.0, base)
+
+
+async def llm_request(
+    method: str,
+    path: str,
+    purpose: str,
+    payload: dict | None = None,
+    timeout: float | None = None,
+    max_retries: int | None = None,
+) -> httpx.Response:
+    request_timeout = float(timeout if timeout is not None else settings.llm_request_timeout)
+    retries_allowed = max(0, int(settings.llm_max_retries if max_retries is None else max_retries))
+    client = get_http_client(_LLM_CLIENT_NAME, timeout=request_timeout, max_connections=max(1, int(settings.llm_max_connections)))
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        try:
+            response = await client.request(
+                method,
+                llm_url(path),
+                headers=llm_headers(),
+                json=payload,
+                timeout=request_timeout,
+                extensions=http_request_extensions(_LLM_CLIENT_NAME),
+            )
+        except _RETRY_EXCEPTIONS as exc:
+            if attempt < retries_allowed:
+                delay = _retry_delay(attempt, None)
+                logger.warning("LLM %s transport error (%s), retry %s in %.2fs", purpose, exc, attempt + 1, delay)
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            _record_call(purpose, time.monotonic() - started, None, attempt)
+            raise
+        except Exception:
+            _record_call(purpose, time.monotonic() - started, None, attempt)
+            raise
+
+        if response.status_code in _RETRY_STATUSES and attempt < retries_allowed:
+            delay = _retry_delay(attempt, response)
+            logger.warning("LLM %s returned %s, retry %s in %.2fs", purpose, response.status_code, attempt + 1, delay)
+            attempt += 1
+            await asyncio.sleep(delay)
+            continue
+
+        _record_call(purpose, time.monotonic() - started, response, attempt)
+        return response
+
+
+def _cacheable_completion(body: bytes) -> bool:
+    try:
+        parsed = json.loads(body)
+        content = parsed["choices"][0]["message"]["content"]
+    except Exception:
+        return False
+    return bool(str(content or "").strip())
+
+
+def _completion_content(body: bytes) -> str:
+    try:
+        return str(json.loads(body)["choices"][0]["message"]["content"] or "")
+    except Exception:
+        return ""
+
+
+def _cached_response(path: str, body: bytes) -> httpx.Response:
+    return httpx.Response(
+        200,
+        content=body,
+        headers={"content-type": "application/json", "x-llm-cache": "hit"},
+        request=httpx.Request("POST", llm_url(path)),
+    )
+
+
+async def forget_cached_completion(payload: dict) -> None:
+    # For answers that parsed fine but failed the caller's own validation, so a retry reaches the model again.
+    if llm_cache_enabled():
+        await asyncio.to_thread(delete_cached_llm_response, llm_cache_key("/chat/completions", payload))
+
+
+async def llm_chat_completion(
+    payload: dict,
+    purpose: str,
+    timeout: float | None = None,
+    max_retries: int | None = None,
+    use_cache: bool = True,
+) -> httpx.Response:
+    path = "/chat/completions"
+    cache_key = llm_cache_key(path, payload) if use_cache and llm_cache_enabled() else ""
+    if cache_key:
+        cached = await asyncio.to_thread(load_cached_llm_response, cache_key)
+        if cached is not None:
+            with _STATS_LOCK:
+                _stats_bucket(purpose)["cache_hits"] += 1
+            logger.debug("LLM call purpose=%s served from cache", purpose)
+            return _cached_response(path, cached)
+
+    response = await llm_request("POST", path, purpose, payload=payload, timeout=timeout, max_retries=max_retries)
+    if cache_key and response.status_code == 200 and _cacheable_completion(response.content):
+        await asyncio.to_thread(
+            store_cached_llm_response,
+            cache_key,
+            purpose,
+            str(payload.get("model") or ""),
+            response.content,
+        )
+    return response
+
+
+def _stream_delta(data: str, usage: dict) -> str:
+    try:
+        chunk = json.loads(data)
+    except ValueError:
+        return ""
+    if not isinstance(chunk, dict):
+        return ""
+    if isinstance(chunk.get("usage"), dict):
+        usage.update(chunk["usage"])
+    choices = chunk.get("choices") or []
+    if not choices or not isinstance(choices[0], dict):
+        return ""
+    delta = choices[0].get("delta") or choices[0].get("message") or {}
+    return str(delta.get("content") or "") if isinstance(delta, dict) else ""
+
+
+async def llm_chat_completion_stream(
+    payload: dict,
+    purpose: str,
+    timeout: float | None = None,
+    max_retries: int | None = None,
+    use_cache: bool = True,
+) -> AsyncIterator[str]:
+    # Yields content deltas as they arrive. Retries only happen before the first delta; consumers that stop early
+    # should wrap the iterator in contextlib.aclosing so the connection is released right away.
+    path = "/chat/completions"
+    cache_key = llm_cache_key(path, payload) if use_cache and llm_cache_enabled() else ""
+    if cache_key:
+        cached = await asyncio.to_thread(load_cached_llm_response, cache_key)
+        if cached is not None:
+            with _STATS_LOCK:
+                _stats_bucket(purpose)["cache_hits"] += 1
+            yield _completion_content(cached)
+            return
+
+    request_timeout = float(timeout if timeout is not None else settings.llm_request_timeout)
+    retries_allowed = max(0, int(settings.llm_max_retries if max_retries is None else max_retries))
+    client = get_http_client(_LLM_CLIENT_NAME, timeout=request_timeout, max_connections=max(1, int(settings.llm_max_connections)))
+    stream_payload = {**payload, "stream": True}
+    started = time.monotonic()
+    attempt = 0
+    delivered = False
+    while True:
+        retry_response: httpx.Response | None = None
+        try:
+            async with client.stream(
+                "POST",
+                llm_url(path),
+                headers=llm_headers(),
+                json=stream_payload,
+                timeout=request_timeout,
+                extensions=http_request_extensions(_LLM_CLIENT_NAME),
+            ) as response:
+                if response.status_code in _RETRY_STATUSES and attempt < retries_allowed:
+                    await response.aread()
+                    retry_response = response
+                elif response.status_code >= 400:
+                    await response.aread()
+                    _record_call(purpose, time.monotonic() - started, response, attempt)
+                    response.raise_for_status()
+                elif "text/event-stream" not in str(response.headers.get("content-type") or ""):
+                    # Provider ignored stream=true and answered with a plain completion.
+                    body = await response.aread()
+                    _record_call(purpose, time.monotonic() - started, response, attempt)
+                    if cache_key and _cacheable_completion(body):
+                        await asyncio.to_thread(
+                            store_cached_llm_response,
+                            cache_key,
+                            purpose,
+                            str(payload.get("model") or ""),
+                            body,
+                        )
+                    yield _completion_content(body)
+                    return
+                else:
+                    parts: list[str] = []
+                    usage: dict = {}
+                    completed = False
+                    failed = False
+                    try:
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[5:].strip()
+                            if data == "[DONE]":
+                                break
+                            delta = _stream_delta(data, usage)
+                            if delta:
+                                parts.append(delta)
+                                delivered = True
+                                yield delta
+                        completed = True
+                    except Exception:
+                        failed = True
+                        raise
+                    finally:
+                        with _STATS_LOCK:
+                            bucket = _stats_bucket(purpose)
+                            bucket["calls"] += 1
+                            bucket["errors"] += 1 if failed else 0
+                            bucket["retries"] += attempt
+                            bucket["latencies"].append(time.monotonic() - started)
+                            bucket["prompt_tokens"] += int(usage.get("prompt_tokens") or 0)
+                            bucket["completion_tokens"] += int(usage.get("completion_tokens") or 0)
+                    content = "".join(parts)
+                    if completed and cache_key and content.strip():
+                        body = json.dumps(
+                            {"choices": [{"message": {"role": "assistant", "content": content}}], "usage": usage},
+                            ensure_ascii=False,
+                        ).encode("utf-8")
+                        await asyncio.to_thread(
+                            store_cached_llm_response,
+                            cache_key,
+                            purpose,
+                            str(payload.get("model") or ""),
+                            body,
+                        )
+                    return
+        except _RETRY_EXCEPTIONS as exc:
+            if delivered:
+                # Part of the answer was already handed out; replaying it would duplicate content.
+                raise
+            if attempt < retries_allowed:
+                delay = _retry_delay(attempt, None)
+                logger.warning("LLM %s stream transport error (%s), retry %s in %.2fs", purpose, exc, attempt + 1, delay)
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            _record_call(purpose, time.monotonic() - started, None, attempt)
+            raise
+
+        delay = _retry_delay(attempt, retry_response)
+        logger.warning("LLM %s stream returned %s, retry %s in %.2fs", purpose, retry_response.status_code, attempt + 1, delay)
+        attempt += 1
+        await asyncio.sleep(delay)
+
+
+async def stream_chat_json(
+    payload: dict,
+    purpose: str,
+    timeout: float,
+    on_event: Callable[[str, int | None, object], bool | None] | None = None,
+    item_fields: bool = False,
+) -> str:
+    # Returns the full content; on_event sees every completed top-level field (and array element, plus the
+    # members of array elements with item_fields) while the model is still writing. Returning True from
+    # on_event stops reading the rest of the answer.
+    if not settings.llm_streaming_enabled:
+        response = await llm_chat_completion(payload, purpose=purpose, timeout=timeout)
+        response.raise_for_status()
+        return str(response.json()["choices"][0]["message"]["content"] or "")
+
+    extractor = IncrementalJSONObject(item_fields=item_fields)
+    parts: list[str] = []
+    async with aclosing(llm_chat_completion_stream(payload, purpose=purpose, timeout=timeout)) as deltas:
+        async for delta in deltas:
+            parts.append(delta)
+            if on_event is None:
+                continue
+            stop = False
+            for key, index, value in extractor.feed(delta):
+                try:
+                    stop = bool(on_event(key, index, value)) or stop
+                except Exception:
+                    logger.exception("Streamed LLM field handler failed: purpose=%s key=%s", purpose, key)
+            if stop:
+                break
+    return "".join(parts)
+
+
+def llm_client_stats() -> dict:
+    with _STATS_LOCK:
+        snapshot = {purpose: dict(bucket, latencies=list(bucket["latencies"])) for purpose, bucket in _STATS.items()}
+    result: dict[str, dict] = {}
+    for purpose, bucket in snapshot.items():
+        latencies = sorted(bucket.pop("latencies"))
+        bucket["avg_latency_seconds"] = round(sum(latencies) / len(latencies), 3) if latencies else None
+        bucket["p90_latency_seconds"] = round(latencies[int(round(0.9 * (len(latencies) - 1)))], 3) if latencies else None
+        result[purpose] = bucket
+    return result
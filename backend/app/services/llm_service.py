@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from difflib import SequenceMatcher
+import asyncio
+import bisect
+from collections.abc import Callable
 import json
 import logging
 import re
@@ -10,7 +12,10 @@ import httpx
 from ..config import settings
 from ..models import CharacterSuggestion
 from ..voice_catalog import VOICE_INFOS, recommend_voice
+from .circuit_breaker_service import LLM_CIRCUIT, get_circuit_breaker
+from .llm_client_service import forget_cached_completion, llm_chat_completion, llm_request, stream_chat_json
 from .prompt_templates import (
+    SEGMENT_IMAGE_BUNDLE_BATCH_RULES,
     SEGMENT_IMAGE_BUNDLE_RULES,
     STRICT_JSON_SYSTEM_PROMPT,
     build_alias_prompt,
@@ -34,10 +39,6 @@ class LLMServiceError(RuntimeError):
     pass
 
 
-def _base_url(path: str) -> str:
-    return f"{settings.llm_api_base_url.rstrip('/')}{path}"
-
-
 def _response_error_message(response: httpx.Response) -> str:
     try:
         payload = response.json()
@@ -65,13 +66,11 @@ async def probe_openai_models() -> list[str]:
     if not settings.llm_api_key:
         return []
 
-    headers = {"Authorization": f"Bearer {settings.llm_api_key}"}
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
-            response = await client.get(_base_url("/models"), headers=headers)
-            response.raise_for_status()
-            payload = response.json()
-            return sorted([item["id"] for item in payload.get("data", []) if item.get("id")])
+        response = await llm_request("GET", "/models", purpose="probe_models", timeout=20)
+        response.raise_for_status()
+        payload = response.json()
+        return sorted([item["id"] for item in payload.get("data", []) if item.get("id")])
     except Exception:
         logger.exception("Failed to probe models")
         return []
@@ -311,56 +310,216 @@ def segment_by_fixed(text: str, chunk_size: int = 120) -> list[str]:
     return [clean[index : index + chunk_size] for index in range(0, len(clean), chunk_size)]
 
 
-def _smart_segmentation_similarity(source_text: str, segments: list[str]) -> float:
-    source = re.sub(r"\s+", "", str(source_text or ""))
-    merged = re.sub(r"\s+", "", "".join(str(item or "") for item in (segments or [])))
+def _segmentation_fidelity(source_text: str, segments: list[str]) -> dict:
+    # Linear walk over source sentences: each must appear next in the merged output, with a bounded
+    # look-ahead to resync after insertions. Score is matched chars over the longer of source/output.
+    units = [re.sub(r"\s+", "", item) for item in split_sentences(source_text)]
+    units = [item for item in units if item]
+    compact_segments = [re.sub(r"\s+", "", str(item or "")) for item in (segments or [])]
+    merged = "".join(compact_segments)
+    source_length = sum(len(item) for item in units)
+    if not source_length or not merged:
+        return {"score": 0.0, "divergent_sentences": [], "divergent_segments": list(range(len(compact_segments)))}
+
+    segment_ends: list[int] = []
+    for item in compact_segments:
+        segment_ends.append((segment_ends[-1] if segment_ends else 0) + len(item))
+
+    matched = 0
+    position = 0
+    divergent_units: list[int] = []
+    divergent_positions: list[int] = []
+    for index, unit in enumerate(units):
+        if merged.startswith(unit, position):
+            matched += len(unit)
+            position += len(unit)
+            continue
+        divergent_units.append(index)
+        divergent_positions.append(position)
+        found = merged.find(unit, position, position + 3 * len(unit) + 64)
+        if found >= 0:
+            matched += len(unit)
+            position = found + len(unit)
+    if position < len(merged):
+        divergent_positions.append(position)
+
+    ranges: list[tuple[int, int]] = []
+    for index in divergent_units:
+        if ranges and ranges[-1][1] == index:
+            ranges[-1] = (ranges[-1][0], index + 1)
+        else:
+            ranges.append((index, index + 1))
+    divergent_segments = sorted(
+        {min(bisect.bisect_right(segment_ends, item), len(compact_segments) - 1) for item in divergent_positions}
+    )
+    return {
+        "score": matched / max(source_length, len(merged)),
+        "divergent_sentences": ranges,
+        "divergent_segments": divergent_segments,
+    }
 
-    if not source or not merged:
-        return 0.0
-    return float(SequenceMatcher(None, source, merged).ratio())
 
+def _compact_length(value: str) -> int:
+    return len(re.sub(r"\s+", "", value or ""))
+
+
+def _smart_segmentation_windows(sentences: list[str], window_chars: int, overlap: int) -> list[tuple[int, int, int, int]]:
+    # (window_start, core_start, core_end, window_end) in sentence indexes; cores tile the text,
+    # windows extend each core by `overlap` sentences on both sides so seams are segmented with context.
+    cores: list[tuple[int, int]] = []
+    start = 0
+    size = 0
+    for index, sentence in enumerate(sentences):
+        if index > start and size + len(sentence) > window_chars:
+            cores.append((start, index))
+            start = index
+            size = 0
+        size += len(sentence)
+    if start < len(sentences):
+        cores.append((start, len(sentences)))
+    return [
+        (max(0, core_start - overlap), core_start, core_end, min(len(sentences), core_end + overlap))
+        for core_start, core_end in cores
+    ]
 
-async def segment_by_smart(text: str, model_id: str | None) -> list[str]:
-    clean_text = _normalize_segmentation_text(text)
-    selected_model = model_id or settings.llm_default_model
-    if not settings.llm_api_key:
-        return segment_by_sentence_groups(clean_text, sentences_per_segment=5)
 
-    prompt = build_smart_segmentation_prompt(clean_text)
+def _segments_to_sentence_cuts(sentences: list[str], segments: list[str]) -> list[int]:
+    # Snap each segment end to the nearest sentence boundary so stitched output reuses the source wording.
+    boundaries = [0]
+    for sentence in sentences:
+        boundaries.append(boundaries[-1] + _compact_length(sentence))
+    cuts: list[int] = []
+    consumed = 0
+    for segment in segments[:-1]:
+        consumed += _compact_length(segment)
+        position = bisect.bisect_left(boundaries, consumed)
+        if position >= len(boundaries):
+            position = len(boundaries) - 1
+        if position > 0 and consumed - boundaries[position - 1] < boundaries[position] - consumed:
+            position -= 1
+        if 0 < position < len(sentences) and position not in cuts:
+            cuts.append(position)
+    return sorted(cuts)
+
+
+async def _smart_segment_text(text: str, selected_model: str, attempts: int = 2) -> list[str] | None:
     payload = {
         "model": selected_model,
         "messages": [
             {"role": "system", "content": STRICT_JSON_SYSTEM_PROMPT},
-            {"role": "user", "content": prompt},
+            {"role": "user", "content": build_smart_segmentation_prompt(text)},
         ],
         "temperature": 0.2,
     }
-    headers = {
-        "Authorization": f"Bearer {settings.llm_api_key}",
-        "Content-Type": "application/json",
-    }
+    for attempt in range(max(1, attempts)):
+        if attempt > 0:
+            # The diverged answer was cached like any other; drop it so the retry reaches the model.
+            await forget_cached_completion(payload)
+        response = await llm_chat_completion(payload, purpose="smart_segmentation", timeout=60)
+        response.raise_for_status()
+        body = response.json()
+        content = body["choices"][0]["message"]["content"]
+        parsed = _extract_json_object(content)
+        if not parsed or not isinstance(parsed.get("segments"), list):
+            continue
+        segments = [str(item).strip() for item in parsed["segments"] if str(item).strip()]
+        if not segments:
+            continue
+        # The text itself is rebuilt from the source, but cut positions are mapped by length, so an answer
+        # that rewrote the source would still place them wrongly.
+        fidelity = _segmentation_fidelity(text, segments)
+        if fidelity["score"] >= 0.9:
+            return segments
+        logger.warning(
+            "Smart segmentation output diverged from source (score=%.3f, attempt %s/%s): sentences=%s segments=%s",
+            fidelity["score"],
+            attempt + 1,
+            attempts,
+            fidelity["divergent_sentences"][:8],
+            fidelity["divergent_segments"][:8],
+        )
+    await forget_cached_completion(payload)
+    return None
 
-    try:
-        async with httpx.AsyncClient(timeout=60) as client:
-            response = await client.post(_base_url("/chat/completions"), headers=headers, json=payload)
-            response.raise_for_status()
-            body = response.json()
-            content = body["choices"][0]["message"]["content"]
-            parsed = _extract_json_object(content)
-            if parsed and isinstance(parsed.get("segments"), list):
-                segments = [str(item).strip() for item in parsed["segments"] if str(item).strip()]
-                if segments:
-                    similarity = _smart_segmentation_similarity(clean_text, segments)
-                    if similarity >= 0.9:
-                        return segments
-                    logger.warning(
-                        "Smart segmentation output diverged from source (similarity=%.3f), fallback to sentence groups",
-                        similarity,
-                    )
-    except Exception:
-        logger.exception("Smart segmentation failed, fallback to sentence groups")
 
-    return segment_by_sentence_groups(clean_text, sentences_per_segment=5)
+async def _segment_window_cuts(
+    sentences: list[str],
+    window: tuple[int, int, int, int],
+    selected_model: str,
+    semaphore: asyncio.Semaphore,
+) -> tuple[list[int], bool]:
+    window_start, _, _, window_end = window
+    window_sentences = sentences[window_start:window_end]
+    segments: list[str] | None = None
+    async with semaphore:
+        try:
+            segments = await _smart_segment_text("".join(window_sentences), selected_model)
+        except Exception:
+            logger.exception("Smart segmentation window %s-%s failed", window_start + 1, window_end)
+    if segments is None:
+        # Only this window degrades to sentence groups; the rest of the book keeps its smart cuts.
+        local_cuts = list(range(5, len(window_sentences), 5))
+        return [window_start + cut for cut in local_cuts], False
+    return [window_start + cut for cut in _segments_to_sentence_cuts(window_sentences, segments)], True
+
+
+def _stitch_window_cuts(
+    windows: list[tuple[int, int, int, int]],
+    window_cuts: list[list[int]],
+) -> list[int]:
+    # At each seam both neighbouring windows saw the overlap. If they agree on at least one cut there,
+    # only the agreed cuts are kept in the overlap: a cut just one of the two windows made is dropped,
+    # so its sentences merge into the neighbouring segment. With no agreement each window keeps the
+    # cuts inside its own core.
+    cuts: set[int] = set()
+    for position, (_, core_start, core_end, _) in enumerate(windows):
+        own = [cut for cut in window_cuts[position] if core_start <= cut < core_end]
+        if position > 0:
+            previous_window = windows[position - 1]
+            overlap_start, overlap_end = windows[position][0], previous_window[3]
+            shared = set(window_cuts[position - 1]) & set(window_cuts[position])
+            agreed = {cut for cut in shared if overlap_start <= cut < overlap_end}
+            if agreed:
+                own = [cut for cut in own if not overlap_start <= cut < overlap_end]
+                cuts.difference_update({cut for cut in cuts if overlap_start <= cut < overlap_end})
+                cuts.update(agreed)
+        cuts.update(own)
+    return sorted(cut for cut in cuts if cut > 0)
+
+
+async def segment_by_smart(text: str, model_id: str | None) -> list[str]:
+    clean_text = _normalize_segmentation_text(text)
+    selected_model = model_id or settings.llm_default_model
+    if not settings.llm_api_key:
+        return segment_by_sentence_groups(clean_text, sentences_per_segment=5)
+
+    # Segments are always rebuilt from source sentences at the model's cuts, so the output wording never
+    # depends on what the model echoed back or on how long the text is; short texts are a single window.
+    sentences = split_sentences(clean_text)
+    if len(sentences) <= 1:
+        return sentences
+    window_chars = max(500, min(14000, int(settings.smart_segment_window_chars)))
+    windows = _smart_segmentation_windows(sentences, window_chars, max(0, int(settings.smart_segment_overlap_sentences)))
+    semaphore = asyncio.Semaphore(max(1, int(settings.smart_segment_concurrency)))
+    results = await asyncio.gather(
+        *(_segment_window_cuts(sentences, window, selected_model, semaphore) for window in windows)
+    )
+    smart_windows = sum(1 for _, ok in results if ok)
+    if smart_windows == 0:
+        logger.warning("Smart segmentation failed for every window, fallback to sentence groups")
+        return group_sentences(sentences, 5)
+
+    cuts = _stitch_window_cuts(windows, [window_cuts for window_cuts, _ in results])
+    bounds = [0, *cuts, len(sentences)]
+    segments = ["".join(sentences[start:end]) for start, end in zip(bounds, bounds[1:]) if end > start]
+    logger.info(
+        "Smart segmentation stitched %s windows (%s smart, %s fallback) into %s segments",
+        len(windows),
+        smart_windows,
+        len(windows) - smart_windows,
+        len(segments),
+    )
+    return segments
 
 
 def _clean_text(value: str | None, limit: int) -> str:
@@ -640,29 +799,78 @@ async def summarize_story_world_context(text: str, model_id: str | None) -> str:
         ],
         "temperature": 0.1,
     }
-    headers = {
-        "Authorization": f"Bearer {settings.llm_api_key}",
-        "Content-Type": "application/json",
-    }
 
+    breaker = get_circuit_breaker(LLM_CIRCUIT)
+    if not breaker.allow():
+        logger.warning("LLM circuit open, skipping story world context summary")
+        return ""
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(_base_url("/chat/completions"), headers=headers, json=payload)
-            response.raise_for_status()
-            body = response.json()
-            content = body["choices"][0]["message"]["content"]
-            parsed = _extract_json_object(content) or {}
-            summary = _clean_text(str(parsed.get("world_summary", "")), 320)
-            return summary
-    except Exception:
+        response = await llm_chat_completion(payload, purpose="story_world_summary", timeout=30)
+        response.raise_for_status()
+        breaker.record_success()
+        body = response.json()
+        content = body["choices"][0]["message"]["content"]
+        parsed = _extract_json_object(content) or {}
+        summary = _clean_text(str(parsed.get("world_summary", "")), 320)
+        return summary
+    except Exception as exc:
+        if isinstance(exc, httpx.HTTPError):
+            breaker.record_failure()
         logger.exception("Story world context summarization failed")
         return ""
 
 
-async def build_segment_image_bundle(
+# Ordered so the fields image generation needs come first; streaming consumers act on them before the speaker plan.
+_SEGMENT_BUNDLE_OUTPUT_SCHEMA = {
+    "prompt": "",
+    "primary_index": 0,
+    "related_indexes": [0, 1, 2, 3],
+    "is_scene_only": False,
+    "action_hint": "",
+    "location_hint": "",
+    "scene_elements": [""],
+    "action_keywords": [""],
+    "location_keywords": [""],
+    "mood": "",
+    "shot_type": "",
+    "character_confidence": 0.0,
+    "character_reason": "",
+    "sentence_speakers": [
+        {
+            "sentence_index": 0,
+            "speaker_type": "narrator",
+            "character_index": None,
+            "confidence": 0.0,
+            "reason": "",
+        }
+    ],
+}
+
+
+_PARTIAL_BUNDLE_FIELDS = frozenset({"prompt", "primary_index", "related_indexes"})
+
+
+def _character_candidates_payload(candidates: list[CharacterSuggestion]) -> list[dict]:
+    return [
+        {
+            "index": index,
+            "name": _clean_text(item.name, 80),
+            "role": _clean_text(item.role, 80),
+            "gender": _normalize_character_gender(getattr(item, "gender", "unknown")),
+            "importance": max(1, min(10, int(item.importance or 5))),
+            "is_main_character": bool(item.is_main_character),
+            "is_story_self": bool(item.is_story_self),
+            "voice_id": _clean_text(item.voice_id, 80),
+            "voice_gender": _VOICE_ID_TO_GENDER.get((item.voice_id or "").strip(), "unknown"),
+            "has_reference_image": bool(item.reference_image_path),
+        }
+        for index, item in enumerate(candidates)
+    ]
+
+
+def _prepare_segment_bundle(
     character: CharacterSuggestion,
     segment_text: str,
-    model_id: str | None,
     related_reference_image_paths: list[str] | None = None,
     story_world_context: str | None = None,
     previous_segment_text: str = "",
@@ -693,78 +901,137 @@ async def build_segment_image_bundle(
         default_primary_index=safe_default_primary,
         default_related_indexes=safe_default_related,
     )
-    guard = _character_identity_guard(character)
-    scene_text = _clean_text(segment_text, 1200)
-    world_context = _clean_text(story_world_context, 320)
+    return {
+        "character": character,
+        "candidates": candidates,
+        "segment_text": segment_text,
+        "scene_text": _clean_text(segment_text, 1200),
+        "world_context": _clean_text(story_world_context, 320),
+        "default_primary": safe_default_primary,
+        "fallback_bundle": fallback_bundle,
+        "segment_body": {
+            "character": {
+                "name": _clean_text(character.name, 120),
+                "appearance": _clean_text(character.appearance, 800),
+                "personality": _clean_text(character.personality, 400),
+                "base_prompt": _clean_text(character.base_prompt, 800),
+                "has_reference_image": bool(character.reference_image_path),
+                "related_reference_image_paths": [str(item) for item in (related_reference_image_paths or []) if str(item).strip()][:3],
+            },
+            "current_segment": _clean_text(segment_text, 1800),
+            "adjacent_context": {
+                "previous_segment": _clean_text(previous_segment_text, 500),
+                "next_segment": _clean_text(next_segment_text, 500),
+            },
+            "tts_sentence_units": [
+                {"sentence_index": index, "sentence_text": _clean_text(sentence, 260)}
+                for index, sentence in enumerate(split_sentences(segment_text))
+                if _clean_text(sentence, 260)
+            ][:32],
+            "default_character_assignment": {
+                "primary_index": safe_default_primary,
+                "related_indexes": safe_default_related,
+            },
+        },
+    }
+
+
+def _bundle_from_parsed(prepared: dict, parsed: dict | None) -> dict | None:
+    candidate = _clean_text(str((parsed or {}).get("prompt", "")), 2200)
+    if not candidate:
+        return None
+
+    candidates = prepared["candidates"]
+    segment_text = prepared["segment_text"]
+    resolved_primary = _normalize_index((parsed or {}).get("primary_index"), len(candidates))
+    resolved_related = _normalize_index_list((parsed or {}).get("related_indexes"), len(candidates), limit=4)
+    if resolved_primary is None and resolved_related:
+        resolved_primary = resolved_related[0]
+    if resolved_primary is None:
+        resolved_primary = prepared["default_primary"]
+    if resolved_primary is not None and resolved_primary not in resolved_related:
+        resolved_related.insert(0, resolved_primary)
+
+    prompt_character = (
+        candidates[resolved_primary]
+        if resolved_primary is not None and 0 <= resolved_primary < len(candidates)
+        else prepared["character"]
+    )
+    guard = _character_identity_guard(prompt_character)
+
+    final_prompt = build_final_segment_image_prompt(
+        guard=guard,
+        scene_text=prepared["scene_text"],
+        candidate=candidate,
+        story_world_context=prepared["world_context"],
+    )
+    metadata = _normalize_scene_metadata(parsed)
+    if not metadata.get("action_hint"):
+        metadata["action_hint"] = _fallback_scene_metadata(segment_text, final_prompt).get("action_hint", "")
+    if not metadata.get("location_hint"):
+        metadata["location_hint"] = _fallback_scene_metadata(segment_text, final_prompt).get("location_hint", "")
+
+    sentence_count = len([item for item in prepared["segment_body"]["tts_sentence_units"] if isinstance(item, dict)])
+    sentence_plan = _normalize_sentence_speaker_plan(
+        (parsed or {}).get("sentence_speakers"),
+        sentence_count=sentence_count,
+        candidate_count=len(candidates),
+        default_primary_index=resolved_primary,
+    )
+    return {
+        "prompt": final_prompt,
+        "metadata": metadata,
+        "character_assignment": {
+            "primary_index": resolved_primary,
+            "related_indexes": resolved_related,
+            "confidence": max(0.0, min(1.0, float((parsed or {}).get("character_confidence", 0.0) or 0.0))),
+            "reason": _clean_text(str((parsed or {}).get("character_reason", "")), 240),
+        },
+        "tts_sentence_plan": sentence_plan,
+    }
+
+
+async def build_segment_image_bundle(
+    character: CharacterSuggestion,
+    segment_text: str,
+    model_id: str | None,
+    related_reference_image_paths: list[str] | None = None,
+    story_world_context: str | None = None,
+    previous_segment_text: str = "",
+    next_segment_text: str = "",
+    character_candidates: list[CharacterSuggestion] | None = None,
+    default_primary_index: int | None = None,
+    default_related_indexes: list[int] | None = None,
+    on_partial: Callable[[dict, set[str]], None] | None = None,
+) -> dict:
+    prepared = _prepare_segment_bundle(
+        character,
+        segment_text,
+        related_reference_image_paths=related_reference_image_paths,
+        story_world_context=story_world_context,
+        previous_segment_text=previous_segment_text,
+        next_segment_text=next_segment_text,
+        character_candidates=character_candidates,
+        default_primary_index=default_primary_index,
+        default_related_indexes=default_related_indexes,
+    )
+    fallback_bundle = prepared["fallback_bundle"]
     if not settings.llm_api_key:
         return fallback_bundle
 
     selected_model = model_id or settings.llm_default_model
+    segment_body = prepared["segment_body"]
     request_body = {
         "task": "build_image_prompt_for_story_segment",
         "rules": list(SEGMENT_IMAGE_BUNDLE_RULES),
-        "character": {
-            "name": _clean_text(character.name, 120),
-            "appearance": _clean_text(character.appearance, 800),
-            "personality": _clean_text(character.personality, 400),
-            "base_prompt": _clean_text(character.base_prompt, 800),
-            "has_reference_image": bool(character.reference_image_path),
-            "related_reference_image_paths": [str(item) for item in (related_reference_image_paths or []) if str(item).strip()][:3],
-        },
-        "story_world_context": world_context,
-        "current_segment": _clean_text(segment_text, 1800),
-        "adjacent_context": {
-            "previous_segment": _clean_text(previous_segment_text, 500),
-            "next_segment": _clean_text(next_segment_text, 500),
-        },
-        "tts_sentence_units": [
-            {"sentence_index": index, "sentence_text": _clean_text(sentence, 260)}
-            for index, sentence in enumerate(split_sentences(segment_text))
-            if _clean_text(sentence, 260)
-        ][:32],
-        "character_candidates": [
-            {
-                "index": index,
-                "name": _clean_text(item.name, 80),
-                "role": _clean_text(item.role, 80),
-                "gender": _normalize_character_gender(getattr(item, "gender", "unknown")),
-                "importance": max(1, min(10, int(item.importance or 5))),
-                "is_main_character": bool(item.is_main_character),
-                "is_story_self": bool(item.is_story_self),
-                "voice_id": _clean_text(item.voice_id, 80),
-                "voice_gender": _VOICE_ID_TO_GENDER.get((item.voice_id or "").strip(), "unknown"),
-                "has_reference_image": bool(item.reference_image_path),
-            }
-            for index, item in enumerate(candidates)
-        ],
-        "default_character_assignment": {
-            "primary_index": safe_default_primary,
-            "related_indexes": safe_default_related,
-        },
-        "output_schema": {
-            "primary_index": 0,
-            "related_indexes": [0, 1, 2, 3],
-            "character_confidence": 0.0,
-            "character_reason": "",
-            "sentence_speakers": [
-                {
-                    "sentence_index": 0,
-                    "speaker_type": "narrator",
-                    "character_index": None,
-                    "confidence": 0.0,
-                    "reason": "",
-                }
-            ],
-            "prompt": "",
-            "action_hint": "",
-            "location_hint": "",
-            "scene_elements": [""],
-            "action_keywords": [""],
-            "location_keywords": [""],
-            "mood": "",
-            "shot_type": "",
-            "is_scene_only": False,
-        },
+        "character": segment_body["character"],
+        "story_world_context": prepared["world_context"],
+        "current_segment": segment_body["current_segment"],
+        "adjacent_context": segment_body["adjacent_context"],
+        "tts_sentence_units": segment_body["tts_sentence_units"],
+        "character_candidates": _character_candidates_payload(prepared["candidates"]),
+        "default_character_assignment": segment_body["default_character_assignment"],
+        "output_schema": _SEGMENT_BUNDLE_OUTPUT_SCHEMA,
     }
     payload = {
         "model": selected_model,
@@ -774,68 +1041,164 @@ async def build_segment_image_bundle(
         ],
         "temperature": 0.15,
     }
-    headers = {
-        "Authorization": f"Bearer {settings.llm_api_key}",
-        "Content-Type": "application/json",
-    }
 
+    breaker = get_circuit_breaker(LLM_CIRCUIT)
+    if not breaker.allow():
+        logger.info("LLM circuit open, using fallback image bundle")
+        return fallback_bundle
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(_base_url("/chat/completions"), headers=headers, json=payload)
-            response.raise_for_status()
-            body = response.json()
-            content = body["choices"][0]["message"]["content"]
-            parsed = _extract_json_object(content)
-            candidate = _clean_text(str((parsed or {}).get("prompt", "")), 2200)
-            if candidate:
-                resolved_primary = _normalize_index((parsed or {}).get("primary_index"), len(candidates))
-                resolved_related = _normalize_index_list((parsed or {}).get("related_indexes"), len(candidates), limit=4)
-                if resolved_primary is None and resolved_related:
-                    resolved_primary = resolved_related[0]
-                if resolved_primary is None:
-                    resolved_primary = safe_default_primary
-                if resolved_primary is not None and resolved_primary not in resolved_related:
-                    resolved_related.insert(0, resolved_primary)
-
-                prompt_character = candidates[resolved_primary] if resolved_primary is not None and 0 <= resolved_primary < len(candidates) else character
-                guard = _character_identity_guard(prompt_character)
-
-                final_prompt = build_final_segment_image_prompt(
-                    guard=guard,
-                    scene_text=scene_text,
-                    candidate=candidate,
-                    story_world_context=world_context,
-                )
-                metadata = _normalize_scene_metadata(parsed)
-                if not metadata.get("action_hint"):
-                    metadata["action_hint"] = _fallback_scene_metadata(segment_text, final_prompt).get("action_hint", "")
-                if not metadata.get("location_hint"):
-                    metadata["location_hint"] = _fallback_scene_metadata(segment_text, final_prompt).get("location_hint", "")
-
-                sentence_count = len([item for item in request_body.get("tts_sentence_units", []) if isinstance(item, dict)])
-                sentence_plan = _normalize_sentence_speaker_plan(
-                    (parsed or {}).get("sentence_speakers"),
-                    sentence_count=sentence_count,
-                    candidate_count=len(candidates),
-                    default_primary_index=resolved_primary,
-                )
-                return {
-                    "prompt": final_prompt,
-                    "metadata": metadata,
-                    "character_assignment": {
-                        "primary_index": resolved_primary,
-                        "related_indexes": resolved_related,
-                        "confidence": max(0.0, min(1.0, float((parsed or {}).get("character_confidence", 0.0) or 0.0))),
-                        "reason": _clean_text(str((parsed or {}).get("character_reason", "")), 240),
-                    },
-                    "tts_sentence_plan": sentence_plan,
-                }
-    except Exception:
+        streamed: dict[str, object] = {}
+
+        def handle_field(key: str, index: int | None, value: object) -> None:
+            if index is not None or on_partial is None:
+                return
+            streamed[key] = value
+            if _PARTIAL_BUNDLE_FIELDS.issubset(streamed):
+                partial = _bundle_from_parsed(prepared, dict(streamed))
+                if partial is not None:
+                    on_partial(partial, set(streamed))
+
+        content = await stream_chat_json(payload, purpose="segment_image_bundle", timeout=30, on_event=handle_field)
+        breaker.record_success()
+        bundle = _bundle_from_parsed(prepared, _extract_json_object(content))
+        if bundle is not None:
+            return bundle
+    except Exception as exc:
+        if isinstance(exc, httpx.HTTPError):
+            breaker.record_failure()
         logger.exception("LLM image prompt/metadata build failed, using fallback bundle")
 
     return fallback_bundle
 
 
+async def build_segment_image_bundles(
+    items: list[dict],
+    model_id: str | None,
+    story_world_context: str | None = None,
+    character_candidates: list[CharacterSuggestion] | None = None,
+    on_bundle: Callable[[int, dict], None] | None = None,
+    on_partial: Callable[[int, dict, set[str]], None] | None = None,
+) -> list[dict]:
+    # items: consecutive segments, each holding the per-segment keyword arguments of build_segment_image_bundle.
+    # on_partial gets an entry's bundle as soon as its prompt and character indexes have streamed in.
+    async def single(item: dict, position: int) -> dict:
+        return await build_segment_image_bundle(
+            model_id=model_id,
+            story_world_context=story_world_context,
+            character_candidates=character_candidates,
+            on_partial=(lambda bundle, fields: on_partial(position, bundle, fields)) if on_partial is not None else None,
+            **item,
+        )
+
+    async def single_at(position: int) -> dict:
+        bundle = await single(items[position], position)
+        if on_bundle is not None:
+            on_bundle(position, bundle)
+        return bundle
+
+    if len(items) <= 1 or not settings.llm_api_key:
+        return list(await asyncio.gather(*(single_at(position) for position in range(len(items)))))
+
+    prepared_items = [
+        _prepare_segment_bundle(
+            story_world_context=story_world_context,
+            character_candidates=character_candidates,
+            **item,
+        )
+        for item in items
+    ]
+    segment_entries: list[dict] = []
+    for position, prepared in enumerate(prepared_items):
+        entry = {"segment_id": position, **prepared["segment_body"]}
+        # Neighbours inside the batch already carry each other's text; only the batch edges need adjacent context.
+        entry["adjacent_context"] = {
+            "previous_segment": entry["adjacent_context"]["previous_segment"] if position == 0 else "",
+            "next_segment": entry["adjacent_context"]["next_segment"] if position == len(prepared_items) - 1 else "",
+        }
+        segment_entries.append(entry)
+
+    request_body = {
+        "task": "build_image_prompts_for_consecutive_story_segments",
+        "rules": list(SEGMENT_IMAGE_BUNDLE_RULES) + list(SEGMENT_IMAGE_BUNDLE_BATCH_RULES),
+        "story_world_context": _clean_text(story_world_context, 320),
+        "character_candidates": _character_candidates_payload(prepared_items[0]["candidates"]),
+        "segments": segment_entries,
+        "output_schema": {"bundles": [{"segment_id": 0, **_SEGMENT_BUNDLE_OUTPUT_SCHEMA}]},
+    }
+    payload = {
+        "model": model_id or settings.llm_default_model,
+        "messages": [
+            {"role": "system", "content": STRICT_JSON_SYSTEM_PROMPT},
+            {"role": "user", "content": json.dumps(request_body, ensure_ascii=False)},
+        ],
+        "temperature": 0.15,
+    }
+
+    breaker = get_circuit_breaker(LLM_CIRCUIT)
+    if not breaker.allow():
+        logger.info("LLM circuit open, using fallback image bundles for %s segments", len(items))
+        return [prepared["fallback_bundle"] for prepared in prepared_items]
+
+    results: list[dict | None] = [None] * len(items)
+    # Members of the entry currently being written, keyed by array position; segment_id comes first in the schema.
+    streamed: dict[int, dict[str, object]] = {}
+    announced: set[int] = set()
+
+    def accept(raw: object) -> None:
+        if not isinstance(raw, dict):
+            return
+        position = _normalize_index(raw.get("segment_id"), len(items))
+        if position is None or results[position] is not None:
+            return
+        results[position] = _bundle_from_parsed(prepared_items[position], raw)
+        if results[position] is not None and on_bundle is not None:
+            on_bundle(position, results[position])
+
+    def handle_field(key: str, index: int | None, value: object) -> None:
+        if key == "bundles" and index is not None:
+            streamed.pop(index, None)
+            accept(value)
+            return
+        if on_partial is None or index is None or not key.startswith("bundles."):
+            return
+        fields = streamed.setdefault(index, {})
+        fields[key[len("bundles."):]] = value
+        position = _normalize_index(fields.get("segment_id"), len(items))
+        if position is None or position in announced or results[position] is not None:
+            return
+        if _PARTIAL_BUNDLE_FIELDS.issubset(fields):
+            partial = _bundle_from_parsed(prepared_items[position], dict(fields))
+            if partial is not None:
+                announced.add(position)
+                on_partial(position, partial, set(fields))
+
+    try:
+        content = await stream_chat_json(
+            payload,
+            purpose="segment_image_bundle_batch",
+            timeout=min(120, 30 + 20 * (len(items) - 1)),
+            on_event=handle_field,
+            item_fields=on_partial is not None,
+        )
+        breaker.record_success()
+        parsed = _extract_json_object(content) or {}
+        raw_bundles = parsed.get("bundles") if isinstance(parsed.get("bundles"), list) else []
+        for raw in raw_bundles:
+            accept(raw)
+    except Exception as exc:
+        if isinstance(exc, httpx.HTTPError):
+            breaker.record_failure()
+        logger.exception("Batched image prompt/metadata build failed for %s segments, retrying one by one", len(items))
+
+    missing = [position for position, bundle in enumerate(results) if bundle is None]
+    if missing:
+        logger.info("Batched image bundle returned %s/%s valid entries, rebuilding the rest singly", len(items) - len(missing), len(items))
+        rebuilt = await asyncio.gather(*(single_at(position) for position in missing))
+        for position, bundle in zip(missing, rebuilt):
+            results[position] = bundle
+    return [bundle for bundle in results if bundle is not None]
+
+
 async def build_segment_image_prompt(
     character: CharacterSuggestion,
     segment_text: str,
@@ -1027,30 +1390,26 @@ async def generate_novel_aliases(text: str, count: int, model_id: str | None) ->
         ],
         "temperature": 0.85,
     }
-    headers = {
-        "Authorization": f"Bearer {settings.llm_api_key}",
-        "Content-Type": "application/json",
-    }
 
     try:
-        async with httpx.AsyncClient(timeout=60) as client:
-            response = await client.post(_base_url("/chat/completions"), headers=headers, json=payload)
-            if response.status_code >= 400:
-                detail = _response_error_message(response)
-                raise LLMServiceError(f"LLM alias generation failed ({response.status_code}): {detail}")
-            body = response.json()
-            content = body["choices"][0]["message"]["content"]
-            parsed = _extract_json_object(content) or {}
-            aliases = parsed.get("aliases") if isinstance(parsed, dict) else []
-            if not isinstance(aliases, list):
-                aliases = []
-
-            normalized = _dedupe([str(item) for item in aliases])
-            if len(normalized) < wanted:
-                raise LLMServiceError(
-                    f"LLM alias generation returned insufficient valid aliases ({len(normalized)}/{wanted})"
-                )
-            return normalized[:wanted], selected_model
+        # Aliases are sampled at high temperature and callers regenerate to get fresh ones, so never replay them.
+        response = await llm_chat_completion(payload, purpose="novel_aliases", timeout=60, use_cache=False)
+        if response.status_code >= 400:
+            detail = _response_error_message(response)
+            raise LLMServiceError(f"LLM alias generation failed ({response.status_code}): {detail}")
+        body = response.json()
+        content = body["choices"][0]["message"]["content"]
+        parsed = _extract_json_object(content) or {}
+        aliases = parsed.get("aliases") if isinstance(parsed, dict) else []
+        if not isinstance(aliases, list):
+            aliases = []
+
+        normalized = _dedupe([str(item) for item in aliases])
+        if len(normalized) < wanted:
+            raise LLMServiceError(
+                f"LLM alias generation returned insufficient valid aliases ({len(normalized)}/{wanted})"
+            )
+        return normalized[:wanted], selected_model
     except LLMServiceError:
         raise
     except Exception as exc:
@@ -1162,51 +1521,46 @@ async def analyze_characters(text: str, depth: str, model_id: str | None) -> tup
         ],
         "temperature": 0.2,
     }
-    headers = {
-        "Authorization": f"Bearer {settings.llm_api_key}",
-        "Content-Type": "application/json",
-    }
 
     try:
-        async with httpx.AsyncClient(timeout=60) as client:
-            response = await client.post(_base_url("/chat/completions"), headers=headers, json=payload)
-            if response.status_code >= 400:
-                detail = _response_error_message(response)
-                raise LLMServiceError(f"LLM character analysis failed ({response.status_code}): {detail}")
-            body = response.json()
-            content = body["choices"][0]["message"]["content"]
-            parsed = _extract_json_object(content)
-            if not parsed:
-                raise LLMServiceError("LLM returned unparseable JSON")
-
-            raw_items = parsed.get("characters") or []
-            confidence = float(parsed.get("confidence", 0.75))
-
-            characters: list[CharacterSuggestion] = []
-            for item in raw_items:
-                role = str(item.get("role", "supporting"))
-                gender = _normalize_character_gender(item.get("gender"))
-                personality = str(item.get("personality", ""))
-                voice_id = _normalize_voice_id(item.get("voice_id"), role, personality, gender=gender)
-                characters.append(
-                    CharacterSuggestion(
-                        name=str(item.get("name", "character")),
-                        role=role,
-                        gender=gender,
-                        importance=max(1, min(10, int(item.get("importance", 5)))),
-                        is_main_character=_as_bool(item.get("is_main_character")),
-                        is_story_self=_as_bool(item.get("is_story_self")),
-                        appearance=str(item.get("appearance", "")),
-                        personality=personality,
-                        voice_id=voice_id,
-                        base_prompt=str(item.get("base_prompt", f"{item.get('name', 'character')} portrait")),
-                    )
+        response = await llm_chat_completion(payload, purpose="character_analysis", timeout=60)
+        if response.status_code >= 400:
+            detail = _response_error_message(response)
+            raise LLMServiceError(f"LLM character analysis failed ({response.status_code}): {detail}")
+        body = response.json()
+        content = body["choices"][0]["message"]["content"]
+        parsed = _extract_json_object(content)
+        if not parsed:
+            raise LLMServiceError("LLM returned unparseable JSON")
+
+        raw_items = parsed.get("characters") or []
+        confidence = float(parsed.get("confidence", 0.75))
+
+        characters: list[CharacterSuggestion] = []
+        for item in raw_items:
+            role = str(item.get("role", "supporting"))
+            gender = _normalize_character_gender(item.get("gender"))
+            personality = str(item.get("personality", ""))
+            voice_id = _normalize_voice_id(item.get("voice_id"), role, personality, gender=gender)
+            characters.append(
+                CharacterSuggestion(
+                    name=str(item.get("name", "character")),
+                    role=role,
+                    gender=gender,
+                    importance=max(1, min(10, int(item.get("importance", 5)))),
+                    is_main_character=_as_bool(item.get("is_main_character")),
+                    is_story_self=_as_bool(item.get("is_story_self")),
+                    appearance=str(item.get("appearance", "")),
+                    personality=personality,
+                    voice_id=voice_id,
+                    base_prompt=str(item.get("base_prompt", f"{item.get('name', 'character')} portrait")),
                 )
+            )
 
-            if not characters:
-                raise LLMServiceError("LLM returned empty characters")
-            _normalize_identity_flags(characters, source_text=text)
-            return characters, max(0.0, min(1.0, confidence)), selected_model
+        if not characters:
+            raise LLMServiceError("LLM returned empty characters")
+        _normalize_identity_flags(characters, source_text=text)
+        return characters, max(0.0, min(1.0, confidence)), selected_model
     except LLMServiceError:
         raise
     except Exception as exc:
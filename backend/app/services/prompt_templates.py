@@ -40,9 +40,17 @@ SEGMENT_IMAGE_BUNDLE_RULES = (
     "Environmental/prop text is allowed only when naturally required by the scene (e.g. signs, labels).",
     "Do not add speech bubbles, dialogue balloons, subtitle-like dialogue text, or character conversation captions.",
     "If any visible words/labels/signage/onomatopoeia are used in the image, they must use English letters only.",
+    "Emit the JSON keys in exactly the order given in output_schema.",
     "No markdown, no explanation.",
 )
 
+SEGMENT_IMAGE_BUNDLE_BATCH_RULES = (
+    "segments are consecutive in story order; use neighbouring entries as each other's adjacent context.",
+    "Return exactly one entry in bundles per input segment, echoing its segment_id.",
+    "Each bundle describes only its own current_segment; sentence_index values refer to that segment's tts_sentence_units.",
+    "character_candidates indexes are shared by all segments.",
+)
+
 
 def build_story_world_summary_prompt(text: str) -> str:
     return (
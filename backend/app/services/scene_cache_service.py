@@ -12,16 +12,21 @@ from pathlib import Path
 from uuid import uuid4
 
 import httpx
+import numpy as np
 from PIL import Image
 
 from ..config import project_path, settings
 from ..models import CharacterSuggestion
+from .circuit_breaker_service import LLM_CIRCUIT, get_circuit_breaker
+from .image_variant_service import link_image_variant
+from .llm_client_service import stream_chat_json
 from .prompt_templates import SCENE_REUSE_SELECTOR_RULES, SCENE_REUSE_SELECTOR_SYSTEM_PROMPT
 
 
 logger = logging.getLogger(__name__)
 
 _CACHE_LOCK = threading.Lock()
+_DHASH_BACKFILL_LIMIT = 64
 
 
 def _db_path() -> Path:
@@ -74,6 +79,8 @@ def _ensure_db_schema(conn: sqlite3.Connection) -> None:
         conn.execute("ALTER TABLE scene_entries ADD COLUMN primary_ref_image_id TEXT NOT NULL DEFAULT ''")
     if "is_scene_only" not in entry_cols:
         conn.execute("ALTER TABLE scene_entries ADD COLUMN is_scene_only INTEGER NOT NULL DEFAULT 0")
+    if "image_dhash" not in entry_cols:
+        conn.execute("ALTER TABLE scene_entries ADD COLUMN image_dhash TEXT NOT NULL DEFAULT ''")
 
     binding_cols = {str(row[1]) for row in conn.execute("PRAGMA table_info(scene_entry_ref_bindings)").fetchall()}
     if "ref_image_id" not in binding_cols:
@@ -130,7 +137,7 @@ def _profile_reference_image_ids(payload: dict) -> list[str]:
     return [item for item in _normalize_reference_image_ids(derived_ids) if item]
 
 
-def _entry_to_db_tuple(entry: dict) -> tuple[str, str, str, str, str, str, str, str, str, int]:
+def _entry_to_db_tuple(entry: dict) -> tuple[str, str, str, str, str, str, str, str, str, int, str]:
     descriptor = entry.get("descriptor") or {}
     profile = entry.get("match_profile") or {}
     ref_paths = _profile_reference_image_paths(profile) or _profile_reference_image_paths(descriptor)
@@ -150,6 +157,7 @@ def _entry_to_db_tuple(entry: dict) -> tuple[str, str, str, str, str, str, str,
         ref_path,
         char_name,
         scene_only,
+        str(entry.get("image_dhash") or ""),
     )
 
 
@@ -227,8 +235,9 @@ def _insert_entry_to_db(conn: sqlite3.Connection, entry: dict) -> None:
     conn.execute(
         """
         INSERT OR REPLACE INTO scene_entries(
-            id, created_at, image_path, prompt, descriptor_json, match_profile_json, primary_ref_image_id, reference_image_path, character_name, is_scene_only
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            id, created_at, image_path, prompt, descriptor_json, match_profile_json, primary_ref_image_id, reference_image_path, character_name, is_scene_only,
+            image_dhash
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
         _entry_to_db_tuple(entry),
     )
@@ -868,7 +877,6 @@ async def _llm_match_candidate(
     if not settings.llm_api_key or not candidates:
         return None, "llm disabled or no candidates"
 
-    url = f"{settings.llm_api_base_url.rstrip('/')}/chat/completions"
     model = model_id or settings.llm_default_model
     prompt = {
         "task": "select_reusable_scene_image",
@@ -930,20 +938,30 @@ async def _llm_match_candidate(
         ],
         "temperature": 0.0,
     }
-    headers = {
-        "Authorization": f"Bearer {settings.llm_api_key}",
-        "Content-Type": "application/json",
-    }
+
+    breaker = get_circuit_breaker(LLM_CIRCUIT)
+    if not breaker.allow():
+        return None, "llm circuit open"
+    rejected_early = False
+
+    def handle_field(key: str, index: int | None, value: object) -> bool:
+        nonlocal rejected_early
+        # should_reuse leads the schema; a rejection makes the rest of the answer irrelevant.
+        if key == "should_reuse" and index is None and not _as_bool(value):
+            rejected_early = True
+        return rejected_early
 
     try:
-        async with httpx.AsyncClient(timeout=45) as client:
-            response = await client.post(url, headers=headers, json=payload)
-            response.raise_for_status()
-            content = response.json()["choices"][0]["message"]["content"]
-    except Exception:
+        content = await stream_chat_json(payload, purpose="scene_cache_match", timeout=45, on_event=handle_field)
+        breaker.record_success()
+    except Exception as exc:
+        if isinstance(exc, httpx.HTTPError):
+            breaker.record_failure()
         logger.exception("LLM scene cache matching failed")
         return None, "llm request failed"
 
+    if rejected_early:
+        return None, "llm says no match"
     parsed = _parse_json_object(content)
     if not parsed:
         return None, "llm response unparsable"
@@ -1266,6 +1284,92 @@ async def force_llm_select_scene_image(
     }
 
 
+def _image_dhash(path: Path) -> str:
+    # 64-bit difference hash: compare neighbouring pixels of a 9x8 grayscale thumbnail.
+    with Image.open(path) as raw:
+        thumb = raw.convert("L").resize((9, 8), Image.Resampling.LANCZOS)
+    pixels = np.asarray(thumb, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return f"{int(''.join('1' if bit else '0' for bit in bits), 2):016x}"
+
+
+def _dhash_distance(left: str, right: str) -> int:
+    return bin(int(left, 16) ^ int(right, 16)).count("1")
+
+
+def _merge_descriptors(existing: dict, incoming: dict) -> dict:
+    merged = dict(existing)
+    for key in ("action_hint", "location_hint", "mood", "shot_type", "character_role"):
+        if not merged.get(key) and incoming.get(key):
+            merged[key] = incoming[key]
+    for key in ("scene_elements", "action_keywords", "location_keywords", "reference_image_paths", "reference_image_ids"):
+        merged[key] = [*(existing.get(key) or []), *(incoming.get(key) or [])]
+    if len(str(incoming.get("segment_text") or "")) > len(str(existing.get("segment_text") or "")):
+        merged["segment_text"] = incoming.get("segment_text")
+    return _normalize_scene_descriptor(merged)
+
+
+_NEAR_DUPLICATE_COLUMNS = "id, created_at, image_path, prompt, descriptor_json, match_profile_json, image_dhash"
+
+
+def _near_duplicate_candidates(conn: sqlite3.Connection, probe_row: tuple) -> list[sqlite3.Row]:
+    if int(settings.scene_cache_dhash_threshold) < 0:
+        return []
+    primary_ref_image_id, character_name, scene_only = probe_row[6], probe_row[8], probe_row[9]
+    if primary_ref_image_id:
+        where, params = "primary_ref_image_id = ?", (primary_ref_image_id,)
+    else:
+        where, params = "primary_ref_image_id = '' AND character_name = ? AND is_scene_only = ?", (character_name, scene_only)
+    return conn.execute(
+        f"""
+        SELECT {_NEAR_DUPLICATE_COLUMNS}
+        FROM scene_entries
+        WHERE {where}
+        ORDER BY created_at DESC
+        """,
+        params,
+    ).fetchall()
+
+
+def _pick_near_duplicate(rows: list[sqlite3.Row], image_hash: str) -> tuple[sqlite3.Row | None, str, dict[str, str]]:
+    # Runs without _CACHE_LOCK: decoding images for the hash backfill must not block other cache users.
+    threshold = int(settings.scene_cache_dhash_threshold)
+    best: tuple[int, sqlite3.Row, str] | None = None
+    backfilled: dict[str, str] = {}
+    for row in rows:
+        candidate_hash = str(row["image_dhash"] or "")
+        if not candidate_hash:
+            # Entries saved before hashing existed get a hash the first time they are compared.
+            if len(backfilled) >= _DHASH_BACKFILL_LIMIT:
+                continue
+            candidate_path = Path(str(row["image_path"] or ""))
+            if not candidate_path.exists():
+                continue
+            try:
+                candidate_hash = _image_dhash(candidate_path)
+            except Exception:
+                continue
+            backfilled[str(row["id"])] = candidate_hash
+        distance = _dhash_distance(image_hash, candidate_hash)
+        if distance <= threshold and (best is None or distance < best[0]):
+            best = (distance, row, candidate_hash)
+            if distance == 0:
+                break
+    if best is None or not Path(str(best[1]["image_path"] or "")).exists():
+        return None, "", backfilled
+    return best[1], best[2], backfilled
+
+
+def _copy_into_cache(source: Path) -> Path:
+    image_root = _cache_image_root()
+    image_root.mkdir(parents=True, exist_ok=True)
+    suffix = source.suffix.lower() or ".png"
+    filename = f"scene_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:8]}{suffix}"
+    target = image_root / filename
+    shutil.copy2(source, target)
+    return target
+
+
 def save_scene_image_cache_entry(
     scene_descriptor: dict,
     source_image_path: str | Path,
@@ -1276,29 +1380,72 @@ def save_scene_image_cache_entry(
     if not source.exists():
         return None
 
-    image_root = _cache_image_root()
-    image_root.mkdir(parents=True, exist_ok=True)
-    suffix = source.suffix.lower() or ".png"
-    filename = f"scene_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:8]}{suffix}"
-    target = image_root / filename
-
-    shutil.copy2(source, target)
+    image_hash = ""
+    try:
+        image_hash = _image_dhash(source)
+    except Exception:
+        logger.warning("Failed to hash scene image, storing without dedup: %s", source, exc_info=True)
 
     normalized_descriptor = _normalize_scene_descriptor(scene_descriptor)
     match_profile = _build_match_profile(normalized_descriptor)
     entry = {
         "id": uuid4().hex,
         "created_at": datetime.now(timezone.utc).isoformat(),
-        "image_path": target.as_posix(),
+        "image_path": "",
         "prompt": _normalize_text(match_profile.get("scene_summary", "") or prompt)[:220],
         "descriptor": normalized_descriptor,
         "match_profile": match_profile,
+        "image_dhash": image_hash,
     }
 
+    # The lock only covers queries and writes; hashing candidates and copying the image happen between them.
+    candidates: list[sqlite3.Row] = []
+    if image_hash:
+        with _CACHE_LOCK:
+            conn = _connect_db()
+            try:
+                _ensure_db_schema(conn)
+                candidates = _near_duplicate_candidates(conn, _entry_to_db_tuple(entry))
+            finally:
+                conn.close()
+    duplicate_row, duplicate_hash, backfilled = _pick_near_duplicate(candidates, image_hash) if candidates else (None, "", {})
+    copied: Path | None = None
+    if duplicate_row is None:
+        copied = _copy_into_cache(source)
+
     with _CACHE_LOCK:
         conn = _connect_db()
         try:
             _ensure_db_schema(conn)
+            if backfilled:
+                conn.executemany(
+                    "UPDATE scene_entries SET image_dhash = ? WHERE id = ?",
+                    [(value, key) for key, value in backfilled.items()],
+                )
+            if duplicate_row is not None:
+                # Re-read under the lock: the entry may have been pruned or merged into since the scan.
+                current = conn.execute(
+                    f"SELECT {_NEAR_DUPLICATE_COLUMNS} FROM scene_entries WHERE id = ?",
+                    (str(duplicate_row["id"]),),
+                ).fetchone()
+                if current is not None:
+                    existing = _db_row_to_entry(current)
+                    merged_descriptor = _merge_descriptors(existing.get("descriptor") or {}, normalized_descriptor)
+                    merged = {
+                        **existing,
+                        "created_at": entry["created_at"],
+                        "descriptor": merged_descriptor,
+                        "match_profile": _build_match_profile(merged_descriptor),
+                        "image_dhash": duplicate_hash,
+                    }
+                    _insert_entry_to_db(conn, merged)
+                    conn.commit()
+                    logger.info("Scene cache near-duplicate merged into entry %s (dhash=%s)", merged["id"], image_hash)
+                    # The caller keeps its own freshly generated image; only the metadata was merged.
+                    return {**merged, "merged": True}
+                copied = _copy_into_cache(source)
+
+            entry["image_path"] = copied.as_posix()
             _insert_entry_to_db(conn, entry)
             _prune_db_entries(conn, keep=3000)
             conn.commit()
@@ -1317,6 +1464,11 @@ def render_cached_image_to_output(
     dst = Path(output_path)
     dst.parent.mkdir(parents=True, exist_ok=True)
 
+    try:
+        return link_image_variant(src, dst, resolution)
+    except Exception:
+        logger.exception("Failed to prepare image variant, fallback to re-encode: %s", src)
+
     image = Image.open(src).convert("RGB")
     image.save(dst)
     return dst
@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from ..config import project_path, settings
+
+
+logger = logging.getLogger(__name__)
+
+_CACHE_LOCK = threading.Lock()
+_STATS_LOCK = threading.Lock()
+_STATS = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+
+def _db_path() -> Path:
+    return project_path(settings.tts_cache_db_path)
+
+
+def _audio_dir() -> Path:
+    return project_path(settings.tts_cache_dir)
+
+
+def _budget_bytes() -> int:
+    return max(0, int(settings.tts_cache_max_mb)) * 1024 * 1024
+
+
+def tts_cache_enabled() -> bool:
+    return _budget_bytes() > 0
+
+
+def _connect_db() -> sqlite3.Connection:
+    path = _db_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    return conn
+
+
+def _ensure_db_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tts_entries (
+            cache_key TEXT PRIMARY KEY,
+            provider TEXT NOT NULL,
+            voice TEXT NOT NULL,
+            file_name TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            duration REAL NOT NULL,
+            created_at REAL NOT NULL,
+            last_access_at REAL NOT NULL,
+            hit_count INTEGER NOT NULL DEFAULT 0,
+            boundaries_json TEXT NOT NULL DEFAULT '[]'
+        )
+        """
+    )
+    # compatibility with tables created before boundary metadata was stored
+    entry_cols = {str(row[1]) for row in conn.execute("PRAGMA table_info(tts_entries)").fetchall()}
+    if "boundaries_json" not in entry_cols:
+        conn.execute("ALTER TABLE tts_entries ADD COLUMN boundaries_json TEXT NOT NULL DEFAULT '[]'")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tts_entries_last_access ON tts_entries(last_access_at)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tts_duration_samples (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            voice TEXT NOT NULL,
+            spoken_chars INTEGER NOT NULL,
+            pause_marks INTEGER NOT NULL,
+            duration REAL NOT NULL,
+            created_at REAL NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tts_duration_samples_voice ON tts_duration_samples(voice, id)")
+    conn.commit()
+
+
+def _bump_stat(name: str, amount: int = 1) -> None:
+    with _STATS_LOCK:
+        _STATS[name] = int(_STATS.get(name, 0)) + amount
+
+
+def normalize_tts_text(text: str) -> str:
+    return " ".join(str(text or "").split())
+
+
+def tts_cache_key(text: str, voice: str, provider: str, rate: str = "", pitch: str = "") -> str:
+    payload = json.dumps(
+        [normalize_tts_text(text), str(voice or "").strip(), str(provider or "").strip(), str(rate or ""), str(pitch or "")],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_path(file_name: str) -> Path:
+    return _audio_dir() / file_name[:2] / file_name
+
+
+def _copy_audio(source: Path, target: Path) -> None:
+    # Always copy: segment audio is rewritten in place on reruns and must not share an inode with the cache.
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_target = target.with_name(f"{target.name}.tmp")
+    shutil.copyfile(source, temp_target)
+    temp_target.replace(target)
+
+
+def load_cached_tts(
+    text: str,
+    voice: str,
+    candidates: list[tuple[str, str, str]],
+    output_path: Path,
+) -> tuple[Path, float, str, list[dict]] | None:
+    if not tts_cache_enabled() or not candidates:
+        return None
+
+    try:
+        with _CACHE_LOCK:
+            conn = _connect_db()
+            try:
+                _ensure_db_schema(conn)
+                for provider, rate, pitch in candidates:
+                    cache_key = tts_cache_key(text, voice, provider, rate, pitch)
+                    row = conn.execute(
+                        "SELECT file_name, duration, boundaries_json FROM tts_entries WHERE cache_key = ?",
+                        (cache_key,),
+                    ).fetchone()
+                    if row is None:
+                        continue
+                    cached_path = _entry_path(str(row["file_name"]))
+                    if not cached_path.exists() or cached_path.stat().st_size <= 0:
+                        conn.execute("DELETE FROM tts_entries WHERE cache_key = ?", (cache_key,))
+                        conn.commit()
+                        continue
+
+                    conn.execute(
+                        "UPDATE tts_entries SET last_access_at = ?, hit_count = hit_count + 1 WHERE cache_key = ?",
+                        (time.time(), cache_key),
+                    )
+                    conn.commit()
+                    break
+                else:
+                    _bump_stat("misses")
+                    return None
+            finally:
+                conn.close()
+
+        _copy_audio(cached_path, output_path)
+        _bump_stat("hits")
+        try:
+            boundaries = json.loads(str(row["boundaries_json"] or "[]"))
+        except Exception:
+            boundaries = []
+        return output_path, float(row["duration"] or 0.0), provider, boundaries if isinstance(boundaries, list) else []
+    except Exception:
+        logger.exception("TTS cache lookup failed: voice=%s", voice)
+        return None
+
+
+def _evict_over_budget(conn: sqlite3.Connection) -> None:
+    budget = _budget_bytes()
+    total_row = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) AS total FROM tts_entries").fetchone()
+    total = int((total_row["total"] if total_row else 0) or 0)
+    if total <= budget:
+        return
+
+    evicted = 0
+    rows = conn.execute("SELECT cache_key, file_name, size_bytes FROM tts_entries ORDER BY last_access_at ASC").fetchall()
+    for row in rows:
+        if total <= budget:
+            break
+        _entry_path(str(row["file_name"])).unlink(missing_ok=True)
+        conn.execute("DELETE FROM tts_entries WHERE cache_key = ?", (str(row["cache_key"]),))
+        total -= int(row["size_bytes"] or 0)
+        evicted += 1
+    if evicted:
+        _bump_stat("evictions", evicted)
+        logger.info("TTS cache evicted %s entries to stay under %s MB", evicted, settings.tts_cache_max_mb)
+
+
+def store_cached_tts(
+    text: str,
+    voice: str,
+    provider: str,
+    audio_path: Path,
+    duration: float,
+    rate: str = "",
+    pitch: str = "",
+    boundaries: list[dict] | None = None,
+) -> None:
+    if not tts_cache_enabled() or duration <= 0:
+        return
+
+    cache_key = tts_cache_key(text, voice, provider, rate, pitch)
+    file_name = f"{cache_key}{audio_path.suffix.lower() or '.mp3'}"
+    try:
+        size_bytes = int(audio_path.stat().st_size)
+        if size_bytes <= 0:
+            return
+        _copy_audio(audio_path, _entry_path(file_name))
+        now = time.time()
+        with _CACHE_LOCK:
+            conn = _connect_db()
+            try:
+                _ensure_db_schema(conn)
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO tts_entries
+                        (cache_key, provider, voice, file_name, size_bytes, duration, created_at, last_access_at, hit_count, boundaries_json)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?)
+                    """,
+                    (
+                        cache_key,
+                        provider,
+                        voice,
+                        file_name,
+                        size_bytes,
+                        float(duration),
+                        now,
+                        now,
+                        json.dumps(boundaries or [], ensure_ascii=False),
+                    ),
+                )
+                _evict_over_budget(conn)
+                conn.commit()
+            finally:
+                conn.close()
+        _bump_stat("stores")
+    except Exception:
+        logger.exception("TTS cache store failed: provider=%s voice=%s", provider, voice)
+
+
+def record_duration_sample(voice: str, spoken_chars: int, pause_marks: int, duration: float, keep_per_voice: int = 2000) -> None:
+    if spoken_chars <= 0 or duration <= 0:
+        return
+    try:
+        with _CACHE_LOCK:
+            conn = _connect_db()
+            try:
+                _ensure_db_schema(conn)
+                conn.execute(
+                    """
+                    INSERT INTO tts_duration_samples (voice, spoken_chars, pause_marks, duration, created_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (voice, int(spoken_chars), int(pause_marks), float(duration), time.time()),
+                )
+                conn.execute(
+                    """
+                    DELETE FROM tts_duration_samples
+                    WHERE voice = ? AND id IN (
+                        SELECT id FROM tts_duration_samples
+                        WHERE voice = ?
+                        ORDER BY id DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (voice, voice, int(max(1, keep_per_voice))),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+    except Exception:
+        logger.exception("Failed to record TTS duration sample: voice=%s", voice)
+
+
+def load_duration_samples(voice: str | None = None, limit: int = 500) -> list[tuple[int, int, float]]:
+    try:
+        with _CACHE_LOCK:
+            conn = _connect_db()
+            try:
+                _ensure_db_schema(conn)
+                if voice:
+                    rows = conn.execute(
+                        """
+                        SELECT spoken_chars, pause_marks, duration FROM tts_duration_samples
+                        WHERE voice = ? ORDER BY id DESC LIMIT ?
+                        """,
+                        (voice, int(limit)),
+                    ).fetchall()
+                else:
+                    rows = conn.execute(
+                        "SELECT spoken_chars, pause_marks, duration FROM tts_duration_samples ORDER BY id DESC LIMIT ?",
+                        (int(limit),),
+                    ).fetchall()
+            finally:
+                conn.close()
+    except Exception:
+        logger.exception("Failed to load TTS duration samples: voice=%s", voice)
+        return []
+    return [(int(row["spoken_chars"]), int(row["pause_marks"]), float(row["duration"])) for row in rows]
+
+
+def tts_cache_stats() -> dict:
+    with _STATS_LOCK:
+        counters = dict(_STATS)
+    lookups = counters["hits"] + counters["misses"]
+    stats = {
+        **counters,
+        "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+        "enabled": tts_cache_enabled(),
+        "budget_bytes": _budget_bytes(),
+        "entries": 0,
+        "total_bytes": 0,
+    }
+    if not tts_cache_enabled():
+        return stats
+    try:
+        with _CACHE_LOCK:
+            conn = _connect_db()
+            try:
+                _ensure_db_schema(conn)
+                row = conn.execute("SELECT COUNT(1) AS cnt, COALESCE(SUM(size_bytes), 0) AS total FROM tts_entries").fetchone()
+            finally:
+                conn.close()
+        stats["entries"] = int(row["cnt"] or 0)
+        stats["total_bytes"] = int(row["total"] or 0)
+    except Exception:
+        logger.exception("Failed to read TTS cache stats")
+    return stats
@@ -2,24 +2,124 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import re
+import threading
 import wave
+import weakref
 from pathlib import Path
 
-import httpx
+import numpy as np
 from edge_tts import Communicate
 from mutagen import File as MutagenFile
 
 from ..config import settings
+from .audio_assembly_service import spoken_char_count, tts_timing_path, write_tts_timing
+from .circuit_breaker_service import TTS_EDGE_CIRCUIT, TTS_REMOTE_CIRCUIT, get_circuit_breaker
+from .http_client_service import get_http_client, http_request_extensions, record_bytes_streamed
+from .tts_cache_service import load_cached_tts, load_duration_samples, record_duration_sample, store_cached_tts
 
 
 logger = logging.getLogger(__name__)
 
+_EDGE_PROVIDER = "edge-tts"
+_EDGE_RATE = "+0%"
+_EDGE_PITCH = "+0Hz"
+_EDGE_BOUNDARY = "WordBoundary"
+# edge-tts streams audio-24khz-48kbitrate-mono-mp3, a constant bitrate, so byte count gives the duration.
+_EDGE_MP3_BYTES_PER_SECOND = 48000 / 8
+_EDGE_TICKS_PER_SECOND = 10_000_000
+_PAUSE_MARK_PATTERN = re.compile(r"[\uff0c\u3002\uff01\uff1f\uff1b\uff1a\u3001\u2026\u2014,.!?;:\n]")
+_DURATION_MODEL_MIN_SAMPLES = 12
+_DURATION_MODEL_REFIT_EVERY = 25
+_DURATION_MODEL_LOCK = threading.Lock()
+# voice ("" = all voices) -> (least-squares coefficients or None, samples recorded since the fit, refit after)
+_DURATION_MODELS: dict[str, tuple[np.ndarray | None, int, int]] = {}
+_REMOTE_CLIENT_NAME = "tts-remote"
+
+
+_PROVIDER_SEMAPHORES: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class TTSServiceError(RuntimeError):
+    pass
+
+
+def _remote_provider() -> str:
+    return f"remote:{settings.tts_api_url}"
+
+
+def _provider_semaphore(provider: str) -> asyncio.Semaphore:
+    # Jobs run on their own event loops, so the cap is tracked per loop.
+    loop = asyncio.get_running_loop()
+    per_loop = _PROVIDER_SEMAPHORES.setdefault(loop, {})
+    semaphore = per_loop.get(provider)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, int(settings.tts_max_concurrency)))
+        per_loop[provider] = semaphore
+    return semaphore
+
 
 def _estimate_duration_by_text(text: str) -> float:
     chars = max(len(text), 1)
     return max(chars * 0.22, 1.5)
 
 
+def _duration_features(text: str) -> tuple[int, int]:
+    return spoken_char_count(text), len(_PAUSE_MARK_PATTERN.findall(str(text or "")))
+
+
+def _fit_duration_model(samples: list[tuple[int, int, float]]) -> np.ndarray | None:
+    if len(samples) < _DURATION_MODEL_MIN_SAMPLES:
+        return None
+    features = np.array([[chars, pauses, 1.0] for chars, pauses, _ in samples], dtype=float)
+    targets = np.array([duration for _, _, duration in samples], dtype=float)
+    coefficients, *_ = np.linalg.lstsq(features, targets, rcond=None)
+    # A non-positive per-character rate means the samples are degenerate; keep the flat estimate.
+    if not np.isfinite(coefficients).all() or coefficients[0] <= 0:
+        return None
+    return coefficients
+
+
+def _duration_model(voice: str) -> np.ndarray | None:
+    with _DURATION_MODEL_LOCK:
+        cached = _DURATION_MODELS.get(voice)
+    if cached is not None and cached[1] < cached[2]:
+        return cached[0]
+    samples = load_duration_samples(voice or None)
+    model = _fit_duration_model(samples)
+    # Until there are enough samples, refit as soon as the missing ones arrive rather than a full period later.
+    refit_after = _DURATION_MODEL_REFIT_EVERY
+    if len(samples) < _DURATION_MODEL_MIN_SAMPLES:
+        refit_after = _DURATION_MODEL_MIN_SAMPLES - len(samples)
+    with _DURATION_MODEL_LOCK:
+        _DURATION_MODELS[voice] = (model, 0, refit_after)
+    return model
+
+
+# Both of these touch sqlite (and predict may refit the model with lstsq); async callers use asyncio.to_thread.
+def _record_duration(text: str, voice: str, duration: float) -> None:
+    chars, pauses = _duration_features(text)
+    record_duration_sample(voice, chars, pauses, duration)
+    with _DURATION_MODEL_LOCK:
+        for key in (voice, ""):
+            cached = _DURATION_MODELS.get(key)
+            if cached is not None:
+                _DURATION_MODELS[key] = (cached[0], cached[1] + 1, cached[2])
+
+
+def predict_tts_duration(text: str, voice: str = "") -> float:
+    chars, pauses = _duration_features(text)
+    if chars <= 0:
+        return _estimate_duration_by_text(str(text or "").strip())
+    for key in dict.fromkeys((voice, "")):
+        model = _duration_model(key)
+        if model is not None:
+            return max(0.5, float(model @ np.array([chars, pauses, 1.0])))
+    return _estimate_duration_by_text(str(text or "").strip())
+
+
 def _create_silent_wav(path: Path, duration_sec: float, sample_rate: int = 22050) -> Path:
     path.parent.mkdir(parents=True, exist_ok=True)
     frame_count = int(duration_sec * sample_rate)
@@ -32,8 +132,41 @@ def _create_silent_wav(path: Path, duration_sec: float, sample_rate: int = 22050
     return path
 
 
-async def synthesize_tts(text: str, voice: str, output_path: Path) -> tuple[Path, float]:
+async def _stream_edge_tts(communicator: Communicate, output_path: Path) -> tuple[int, list[dict]]:
+    partial_path = output_path.with_name(f"{output_path.name}.part")
+    written = 0
+    boundaries: list[dict] = []
+    try:
+        with partial_path.open("wb") as handle:
+            async for chunk in communicator.stream():
+                chunk_type = chunk.get("type")
+                if chunk_type == "audio":
+                    data = chunk.get("data") or b""
+                    handle.write(data)
+                    written += len(data)
+                elif chunk_type in {"WordBoundary", "SentenceBoundary"}:
+                    start = float(chunk.get("offset") or 0) / _EDGE_TICKS_PER_SECOND
+                    end = start + float(chunk.get("duration") or 0) / _EDGE_TICKS_PER_SECOND
+                    boundaries.append({"text": str(chunk.get("text") or ""), "start": round(start, 4), "end": round(end, 4)})
+        partial_path.replace(output_path)
+    finally:
+        partial_path.unlink(missing_ok=True)
+    return written, boundaries
+
+
+def _write_boundary_timing(output_path: Path, text: str, voice: str, duration: float, boundaries: list[dict]) -> None:
+    if not boundaries:
+        return
+    write_tts_timing(
+        output_path,
+        [{"text": text, "voice": voice, "start": 0.0, "end": round(duration, 4)}],
+        words=boundaries,
+    )
+
+
+async def synthesize_tts(text: str, voice: str, output_path: Path, silent_fallback: bool = True) -> tuple[Path, float]:
     output_path.parent.mkdir(parents=True, exist_ok=True)
+    tts_timing_path(output_path).unlink(missing_ok=True)
     text_content = str(text or "").strip()
     if not text_content:
         fallback_path = output_path.with_suffix(".wav")
@@ -42,47 +175,111 @@ async def synthesize_tts(text: str, voice: str, output_path: Path) -> tuple[Path
         logger.warning("TTS received empty text, generated silent wav: %s", fallback_path)
         return fallback_path, duration
 
+    cache_candidates = [(_EDGE_PROVIDER, _EDGE_RATE, _EDGE_PITCH)]
     if settings.tts_api_url:
+        cache_candidates.insert(0, (_remote_provider(), "", ""))
+    # The cache is sqlite plus a file copy; keep both off the loop that is streaming other TTS/image requests.
+    cached = await asyncio.to_thread(load_cached_tts, text_content, voice, cache_candidates, output_path)
+    if cached is not None:
+        cached_path, cached_duration, cached_provider, cached_boundaries = cached
+        _write_boundary_timing(cached_path, text_content, voice, cached_duration, cached_boundaries)
+        logger.info("TTS cache hit: provider=%s voice=%s chars=%s", cached_provider, voice, len(text_content))
+        return cached_path, cached_duration
+
+    remote_breaker = get_circuit_breaker(TTS_REMOTE_CIRCUIT) if settings.tts_api_url else None
+    if remote_breaker is not None and not remote_breaker.allow():
+        logger.info("Remote TTS circuit open, using edge-tts: voice=%s", voice)
+    elif remote_breaker is not None:
+        partial_path = output_path.with_name(f"{output_path.name}.part")
         try:
-            async with httpx.AsyncClient(timeout=90) as client:
-                response = await client.post(
+            client = get_http_client(
+                _REMOTE_CLIENT_NAME,
+                timeout=90,
+                max_connections=max(1, int(settings.tts_max_concurrency)),
+            )
+            async with _provider_semaphore(_remote_provider()):
+                async with client.stream(
+                    "POST",
                     settings.tts_api_url,
                     json={"text": text_content, "voice": voice},
-                )
-                response.raise_for_status()
-                content_type = str(response.headers.get("content-type") or "").lower()
-                if not response.content:
+                    extensions=http_request_extensions(_REMOTE_CLIENT_NAME),
+                ) as response:
+                    response.raise_for_status()
+                    content_type = str(response.headers.get("content-type") or "").lower()
+                    if "audio" not in content_type and "application/octet-stream" not in content_type:
+                        raise RuntimeError(f"remote TTS returned unexpected content-type: {content_type}")
+                    written = 0
+                    with partial_path.open("wb") as handle:
+                        async for chunk in response.aiter_bytes():
+                            handle.write(chunk)
+                            written += len(chunk)
+                    record_bytes_streamed(_REMOTE_CLIENT_NAME, written)
+                if written <= 0:
                     raise RuntimeError("remote TTS returned empty response body")
-                if "audio" not in content_type and "application/octet-stream" not in content_type:
-                    raise RuntimeError(f"remote TTS returned unexpected content-type: {content_type}")
-                output_path.write_bytes(response.content)
+                partial_path.replace(output_path)
                 duration = get_audio_duration(output_path)
-                if output_path.exists() and output_path.stat().st_size > 0 and duration <= 0:
-                    duration = _estimate_duration_by_text(text_content)
+                if duration > 0:
+                    await asyncio.to_thread(_record_duration, text_content, voice, duration)
+                elif output_path.exists() and output_path.stat().st_size > 0:
+                    duration = await asyncio.to_thread(predict_tts_duration, text_content, voice)
                 if duration <= 0:
                     raise RuntimeError("remote TTS wrote invalid audio file")
+                remote_breaker.record_success()
+                await asyncio.to_thread(store_cached_tts, text_content, voice, _remote_provider(), output_path, duration)
                 return output_path, duration
         except Exception as exc:
+            partial_path.unlink(missing_ok=True)
+            remote_breaker.record_failure()
             logger.warning("Remote TTS failed, fallback to edge-tts: voice=%s error=%s", voice, exc)
 
     last_error: Exception | None = None
-    for attempt in range(2):
+    edge_breaker = get_circuit_breaker(TTS_EDGE_CIRCUIT)
+    edge_attempts = 2 if edge_breaker.allow() else 0
+    if not edge_attempts:
+        last_error = RuntimeError("edge-tts circuit open")
+    for attempt in range(edge_attempts):
         try:
-            communicator = Communicate(text=text_content, voice=voice)
-            await asyncio.wait_for(communicator.save(str(output_path)), timeout=45)
-            if not output_path.exists() or output_path.stat().st_size <= 0:
+            communicator = Communicate(
+                text=text_content,
+                voice=voice,
+                rate=_EDGE_RATE,
+                pitch=_EDGE_PITCH,
+                boundary=_EDGE_BOUNDARY,
+            )
+            async with _provider_semaphore(_EDGE_PROVIDER):
+                written, boundaries = await asyncio.wait_for(_stream_edge_tts(communicator, output_path), timeout=45)
+            if written <= 0 or not output_path.exists():
                 raise RuntimeError("edge-tts wrote empty file")
-            duration = get_audio_duration(output_path)
-            if duration <= 0:
-                duration = _estimate_duration_by_text(text_content)
+            duration = written / _EDGE_MP3_BYTES_PER_SECOND
+            if boundaries:
+                duration = max(duration, float(boundaries[-1]["end"]))
+            edge_breaker.record_success()
+            _write_boundary_timing(output_path, text_content, voice, duration, boundaries)
+            await asyncio.to_thread(_record_duration, text_content, voice, duration)
+            await asyncio.to_thread(
+                store_cached_tts,
+                text_content,
+                voice,
+                _EDGE_PROVIDER,
+                output_path,
+                duration,
+                _EDGE_RATE,
+                _EDGE_PITCH,
+                boundaries=boundaries,
+            )
             return output_path, duration
         except Exception as exc:
             last_error = exc
             if attempt < 1:
                 await asyncio.sleep(0.35)
+    if edge_attempts:
+        edge_breaker.record_failure()
+
+    if not silent_fallback:
+        raise TTSServiceError(f"edge-tts failed after retries: voice={voice} error={last_error}")
 
     fallback_path = output_path.with_suffix(".wav")
-    duration = _estimate_duration_by_text(text_content)
+    duration = await asyncio.to_thread(predict_tts_duration, text_content, voice)
     _create_silent_wav(fallback_path, duration)
     logger.warning(
         "Edge TTS failed after retries, generated silent wav: voice=%s error=%s path=%s",
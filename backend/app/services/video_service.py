@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import asyncio
 import gc
+import hashlib
 import json
 import logging
+import os
 import re
 import shutil
 import subprocess
@@ -11,6 +13,8 @@ import tempfile
 import random
 from pathlib import Path
 from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from threading import Lock, Thread
 from uuid import uuid4
 
@@ -21,12 +25,26 @@ from ..config import project_path, settings
 from ..models import CharacterSuggestion, GenerateVideoRequest, JobStatus
 from ..state import job_store
 from ..voice_catalog import VOICE_INFOS, recommend_voice
+from .audio_assembly_service import (
+    assemble_pcm_pieces,
+    decode_audio_pcm,
+    load_tts_timing,
+    spoken_char_count,
+    split_pcm_by_text,
+    tts_timing_path,
+    word_char_spans,
+    write_tts_timing,
+)
+from .http_client_service import close_http_clients
 from .image_service import ImageGenerationError, use_reference_or_generate
+from .image_variant_service import cover_fit_size, is_image_variant, link_image_variant, load_image_variant
 from .llm_service import (
     build_segment_image_bundle,
+    build_segment_image_bundles,
     split_sentences,
     summarize_story_world_context,
 )
+from .clip_metadata_service import clip_duration, clip_has_audio_stream, clip_video_size, record_clip_metadata
 from .segmentation_service import build_segment_plan, resolve_precomputed_segments, select_segments_by_range
 from .scene_cache_service import (
     build_scene_descriptor,
@@ -37,7 +55,7 @@ from .scene_cache_service import (
     render_cached_image_to_output,
     save_scene_image_cache_entry,
 )
-from .tts_service import get_audio_duration, synthesize_tts
+from .tts_service import TTSServiceError, get_audio_duration, predict_tts_duration, synthesize_tts
 
 
 logger = logging.getLogger(__name__)
@@ -54,6 +72,13 @@ _FINAL_AUDIO_GAIN = 5.0
 _NARRATOR_VOICE_ID = "zh-CN-YunxiNeural"
 _OVERLAY_FONT_SIZE = 58
 _WATERMARK_TRAVEL_SECONDS = 22.0
+# Python fallback compose keeps at most this many clip readers open at once.
+_FALLBACK_COMPOSE_WINDOW = 8
+_FALLBACK_WINDOW_PRESET = "ultrafast"
+_FALLBACK_WINDOW_CRF = "18"
+# Chunked final encode never splits the timeline into pieces shorter than this.
+_FINAL_CHUNK_MIN_SECONDS = 60.0
+_FINAL_CHUNK_AUTO_MAX = 8
 _DIALOG_QUOTE_PAIRS = {
     '"': '"',
     "\u201c": "\u201d",  # “ ”
@@ -130,10 +155,13 @@ def _compose_overlay_filter(
     watermark_type: str,
     watermark_text: str | None,
     watermark_opacity: float,
+    time_offset: float = 0.0,
 ) -> tuple[str, bool]:
     filters: list[str] = []
     has_image_input = False
     current_video = "0:v"
+    # Chunked encodes start each chunk at t=0; shift the watermark clock back onto the full timeline.
+    wm_t = f"(t+{time_offset:.6f})" if time_offset > 0 else "t"
 
     alias_value = (novel_alias or "").strip()
     if alias_value:
@@ -167,8 +195,8 @@ def _compose_overlay_filter(
             )
             filters.append(
                 f"[{current_video}][wmimg0]overlay="
-                f"x='if(lt(mod(t\\,{travel_time})\\,{travel_time/2})\\,20+(W-w-40)*mod(t\\,{travel_time/2})/{travel_time/2}\\,W-w-20-(W-w-40)*mod(t-{travel_time/2}\\,{travel_time/2})/{travel_time/2})':"
-                f"y='if(lt(mod(t\\,{travel_time})\\,{travel_time/2})\\,20+(H-h-40)*mod(t\\,{travel_time/2})/{travel_time/2}\\,H-h-20-(H-h-40)*mod(t-{travel_time/2}\\,{travel_time/2})/{travel_time/2})':"
+                f"x='if(lt(mod({wm_t}\\,{travel_time})\\,{travel_time/2})\\,20+(W-w-40)*mod({wm_t}\\,{travel_time/2})/{travel_time/2}\\,W-w-20-(W-w-40)*mod({wm_t}-{travel_time/2}\\,{travel_time/2})/{travel_time/2})':"
+                f"y='if(lt(mod({wm_t}\\,{travel_time})\\,{travel_time/2})\\,20+(H-h-40)*mod({wm_t}\\,{travel_time/2})/{travel_time/2}\\,H-h-20-(H-h-40)*mod({wm_t}-{travel_time/2}\\,{travel_time/2})/{travel_time/2})':"
                 "shortest=1[vwm0]"
             )
         else:
@@ -180,8 +208,8 @@ def _compose_overlay_filter(
                 f"fontfile='{wm_font}':"
                 f"text='{wm_text}':"
                 f"fontcolor=white@{opacity}:fontsize={wm_size}:"
-                f"x='if(lt(mod(t\\,{travel_time})\\,{travel_time/2})\\,20+(w-text_w-40)*mod(t\\,{travel_time/2})/{travel_time/2}\\,w-text_w-20-(w-text_w-40)*mod(t-{travel_time/2}\\,{travel_time/2})/{travel_time/2})':"
-                f"y='if(lt(mod(t\\,{travel_time})\\,{travel_time/2})\\,20+(h-text_h-40)*mod(t\\,{travel_time/2})/{travel_time/2}\\,h-text_h-20-(h-text_h-40)*mod(t-{travel_time/2}\\,{travel_time/2})/{travel_time/2})'[vwm0]"
+                f"x='if(lt(mod({wm_t}\\,{travel_time})\\,{travel_time/2})\\,20+(w-text_w-40)*mod({wm_t}\\,{travel_time/2})/{travel_time/2}\\,w-text_w-20-(w-text_w-40)*mod({wm_t}-{travel_time/2}\\,{travel_time/2})/{travel_time/2})':"
+                f"y='if(lt(mod({wm_t}\\,{travel_time})\\,{travel_time/2})\\,20+(h-text_h-40)*mod({wm_t}\\,{travel_time/2})/{travel_time/2}\\,h-text_h-20-(h-text_h-40)*mod({wm_t}-{travel_time/2}\\,{travel_time/2})/{travel_time/2})'[vwm0]"
             )
         current_video = "vwm0"
 
@@ -203,12 +231,15 @@ def _apply_final_overlays_ffmpeg(
     watermark_opacity: float,
     preset: str,
     crf: str,
+    video_size: tuple[int, int] | None = None,
+    time_offset: float = 0.0,
+    encoder_threads: int | None = None,
 ) -> Path:
     overlay_needed = bool((novel_alias or "").strip()) or bool(watermark_enabled)
     if not overlay_needed:
         return input_video
 
-    width, height = _probe_video_size(input_video)
+    width, height = video_size or _probe_video_size(input_video)
     subtitle_font = _subtitle_font_path()
     filter_complex, has_image_input = _compose_overlay_filter(
         width=width,
@@ -219,6 +250,7 @@ def _apply_final_overlays_ffmpeg(
         watermark_type=(watermark_type or "text").strip().lower(),
         watermark_text=watermark_text,
         watermark_opacity=watermark_opacity,
+        time_offset=time_offset,
     )
     if not filter_complex:
         return input_video
@@ -247,9 +279,13 @@ def _apply_final_overlays_ffmpeg(
                 watermark_type="text",
                 watermark_text=watermark_text,
                 watermark_opacity=watermark_opacity,
+                time_offset=time_offset,
             )
             filter_complex = fallback_filter
 
+    if encoder_threads:
+        cmd.extend(["-threads", str(int(encoder_threads))])
+
     cmd.extend(
         [
             "-filter_complex",
@@ -1058,6 +1094,7 @@ async def _synthesize_segment_tts(
     narrator_voice: str = _NARRATOR_VOICE_ID,
     sentence_plan: list[dict] | None = None,
 ) -> tuple[Path, float]:
+    tts_timing_path(output_path).unlink(missing_ok=True)
     parts = _build_tts_pieces(text, characters, narrator_voice, sentence_plan=sentence_plan)
     if not parts:
         return await synthesize_tts(text=text, voice=narrator_voice, output_path=output_path)
@@ -1072,56 +1109,53 @@ async def _synthesize_segment_tts(
 
     temp_parts = output_path.parent / f"{output_path.stem}_tts_parts"
     temp_parts.mkdir(parents=True, exist_ok=True)
-    part_files: list[Path] = []
-    total_duration = 0.0
 
-    try:
-        for idx, (piece_text, piece_voice) in enumerate(parts):
-            part_path = temp_parts / f"part_{idx:03d}.mp3"
-            generated_path, piece_duration = await synthesize_tts(text=piece_text, voice=piece_voice, output_path=part_path)
-            part_files.append(generated_path)
-            total_duration += max(piece_duration, 0.0)
-
-        concat_file = temp_parts / "concat_list.txt"
-        concat_lines = []
-        for path in part_files:
-            escaped = str(path.resolve()).replace("'", "'\\''")
-            concat_lines.append(f"file '{escaped}'")
-        concat_file.write_text("\n".join(concat_lines), encoding="utf-8")
-
-        cmd = [
-            ffmpeg_bin,
-            "-y",
-            "-hide_banner",
-            "-loglevel",
-            "error",
-            "-f",
-            "concat",
-            "-safe",
-            "0",
-            "-i",
-            str(concat_file),
-            "-c",
-            "copy",
-            str(output_path),
-        ]
-        proc = subprocess.run(cmd, capture_output=True, text=True)
-        if proc.returncode == 0 and output_path.exists():
-            duration = get_audio_duration(output_path)
-            return output_path, (duration if duration > 0 else total_duration)
+    async def synthesize_piece(idx: int, piece_text: str, piece_voice: str):
+        part_path = temp_parts / f"part_{idx:03d}.mp3"
+        if piece_voice == narrator_voice:
+            generated_path, _ = await synthesize_tts(text=piece_text, voice=piece_voice, output_path=part_path)
+        else:
+            try:
+                generated_path, _ = await synthesize_tts(
+                    text=piece_text, voice=piece_voice, output_path=part_path, silent_fallback=False
+                )
+            except TTSServiceError as exc:
+                logger.warning("TTS piece failed, fallback to narrator voice: piece=%s voice=%s error=%s", idx, piece_voice, exc)
+                piece_voice = narrator_voice
+                generated_path, _ = await synthesize_tts(text=piece_text, voice=narrator_voice, output_path=part_path)
+        # Decode as soon as the piece lands so decoding overlaps with the remaining TTS requests.
+        samples = await decode_audio_pcm(ffmpeg_bin, generated_path)
+        piece_words = (load_tts_timing(generated_path) or {}).get("words") or []
+        generated_path.unlink(missing_ok=True)
+        return piece_text, piece_voice, samples, piece_words
 
-        logger.warning("TTS concat failed, fallback to narrator voice: %s", (proc.stderr or "")[:400])
+    try:
+        # Pieces run concurrently; synthesize_tts enforces the per-provider cap.
+        decoded = await asyncio.gather(
+            *(synthesize_piece(idx, piece_text, piece_voice) for idx, (piece_text, piece_voice) in enumerate(parts))
+        )
+        # Kept as PCM on purpose: the clip encode re-encodes audio to AAC whatever the input is, so a
+        # compressed intermediate would add an encode here plus a second lossy generation, and
+        # decoding it back costs more than reading mono 24 kHz PCM (~48 KB/s). Prefetched WAVs are
+        # bounded by TTS_PREFETCH_LOOKAHEAD and removed with the segment's artifacts.
+        wav_path = output_path.with_suffix(".wav")
+        assembled_path, duration, offsets, words = await run_in_threadpool(
+            assemble_pcm_pieces,
+            list(decoded),
+            wav_path,
+            max(0, int(settings.tts_piece_pause_ms)),
+        )
+        write_tts_timing(assembled_path, offsets, words)
+        return assembled_path, duration
+    except Exception as exc:
+        logger.warning("TTS piece assembly failed, fallback to narrator voice: %s", exc)
         return await synthesize_tts(text=text, voice=narrator_voice, output_path=output_path)
     finally:
-        for file in part_files:
+        for file in temp_parts.glob("part_*"):
             try:
                 file.unlink(missing_ok=True)
             except Exception:
                 pass
-        try:
-            (temp_parts / "concat_list.txt").unlink(missing_ok=True)
-        except Exception:
-            pass
         try:
             temp_parts.rmdir()
         except Exception:
@@ -1224,7 +1258,41 @@ def _split_subtitle_sentences(text: str) -> list[str]:
     return units or [clean]
 
 
-def _subtitle_timeline(text: str, duration: float) -> list[tuple[str, float, float]]:
+def _spoken_char_weight(text: str) -> int:
+    return max(1, spoken_char_count(text))
+
+
+def _piece_time_at(fraction: float, piece_offsets: list[dict], safe_duration: float) -> float:
+    weights = [_spoken_char_weight(item.get("text")) for item in piece_offsets]
+    total_weight = float(sum(weights))
+    lower = 0.0
+    for weight, item in zip(weights, piece_offsets):
+        upper = lower + weight / total_weight
+        if fraction <= upper + 1e-9:
+            start = float(item.get("start") or 0.0)
+            end = max(start, float(item.get("end") or start))
+            ratio = 0.0 if upper <= lower else (fraction - lower) / (upper - lower)
+            return min(safe_duration, start + (end - start) * max(0.0, min(ratio, 1.0)))
+        lower = upper
+    return safe_duration
+
+
+def _words_cover_pieces(word_boundaries: list[dict] | None, piece_offsets: list[dict]) -> bool:
+    word_starts = [float(item.get("start") or 0.0) for item in (word_boundaries or []) if isinstance(item, dict)]
+    for item in piece_offsets:
+        start = float(item.get("start") or 0.0) - 1e-3
+        end = float(item.get("end") or 0.0) + 1e-3
+        if not any(start <= word_start < end for word_start in word_starts):
+            return False
+    return True
+
+
+def _subtitle_timeline(
+    text: str,
+    duration: float,
+    piece_offsets: list[dict] | None = None,
+    word_boundaries: list[dict] | None = None,
+) -> list[tuple[str, float, float]]:
     units = _split_subtitle_sentences(text)
     if not units:
         return []
@@ -1232,12 +1300,30 @@ def _subtitle_timeline(text: str, duration: float) -> list[tuple[str, float, flo
     safe_duration = max(duration, 0.1)
     weights = [max(1, len(re.sub(r"\s+", "", item))) for item in units]
     total_weight = sum(weights)
+    # Measured piece offsets pin each voice piece to its real span; text weight only spreads time inside a piece.
+    valid_offsets = [item for item in (piece_offsets or []) if isinstance(item, dict) and "start" in item and "end" in item]
+
+    spoken_weights = [_spoken_char_weight(item) for item in units]
+    total_spoken_weight = sum(spoken_weights)
+    # Word boundaries from the TTS provider give the exact time each spoken character ends.
+    char_end_times = [end for _, end in word_char_spans(word_boundaries)]
+    if char_end_times and not _words_cover_pieces(word_boundaries, valid_offsets):
+        # Some pieces came from a provider without boundaries; stretching the partial word list over
+        # the whole segment would end the subtitles early, so time by piece offsets instead.
+        char_end_times = []
 
     timeline: list[tuple[str, float, float]] = []
     cursor = 0.0
+    consumed_weight = 0
     for index, unit in enumerate(units):
+        consumed_weight += spoken_weights[index]
         if index == len(units) - 1:
             end_time = safe_duration
+        elif char_end_times:
+            char_index = round(consumed_weight * len(char_end_times) / total_spoken_weight) - 1
+            end_time = min(safe_duration, char_end_times[max(0, min(char_index, len(char_end_times) - 1))])
+        elif valid_offsets:
+            end_time = _piece_time_at(consumed_weight / total_spoken_weight, valid_offsets, safe_duration)
         else:
             end_time = min(safe_duration, cursor + (safe_duration * weights[index] / total_weight))
         if end_time <= cursor:
@@ -1248,7 +1334,7 @@ def _subtitle_timeline(text: str, duration: float) -> list[tuple[str, float, flo
     return timeline
 
 
-def _subtitle_clips(text: str, duration: float, resolution: tuple[int, int], style: str) -> list[TextClip]:
+def _rasterize_subtitle_units(text: str, resolution: tuple[int, int], style: str) -> list[tuple[TextClip, int] | None]:
     width, height = resolution
     fontsize = 46
     color = "#FFFFFF"
@@ -1269,7 +1355,7 @@ def _subtitle_clips(text: str, duration: float, resolution: tuple[int, int], sty
         stroke_color = "#111111"
 
     font_path = _subtitle_font_path()
-    subtitles: list[TextClip] = []
+    layers: list[tuple[TextClip, int] | None] = []
 
     safe_top = max(12, int(height * 0.03))
     safe_bottom = max(24, int(height * 0.06))
@@ -1293,7 +1379,7 @@ def _subtitle_clips(text: str, duration: float, resolution: tuple[int, int], sty
         max_y = max(safe_top, height - clip_height - safe_bottom)
         return min(max(preferred, safe_top), max_y)
 
-    for sentence, start_at, end_at in _subtitle_timeline(text, duration):
+    for sentence in _split_subtitle_sentences(text):
         text_kwargs = {
             "text": sentence,
             "font_size": fontsize,
@@ -1316,6 +1402,7 @@ def _subtitle_clips(text: str, duration: float, resolution: tuple[int, int], sty
         except Exception:
             if not font_path:
                 logger.exception("Subtitle render failed")
+                layers.append(None)
                 continue
             logger.warning("Subtitle render failed with font '%s', retrying default font", font_path)
             text_kwargs.pop("font", None)
@@ -1323,9 +1410,33 @@ def _subtitle_clips(text: str, duration: float, resolution: tuple[int, int], sty
                 clip = TextClip(**text_kwargs)
             except Exception:
                 logger.exception("Subtitle render failed after retry")
+                layers.append(None)
                 continue
 
-        y_pos = _resolve_y(getattr(clip, "h", 0))
+        layers.append((clip, _resolve_y(getattr(clip, "h", 0))))
+
+    return layers
+
+
+def _subtitle_clips(
+    text: str,
+    duration: float,
+    resolution: tuple[int, int],
+    style: str,
+    piece_offsets: list[dict] | None = None,
+    word_boundaries: list[dict] | None = None,
+    layers: list[tuple[TextClip, int] | None] | None = None,
+) -> list[TextClip]:
+    timeline = _subtitle_timeline(text, duration, piece_offsets, word_boundaries)
+    # Layers only depend on text, resolution and style, so they may have been rasterized while TTS ran.
+    if layers is None or len(layers) != len(timeline):
+        layers = _rasterize_subtitle_units(text, resolution, style)
+
+    subtitles: list[TextClip] = []
+    for (_, start_at, end_at), layer in zip(timeline, layers):
+        if layer is None:
+            continue
+        clip, y_pos = layer
         subtitles.append(clip.with_start(start_at).with_duration(max(0.05, end_at - start_at)).with_position(("center", y_pos)))
 
     return subtitles
@@ -1340,25 +1451,14 @@ def _build_motion_image_clip(
     target_w, target_h = resolution
     safe_duration = max(duration, 0.1)
 
-    base_clip = ImageClip(image_path).with_duration(safe_duration)
-    source_w = max(1.0, float(base_clip.w))
-    source_h = max(1.0, float(base_clip.h))
-
-    # Cover fit: fill entire frame without distortion.
-    cover_scale = max(target_w / source_w, target_h / source_h)
-    scaled_w = source_w * cover_scale
-    scaled_h = source_h * cover_scale
-
-    # Prefer top-to-bottom movement. If there is no vertical overflow,
-    # apply a tiny extra zoom to create vertical travel.
-    min_vertical_pan = max(24.0, target_h * 0.08)
-    extra_zoom = 1.0
-    if (scaled_h - target_h) < min_vertical_pan:
-        extra_zoom = (target_h + min_vertical_pan) / max(1.0, scaled_h)
-
-    final_w = int(round(scaled_w * extra_zoom))
-    final_h = int(round(scaled_h * extra_zoom))
-    motion_clip = base_clip.resized(new_size=(final_w, final_h))
+    if is_image_variant(image_path):
+        # Variants are already cover-fit for this resolution: no decode, no resize.
+        motion_clip = ImageClip(load_image_variant(image_path)).with_duration(safe_duration)
+        final_w, final_h = int(motion_clip.w), int(motion_clip.h)
+    else:
+        base_clip = ImageClip(image_path).with_duration(safe_duration)
+        final_w, final_h = cover_fit_size((base_clip.w, base_clip.h), resolution)
+        motion_clip = base_clip.resized(new_size=(final_w, final_h))
 
     overflow_x = max(0.0, float(final_w - target_w))
     overflow_y = max(0.0, float(final_h - target_h))
@@ -1406,6 +1506,7 @@ def _render_clip_sync(
     subtitle_style: str,
     camera_motion: str,
     render_mode: str,
+    subtitle_layers: list[tuple[TextClip, int] | None] | None = None,
 ) -> None:
     profile = _resolve_render_profile(render_mode)
     clip_fps = int(profile.get("clip_fps") or fps)
@@ -1425,7 +1526,16 @@ def _render_clip_sync(
         )
         audio_clip = AudioFileClip(audio_path).with_volume_scaled(_TTS_GAIN)
         base = image_clip.with_audio(audio_clip)
-        subtitle_clips = _subtitle_clips(text, duration, resolution, subtitle_style)
+        tts_timing = load_tts_timing(Path(audio_path)) or {}
+        subtitle_clips = _subtitle_clips(
+            text,
+            duration,
+            resolution,
+            subtitle_style,
+            tts_timing.get("pieces"),
+            tts_timing.get("words"),
+            subtitle_layers,
+        )
         composed = CompositeVideoClip([base, *subtitle_clips], size=resolution).with_duration(duration)
 
         output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -1438,6 +1548,7 @@ def _render_clip_sync(
             ffmpeg_params=["-crf", str(profile.get("clip_crf") or "27"), "-movflags", "+faststart", "-b:a", _VIDEO_AUDIO_BITRATE],
             logger=None,
         )
+        record_clip_metadata(output_path)
     finally:
         if composed is not None:
             composed.close()
@@ -1451,6 +1562,244 @@ def _render_clip_sync(
             image_clip.close()
 
 
+def _compose_clip_window_sync(
+    clip_paths: list[str],
+    output_path: Path,
+    fps: int,
+    frame_size: tuple[int, int] | None,
+) -> None:
+    from moviepy import VideoFileClip
+
+    window_clips = []
+    merged = None
+    normalized = None
+    try:
+        for clip_path in clip_paths:
+            window_clips.append(VideoFileClip(clip_path))
+        merged = concatenate_videoclips(window_clips, method="compose")
+        normalized = merged
+        if frame_size and (int(merged.w), int(merged.h)) != frame_size:
+            # Keep every window on the same frame so the next level can concatenate them as-is.
+            normalized = CompositeVideoClip([merged.with_position("center")], size=frame_size).with_duration(merged.duration)
+        normalized.write_videofile(
+            str(output_path),
+            fps=fps,
+            audio_codec="aac",
+            codec="libx264",
+            preset=_FALLBACK_WINDOW_PRESET,
+            ffmpeg_params=["-crf", _FALLBACK_WINDOW_CRF, "-b:a", _VIDEO_AUDIO_BITRATE],
+            logger=None,
+        )
+    finally:
+        if normalized is not None and normalized is not merged:
+            normalized.close()
+        if merged is not None:
+            merged.close()
+        for clip in window_clips:
+            clip.close()
+
+
+def _merge_clips_bounded(clip_paths: list[str], work_dir: Path, fps: int) -> str:
+    if not clip_paths:
+        raise ValueError("No clips to compose")
+
+    known_sizes = [size for size in (clip_video_size(Path(item)) for item in clip_paths) if size]
+    frame_size = (max(w for w, _ in known_sizes), max(h for _, h in known_sizes)) if known_sizes else None
+
+    window_size = max(2, _FALLBACK_COMPOSE_WINDOW)
+    ffmpeg_bin = shutil.which("ffmpeg")
+    current = list(clip_paths)
+    level = 0
+    while len(current) > 1:
+        if level > 0 and ffmpeg_bin:
+            # Level 0 normalized every clip into windows with identical codec parameters, so the rest of the
+            # tree is one stream copy; only the final compose encodes again.
+            concat_output = work_dir / f"window_{level:02d}_concat.mp4"
+            ok, concat_error = _ffmpeg_concat_copy(ffmpeg_bin, current, work_dir / f"window_{level:02d}_concat.txt", concat_output)
+            if ok:
+                for intermediate in current:
+                    Path(intermediate).unlink(missing_ok=True)
+                logger.info("Fallback compose level %s stream-copied %s windows", level, len(current))
+                return str(concat_output)
+            logger.warning("Fallback compose window concat copy failed, re-encoding windows: %s", concat_error[:400])
+            ffmpeg_bin = None
+        merged_level: list[str] = []
+        for window_index, start in enumerate(range(0, len(current), window_size)):
+            window_output = work_dir / f"window_{level:02d}_{window_index:04d}.mp4"
+            _compose_clip_window_sync(current[start : start + window_size], window_output, fps, frame_size)
+            merged_level.append(str(window_output))
+            gc.collect()
+        if level > 0:
+            for intermediate in current:
+                Path(intermediate).unlink(missing_ok=True)
+        logger.info("Fallback compose level %s merged %s inputs into %s windows", level, len(current), len(merged_level))
+        current = merged_level
+        level += 1
+    return current[0]
+
+
+def _ffmpeg_concat_copy(ffmpeg_bin: str, clip_paths: list[str], list_file: Path, output_path: Path) -> tuple[bool, str]:
+    concat_lines = []
+    for clip_path in clip_paths:
+        escaped = str(Path(clip_path).resolve()).replace("'", "'\\''")
+        concat_lines.append(f"file '{escaped}'")
+    list_file.write_text("\n".join(concat_lines), encoding="utf-8")
+
+    concat_cmd = [
+        ffmpeg_bin,
+        "-y",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        str(list_file),
+        "-c",
+        "copy",
+        str(output_path),
+    ]
+    proc = subprocess.run(concat_cmd, capture_output=True, text=True)
+    return proc.returncode == 0 and output_path.exists(), proc.stderr or ""
+
+
+def _resolve_final_encode_chunks(total_duration: float, clip_count: int) -> int:
+    configured = int(settings.final_encode_chunks)
+    if configured == 1 or clip_count < 2:
+        return 1
+    if configured <= 0:
+        configured = max(1, min(_FINAL_CHUNK_AUTO_MAX, (os.cpu_count() or 1) // 2))
+    by_duration = int(max(0.0, total_duration) // _FINAL_CHUNK_MIN_SECONDS)
+    return max(1, min(configured, by_duration, clip_count))
+
+
+def _split_clips_by_duration(clip_paths: list[str], durations: list[float], chunk_count: int) -> list[tuple[list[str], float]]:
+    total_duration = sum(durations)
+    target = total_duration / max(1, chunk_count)
+    chunks: list[tuple[list[str], float]] = []
+    current: list[str] = []
+    current_start = 0.0
+    elapsed = 0.0
+    for index, (clip_path, duration) in enumerate(zip(clip_paths, durations)):
+        current.append(clip_path)
+        elapsed += duration
+        remaining_clips = len(clip_paths) - index - 1
+        remaining_chunks = chunk_count - len(chunks) - 1
+        if remaining_chunks > 0 and remaining_clips >= remaining_chunks and elapsed >= target * (len(chunks) + 1):
+            chunks.append((current, current_start))
+            current = []
+            current_start = elapsed
+    if current:
+        chunks.append((current, current_start))
+    return chunks
+
+
+def _encode_final_video_chunked(
+    ffmpeg_bin: str,
+    clip_paths: list[str],
+    work_dir: Path,
+    output_video: Path,
+    novel_alias: str | None,
+    watermark_enabled: bool,
+    watermark_type: str,
+    watermark_text: str | None,
+    watermark_image_path: str | None,
+    watermark_opacity: float,
+    preset: str,
+    crf: str,
+) -> Path | None:
+    durations = [clip_duration(Path(item)) for item in clip_paths]
+    if not durations or min(durations) <= 0:
+        return None
+    chunk_count = _resolve_final_encode_chunks(sum(durations), len(clip_paths))
+    if chunk_count <= 1:
+        return None
+
+    chunks = _split_clips_by_duration(clip_paths, durations, chunk_count)
+    video_size = clip_video_size(Path(clip_paths[0]))
+    overlay_needed = bool((novel_alias or "").strip()) or bool(watermark_enabled)
+    encoder_threads = max(1, (os.cpu_count() or 1) // len(chunks))
+
+    def encode_chunk(index: int, chunk_clips: list[str], time_offset: float) -> Path | None:
+        chunk_source = work_dir / f"chunk_{index:03d}_src.mp4"
+        ok, stderr = _ffmpeg_concat_copy(ffmpeg_bin, chunk_clips, work_dir / f"chunk_{index:03d}.txt", chunk_source)
+        if not ok:
+            logger.warning("ffmpeg chunk concat failed: chunk=%s error=%s", index, stderr[:400])
+            return None
+        chunk_output = work_dir / f"chunk_{index:03d}_out.mp4"
+        if overlay_needed:
+            encoded = _apply_final_overlays_ffmpeg(
+                ffmpeg_bin=ffmpeg_bin,
+                input_video=chunk_source,
+                output_video=chunk_output,
+                novel_alias=novel_alias,
+                watermark_enabled=watermark_enabled,
+                watermark_type=watermark_type,
+                watermark_text=watermark_text,
+                watermark_image_path=watermark_image_path,
+                watermark_opacity=watermark_opacity,
+                preset=preset,
+                crf=crf,
+                video_size=video_size,
+                time_offset=time_offset,
+                encoder_threads=encoder_threads,
+            )
+            return encoded if encoded == chunk_output else None
+
+        cmd = [
+            ffmpeg_bin,
+            "-y",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-i",
+            str(chunk_source),
+            "-map",
+            "0:v:0",
+            "-map",
+            "0:a:0",
+            "-threads",
+            str(encoder_threads),
+            "-c:v",
+            "libx264",
+            "-preset",
+            preset,
+            "-crf",
+            crf,
+            "-c:a",
+            "copy",
+            str(chunk_output),
+        ]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode == 0 and chunk_output.exists():
+            return chunk_output
+        logger.warning("ffmpeg chunk encode failed: chunk=%s error=%s", index, (proc.stderr or "")[:400])
+        return None
+
+    with ThreadPoolExecutor(max_workers=len(chunks), thread_name_prefix="final-chunk") as executor:
+        futures = [
+            executor.submit(encode_chunk, index, chunk_clips, time_offset)
+            for index, (chunk_clips, time_offset) in enumerate(chunks)
+        ]
+        encoded_chunks = [future.result() for future in futures]
+    if any(item is None for item in encoded_chunks):
+        return None
+
+    ok, stderr = _ffmpeg_concat_copy(
+        ffmpeg_bin,
+        [str(item) for item in encoded_chunks],
+        work_dir / "chunks_join.txt",
+        output_video,
+    )
+    if not ok:
+        logger.warning("ffmpeg chunk join failed, fallback to single-pass encode: %s", stderr[:400])
+        return None
+    logger.info("Final video encoded in %s parallel chunks (threads per chunk=%s)", len(encoded_chunks), encoder_threads)
+    return output_video
+
+
 def _render_final_sync(
     clip_paths: list[str],
     output_path: Path,
@@ -1473,54 +1822,56 @@ def _render_final_sync(
     ffmpeg_bin = shutil.which("ffmpeg")
     if ffmpeg_bin and clip_paths:
         with tempfile.TemporaryDirectory(prefix="genvideo_concat_") as tmp_dir:
-            concat_file = Path(tmp_dir) / "concat_list.txt"
-            concat_lines = []
-            for clip_path in clip_paths:
-                escaped = str(Path(clip_path).resolve()).replace("'", "'\\''")
-                concat_lines.append(f"file '{escaped}'")
-            concat_file.write_text("\n".join(concat_lines), encoding="utf-8")
-
             merged_no_bgm = Path(tmp_dir) / "merged_no_bgm.mp4"
-            concat_cmd = [
-                ffmpeg_bin,
-                "-y",
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-f",
-                "concat",
-                "-safe",
-                "0",
-                "-i",
-                str(concat_file),
-                "-c",
-                "copy",
-                str(merged_no_bgm),
-            ]
-            concat_proc = subprocess.run(concat_cmd, capture_output=True, text=True)
-            if concat_proc.returncode == 0 and merged_no_bgm.exists():
+            concat_ok, concat_error = _ffmpeg_concat_copy(
+                ffmpeg_bin, clip_paths, Path(tmp_dir) / "concat_list.txt", merged_no_bgm
+            )
+            if concat_ok:
                 bgm_enabled = bool(bgm_enabled)
                 bgm_volume = max(0.0, min(float(bgm_volume), 1.0))
                 bgm_path = project_path("assets/bgm.mp3")
                 if not bgm_path.exists():
                     bgm_path = project_path("assets/bgm/happinessinmusic-rock-trailer-417598.mp3")
+                bgm_active = bgm_enabled and bgm_volume > 0 and bgm_path.exists()
+
+                merged_input: Path | None = None
+                overlay_needed = bool((novel_alias or "").strip()) or bool(watermark_enabled)
+                if overlay_needed or (bgm_active and not bool(profile.get("bgm_video_copy", True))):
+                    merged_input = _encode_final_video_chunked(
+                        ffmpeg_bin=ffmpeg_bin,
+                        clip_paths=clip_paths,
+                        work_dir=Path(tmp_dir),
+                        output_video=Path(tmp_dir) / "merged_chunked.mp4",
+                        novel_alias=novel_alias,
+                        watermark_enabled=watermark_enabled,
+                        watermark_type=watermark_type,
+                        watermark_text=watermark_text,
+                        watermark_image_path=watermark_image_path,
+                        watermark_opacity=watermark_opacity,
+                        preset=final_preset,
+                        crf=final_crf,
+                    )
+                # The chunked pass already re-encoded the video at the final preset, so later steps can copy it.
+                video_reencoded = merged_input is not None
+                if merged_input is None:
+                    merged_input = _apply_final_overlays_ffmpeg(
+                        ffmpeg_bin=ffmpeg_bin,
+                        input_video=merged_no_bgm,
+                        output_video=Path(tmp_dir) / "merged_with_overlay.mp4",
+                        novel_alias=novel_alias,
+                        watermark_enabled=watermark_enabled,
+                        watermark_type=watermark_type,
+                        watermark_text=watermark_text,
+                        watermark_image_path=watermark_image_path,
+                        watermark_opacity=watermark_opacity,
+                        preset=final_preset,
+                        crf=final_crf,
+                        # Concat copy keeps the clip frame size, so reuse the recorded clip metadata.
+                        video_size=clip_video_size(Path(clip_paths[0])),
+                    )
 
-                merged_input = _apply_final_overlays_ffmpeg(
-                    ffmpeg_bin=ffmpeg_bin,
-                    input_video=merged_no_bgm,
-                    output_video=Path(tmp_dir) / "merged_with_overlay.mp4",
-                    novel_alias=novel_alias,
-                    watermark_enabled=watermark_enabled,
-                    watermark_type=watermark_type,
-                    watermark_text=watermark_text,
-                    watermark_image_path=watermark_image_path,
-                    watermark_opacity=watermark_opacity,
-                    preset=final_preset,
-                    crf=final_crf,
-                )
-
-                if bgm_enabled and bgm_volume > 0 and bgm_path.exists():
-                    if bool(profile.get("bgm_video_copy", True)):
+                if bgm_active:
+                    if bool(profile.get("bgm_video_copy", True)) or video_reencoded:
                         mix_cmd = [
                             ffmpeg_bin,
                             "-y",
@@ -1621,21 +1972,19 @@ def _render_final_sync(
                     logger.info("Final compose via ffmpeg concat copy")
                     return
             else:
-                logger.warning("ffmpeg concat copy failed, fallback to python compose: %s", (concat_proc.stderr or "")[:400])
+                logger.warning("ffmpeg concat copy failed, fallback to python compose: %s", concat_error[:400])
 
-    video_clips = []
     bgm_clips = []
     overlay_clips = []
     final = None
     final_with_audio = None
     with_overlay = None
+    compose_work_dir = Path(tempfile.mkdtemp(prefix="genvideo_compose_"))
     try:
         from moviepy import VideoFileClip
 
-        for clip_path in clip_paths:
-            video_clips.append(VideoFileClip(clip_path))
-
-        final = concatenate_videoclips(video_clips, method="compose")
+        merged_path = _merge_clips_bounded(clip_paths, compose_work_dir, fps)
+        final = VideoFileClip(merged_path)
 
         bgm_enabled = bool(bgm_enabled)
         bgm_volume = max(0.0, min(float(bgm_volume), 1.0))
@@ -1708,8 +2057,7 @@ def _render_final_sync(
             final.close()
         for clip in bgm_clips:
             clip.close()
-        for clip in video_clips:
-            clip.close()
+        shutil.rmtree(compose_work_dir, ignore_errors=True)
 
 
 async def _segment_text(payload: GenerateVideoRequest) -> tuple[list[str], int]:
@@ -1747,7 +2095,7 @@ async def _segment_text(payload: GenerateVideoRequest) -> tuple[list[str], int]:
 
 def _cleanup_segment_artifacts(temp_root: Path, segment_index: int) -> None:
     stem = f"segment_{segment_index:04d}"
-    for suffix in (".png", ".mp3", ".wav"):
+    for suffix in (".png", ".npy", ".mp3", ".wav", ".timing.json"):
         target = temp_root / f"{stem}{suffix}"
         try:
             if target.exists():
@@ -1757,30 +2105,7 @@ def _cleanup_segment_artifacts(temp_root: Path, segment_index: int) -> None:
 
 
 def _clip_has_audio_stream(clip_path: Path) -> bool:
-    ffprobe_bin = shutil.which("ffprobe")
-    if not ffprobe_bin:
-        return True
-
-    cmd = [
-        ffprobe_bin,
-        "-v",
-        "error",
-        "-select_streams",
-        "a:0",
-        "-show_entries",
-        "stream=codec_type",
-        "-of",
-        "default=noprint_wrappers=1:nokey=1",
-        str(clip_path),
-    ]
-    try:
-        proc = subprocess.run(cmd, capture_output=True, text=True)
-    except Exception:
-        return False
-
-    if proc.returncode != 0:
-        return False
-    return "audio" in str(proc.stdout or "").lower()
+    return clip_has_audio_stream(clip_path)
 
 
 def _is_valid_clip_checkpoint(clip_path: Path, min_bytes: int = 8192) -> bool:
@@ -1795,6 +2120,10 @@ def _is_valid_clip_checkpoint(clip_path: Path, min_bytes: int = 8192) -> bool:
     return _clip_has_audio_stream(clip_path)
 
 
+def _checkpointed_segment_indexes(clip_root: Path, total_segments: int) -> set[int]:
+    return {index for index in range(total_segments) if _is_valid_clip_checkpoint(clip_root / f"clip_{index:04d}.mp4")}
+
+
 def _collect_clip_paths_for_compose(clip_root: Path, total_segments: int) -> list[str]:
     clip_paths: list[str] = []
     total = max(0, int(total_segments or 0))
@@ -1918,6 +2247,7 @@ def _update_job(
     clip_count: int | None = None,
     clip_image_sources: list[str] | None = None,
     image_source_report: dict[str, object] | None = None,
+    estimated_duration_seconds: float | None = None,
 ) -> None:
     current = job_store.get(job_id)
     resolved_clip_count = max(0, int(clip_count if clip_count is not None else (current.clip_count if current else 0)))
@@ -1928,6 +2258,9 @@ def _update_job(
     if resolved_clip_image_sources is None and current is not None:
         resolved_clip_image_sources = current.clip_image_sources
     resolved_clip_image_sources = _normalize_clip_image_sources(resolved_clip_image_sources)
+    resolved_estimated_duration = estimated_duration_seconds
+    if resolved_estimated_duration is None and current is not None:
+        resolved_estimated_duration = current.estimated_duration_seconds
 
     job_store.set(
         JobStatus(
@@ -1944,10 +2277,460 @@ def _update_job(
             clip_preview_urls=[],
             clip_image_sources=resolved_clip_image_sources,
             image_source_report=resolved_image_source_report,
+            estimated_duration_seconds=resolved_estimated_duration,
         )
     )
 
 
+def _default_segment_assignment(
+    index: int,
+    segments: list[str],
+    characters: list[CharacterSuggestion],
+    previous_primary_character: CharacterSuggestion | None,
+) -> dict:
+    segment_text = segments[index]
+    previous_segment_text = segments[index - 1] if index > 0 else ""
+    next_segment_text = segments[index + 1] if index + 1 < len(segments) else ""
+
+    default_character = _pick_character(
+        characters,
+        segment_text,
+        previous_character=previous_primary_character,
+        previous_segment_text=previous_segment_text,
+        next_segment_text=next_segment_text,
+    )
+    default_related_characters = _pick_related_characters(
+        characters,
+        segment_text,
+        default_character,
+        previous_segment_text=previous_segment_text,
+        next_segment_text=next_segment_text,
+    )
+    if default_character not in default_related_characters:
+        default_related_characters.insert(0, default_character)
+
+    default_primary_index = next(
+        (idx for idx, item in enumerate(characters) if item is default_character),
+        0,
+    )
+    default_related_indexes = [
+        idx
+        for idx, item in enumerate(characters)
+        if any(item is selected for selected in default_related_characters)
+    ]
+    return {
+        "character": default_character,
+        "related_characters": default_related_characters,
+        "related_reference_paths": _collect_related_reference_paths(default_character, default_related_characters, limit=3),
+        "default_primary_index": default_primary_index,
+        "default_related_indexes": default_related_indexes,
+    }
+
+
+def _bundle_request(index: int, segments: list[str], assignment: dict) -> dict:
+    return {
+        "character": assignment["character"],
+        "segment_text": segments[index],
+        "related_reference_image_paths": assignment["related_reference_paths"],
+        "previous_segment_text": segments[index - 1] if index > 0 else "",
+        "next_segment_text": segments[index + 1] if index + 1 < len(segments) else "",
+        "default_primary_index": assignment["default_primary_index"],
+        "default_related_indexes": assignment["default_related_indexes"],
+    }
+
+
+_BUNDLE_STORE_SCHEMA_VERSION = 1
+
+
+def _bundle_request_signature(request: dict) -> tuple:
+    return (
+        request["default_primary_index"],
+        tuple(request["default_related_indexes"]),
+        tuple(request["related_reference_image_paths"]),
+    )
+
+
+class _SegmentBundlePlanner:
+    def __init__(
+        self,
+        segments: list[str],
+        characters: list[CharacterSuggestion],
+        model_id: str | None,
+        story_world_context: str,
+        skip_indexes: set[int],
+        store_path: Path | None = None,
+    ) -> None:
+        self.segments = segments
+        self.characters = characters
+        self.model_id = model_id
+        self.story_world_context = story_world_context
+        self.skip_indexes = skip_indexes
+        self.store_path = store_path
+        self.batch_size = max(1, int(settings.llm_bundle_batch_size))
+        self.concurrency = max(0, int(settings.llm_planning_concurrency))
+        self.pending: dict[int, tuple[tuple, asyncio.Future]] = {}
+        # Streamed partial bundles per segment, and the callers waiting on them, so the render loop can start an
+        # image from the prompt while the rest of its batch is still being written.
+        self.partials: dict[int, tuple[dict, set[str]]] = {}
+        self.partial_listeners: dict[int, list[Callable[[dict, set[str]], None]]] = {}
+        self.tasks: list[asyncio.Task] = []
+        self.stored: dict[str, dict] = {}
+        self.batches = 0
+        self.mismatches = 0
+        self.restored = 0
+
+    async def _single(self, request: dict, on_partial: Callable[[dict, set[str]], None] | None = None) -> dict:
+        return await build_segment_image_bundle(
+            model_id=self.model_id,
+            story_world_context=self.story_world_context,
+            character_candidates=self.characters,
+            on_partial=on_partial,
+            **request,
+        )
+
+    def _fingerprint(self, request: dict) -> str:
+        # Everything a bundle depends on except the heuristic default, which only matters for fallback bundles.
+        payload = [
+            self.model_id or settings.llm_default_model,
+            self.story_world_context,
+            request["segment_text"],
+            request["previous_segment_text"],
+            request["next_segment_text"],
+            [item.model_dump(mode="json") for item in self.characters],
+        ]
+        return hashlib.sha1(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _load_store(self) -> None:
+        if self.store_path is None or not self.store_path.exists():
+            return
+        try:
+            data = json.loads(self.store_path.read_text(encoding="utf-8"))
+        except Exception:
+            logger.warning("Ignoring unreadable segment bundle store: %s", self.store_path)
+            return
+        if not isinstance(data, dict) or data.get("schema") != _BUNDLE_STORE_SCHEMA_VERSION:
+            return
+        bundles = data.get("bundles")
+        if isinstance(bundles, dict):
+            self.stored = {str(key): value for key, value in bundles.items() if isinstance(value, dict)}
+
+    def _save_store(self) -> None:
+        if self.store_path is None:
+            return
+        try:
+            self.store_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.store_path.with_name(f"{self.store_path.name}.tmp")
+            temp_path.write_text(
+                json.dumps({"schema": _BUNDLE_STORE_SCHEMA_VERSION, "bundles": self.stored}, ensure_ascii=False),
+                encoding="utf-8",
+            )
+            temp_path.replace(self.store_path)
+        except Exception:
+            logger.exception("Failed to persist segment bundles: %s", self.store_path)
+
+    def _register(self, indexes: list[int], requests: list[dict], semaphore: asyncio.Semaphore | None = None) -> None:
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in requests]
+        fingerprints = [self._fingerprint(request) for request in requests]
+
+        def resolve(position: int, bundle: dict) -> None:
+            # Streamed batches hand out each bundle as soon as its entry is complete.
+            if futures[position].done():
+                return
+            futures[position].set_result(bundle)
+            if str((bundle.get("character_assignment") or {}).get("reason") or "") != "fallback":
+                self.stored[fingerprints[position]] = bundle
+            self.partials.pop(indexes[position], None)
+            self.partial_listeners.pop(indexes[position], None)
+
+        def partial(position: int, bundle: dict, fields: set[str]) -> None:
+            index = indexes[position]
+            if futures[position].done():
+                return
+            self.partials[index] = (bundle, fields)
+            for listener in list(self.partial_listeners.get(index, [])):
+                listener(bundle, fields)
+
+        async def build() -> None:
+            bundles = await build_segment_image_bundles(
+                requests,
+                model_id=self.model_id,
+                story_world_context=self.story_world_context,
+                character_candidates=self.characters,
+                on_bundle=resolve,
+                on_partial=partial,
+            )
+            for position, bundle in enumerate(bundles):
+                resolve(position, bundle)
+
+        async def run() -> None:
+            try:
+                if semaphore is None:
+                    await build()
+                else:
+                    async with semaphore:
+                        await build()
+                await run_in_threadpool(self._save_store)
+            except BaseException as exc:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(exc if isinstance(exc, Exception) else RuntimeError("bundle batch cancelled"))
+                raise
+            finally:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(RuntimeError("bundle batch returned no entry"))
+                for batch_index in indexes:
+                    self.partials.pop(batch_index, None)
+                    self.partial_listeners.pop(batch_index, None)
+
+        self.tasks.append(asyncio.create_task(run()))
+        self.batches += 1
+        for batch_index, batch_request, future in zip(indexes, requests, futures):
+            self.pending[batch_index] = (_bundle_request_signature(batch_request), future)
+
+    def plan_all(self) -> None:
+        if self.concurrency <= 0:
+            return
+        self._load_store()
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        group_indexes: list[int] = []
+        group_requests: list[dict] = []
+
+        def flush() -> None:
+            if group_indexes:
+                self._register(list(group_indexes), list(group_requests), semaphore)
+                group_indexes.clear()
+                group_requests.clear()
+
+        # One heuristic pass over the whole job; skipped (already rendered) segments do not move the chain,
+        # exactly as in the render loop.
+        previous: CharacterSuggestion | None = None
+        for index in range(len(self.segments)):
+            if index in self.skip_indexes:
+                flush()
+                continue
+            assignment = _default_segment_assignment(index, self.segments, self.characters, previous)
+            previous = assignment["character"]
+            request = _bundle_request(index, self.segments, assignment)
+            stored = self.stored.get(self._fingerprint(request))
+            if stored is not None:
+                flush()
+                future = loop.create_future()
+                future.set_result(stored)
+                self.pending[index] = (_bundle_request_signature(request), future)
+                self.restored += 1
+                continue
+            group_indexes.append(index)
+            group_requests.append(request)
+            if len(group_indexes) >= self.batch_size:
+                flush()
+        flush()
+        logger.info(
+            "Planned image bundles: segments=%s restored=%s requests=%s concurrency=%s",
+            len(self.pending),
+            self.restored,
+            self.batches,
+            self.concurrency,
+        )
+
+    def _start_batch(self, index: int, request: dict, assignment: dict) -> None:
+        requests = [request]
+        indexes = [index]
+        previous = assignment["character"]
+        for next_index in range(index + 1, len(self.segments)):
+            if len(requests) >= self.batch_size:
+                break
+            if next_index in self.skip_indexes or next_index in self.pending:
+                break
+            # Chain on the heuristic default, like plan_all does for the whole job.
+            next_assignment = _default_segment_assignment(next_index, self.segments, self.characters, previous)
+            requests.append(_bundle_request(next_index, self.segments, next_assignment))
+            indexes.append(next_index)
+            previous = next_assignment["character"]
+        self._register(indexes, requests)
+
+    async def bundle(
+        self,
+        index: int,
+        assignment: dict,
+        on_partial: Callable[[dict, set[str]], None] | None = None,
+    ) -> dict:
+        request = _bundle_request(index, self.segments, assignment)
+        if self.batch_size <= 1 and self.concurrency <= 0:
+            return await self._single(request, on_partial)
+        if index not in self.pending:
+            self._start_batch(index, request, assignment)
+
+        # Entries stay in place: a discarded speculative plan and the render loop may both ask for the same segment.
+        signature, future = self.pending[index]
+        listeners = self.partial_listeners.setdefault(index, []) if on_partial is not None and not future.done() else None
+        if listeners is not None:
+            listeners.append(on_partial)
+            if index in self.partials:
+                # The prompt streamed in before this caller asked; hand it over now.
+                on_partial(*self.partials[index])
+        try:
+            # Shielded: the batch also serves other segments, so a cancelled caller must not cancel it.
+            bundle = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning("Batched image bundle failed for segment %s, building singly", index + 1, exc_info=True)
+            return await self._single(request, on_partial)
+        finally:
+            # A caller that gave up (e.g. a dropped speculative plan) must not start images for a later partial.
+            if listeners is not None and on_partial in listeners:
+                listeners.remove(on_partial)
+        if signature != _bundle_request_signature(request) and str((bundle.get("character_assignment") or {}).get("reason") or "") == "fallback":
+            # A fallback bundle is built from the heuristic default, which assumed another previous character.
+            self.mismatches += 1
+            return await self._single(request, on_partial)
+        return bundle
+
+    async def close(self) -> None:
+        for _, future in self.pending.values():
+            if future.done() and not future.cancelled():
+                future.exception()
+            else:
+                future.cancel()
+        self.pending.clear()
+        self.partials.clear()
+        self.partial_listeners.clear()
+        for task in self.tasks:
+            task.cancel()
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks.clear()
+        if self.batches or self.restored:
+            logger.info(
+                "Image bundle planning finished: requests=%s restored=%s mismatches=%s",
+                self.batches,
+                self.restored,
+                self.mismatches,
+            )
+
+
+def _plan_from_bundle(
+    index: int,
+    prompt_bundle: dict,
+    characters: list[CharacterSuggestion],
+    assignment: dict,
+    log_assignment: bool = True,
+) -> dict:
+    character = assignment["character"]
+    related_characters = list(assignment["related_characters"])
+    related_reference_paths = assignment["related_reference_paths"]
+
+    prompt = str(prompt_bundle.get("prompt") or "").strip()
+    scene_metadata = prompt_bundle.get("metadata") or {}
+    tts_sentence_plan = prompt_bundle.get("tts_sentence_plan") if isinstance(prompt_bundle.get("tts_sentence_plan"), list) else []
+
+    bundle_assignment = prompt_bundle.get("character_assignment") if isinstance(prompt_bundle.get("character_assignment"), dict) else {}
+    resolved_primary_index = _coerce_character_index(bundle_assignment.get("primary_index"), len(characters))
+    resolved_related_indexes = _coerce_character_indexes(bundle_assignment.get("related_indexes"), len(characters), limit=4)
+
+    if resolved_primary_index is None:
+        resolved_primary_index = assignment["default_primary_index"]
+    if resolved_primary_index is not None and resolved_primary_index not in resolved_related_indexes:
+        resolved_related_indexes.insert(0, resolved_primary_index)
+    if not resolved_related_indexes:
+        resolved_related_indexes = list(assignment["default_related_indexes"])
+
+    selected_character, selected_related = _pick_characters_by_indexes(
+        characters,
+        resolved_primary_index,
+        resolved_related_indexes,
+    )
+    if selected_character is not None:
+        character = selected_character
+        related_characters = selected_related or [selected_character]
+        if character not in related_characters:
+            related_characters.insert(0, character)
+        related_reference_paths = _collect_related_reference_paths(character, related_characters, limit=3)
+        if log_assignment:
+            logger.info(
+                "Segment %s character assignment from prompt call: primary=%s confidence=%.2f reason=%s",
+                index + 1,
+                character.name,
+                float(bundle_assignment.get("confidence") or 0.0),
+                str(bundle_assignment.get("reason") or ""),
+            )
+
+    return {
+        "character": character,
+        "related_reference_paths": related_reference_paths,
+        "prompt": prompt,
+        "scene_metadata": scene_metadata,
+        "tts_sentence_plan": tts_sentence_plan,
+    }
+
+
+_SCENE_METADATA_FIELDS = frozenset(
+    {"is_scene_only", "action_hint", "location_hint", "scene_elements", "action_keywords", "location_keywords", "mood", "shot_type"}
+)
+
+
+def _same_image_plan(left: dict, right: dict) -> bool:
+    # Metadata is left out: the early start waits for every metadata field whenever cache matching needs them.
+    return (
+        left["character"] is right["character"]
+        and left["prompt"] == right["prompt"]
+        and list(left["related_reference_paths"]) == list(right["related_reference_paths"])
+    )
+
+
+async def _plan_segment_image(
+    index: int,
+    segments: list[str],
+    characters: list[CharacterSuggestion],
+    previous_primary_character: CharacterSuggestion | None,
+    model_id: str | None,
+    story_world_context: str,
+    bundle_planner: _SegmentBundlePlanner | None = None,
+    early_image: Callable[[dict, set[str]], asyncio.Task | None] | None = None,
+) -> dict:
+    assignment = _default_segment_assignment(index, segments, characters, previous_primary_character)
+    early: dict = {}
+
+    def on_partial(partial_bundle: dict, fields: set[str]) -> None:
+        # Streamed bundle already has prompt and character indexes; start the image before the speaker plan arrives.
+        if early_image is None or early.get("task") is not None:
+            return
+        partial_plan = _plan_from_bundle(index, partial_bundle, characters, assignment, log_assignment=False)
+        task = early_image(partial_plan, fields)
+        if task is not None:
+            early["task"] = task
+            early["plan"] = partial_plan
+
+    try:
+        if bundle_planner is not None:
+            prompt_bundle = await bundle_planner.bundle(index, assignment, on_partial=on_partial)
+        else:
+            prompt_bundle = await build_segment_image_bundle(
+                model_id=model_id,
+                story_world_context=story_world_context,
+                character_candidates=characters,
+                on_partial=on_partial,
+                **_bundle_request(index, segments, assignment),
+            )
+    except BaseException:
+        if early.get("task") is not None:
+            early["task"].cancel()
+        raise
+
+    plan = _plan_from_bundle(index, prompt_bundle, characters, assignment)
+    early_task = early.get("task")
+    if early_task is not None:
+        if _same_image_plan(early["plan"], plan):
+            plan["early_image"] = early_task
+        else:
+            logger.info("Segment %s final bundle differs from streamed fields, dropping early image", index + 1)
+            early_task.cancel()
+    return plan
+
+
 async def _resolve_segment_image(
     payload: GenerateVideoRequest,
     character: CharacterSuggestion,
@@ -1958,7 +2741,25 @@ async def _resolve_segment_image(
     image_path: Path,
     resolution: tuple[int, int],
     recent_reuse_entry_ids: set[str] | None = None,
+    speculative_image: asyncio.Task | None = None,
 ) -> tuple[Path, str, str | None]:
+    speculative: dict | None = None
+    if speculative_image is not None:
+        try:
+            speculative = await speculative_image
+        except asyncio.CancelledError:
+            if speculative_image.cancelled():
+                speculative = None
+            else:
+                raise
+        except Exception:
+            logger.warning("Speculative image for current scene failed, resolve inline", exc_info=True)
+            speculative = None
+    speculative = speculative or {}
+    speculative_path = Path(speculative["image_path"]) if speculative.get("image_path") else None
+    if speculative_path is not None and not speculative_path.exists():
+        speculative_path = None
+
     descriptor = build_scene_descriptor(
         character=character,
         segment_text=segment_text,
@@ -1968,11 +2769,18 @@ async def _resolve_segment_image(
     )
 
     if payload.enable_scene_image_reuse:
-        matched = await find_reusable_scene_image(
-            scene_descriptor=descriptor,
-            model_id=payload.model_id,
-            disallow_entry_ids=recent_reuse_entry_ids,
-        )
+        speculative_match = speculative.get("match") if isinstance(speculative.get("match"), dict) else None
+        if speculative_match and str(speculative_match.get("entry_id") or "") not in (recent_reuse_entry_ids or set()):
+            matched = speculative_match
+        elif speculative_path is not None:
+            # The prefetcher already missed the cache for this exact scene before generating.
+            matched = None
+        else:
+            matched = await find_reusable_scene_image(
+                scene_descriptor=descriptor,
+                model_id=payload.model_id,
+                disallow_entry_ids=recent_reuse_entry_ids,
+            )
         if matched and matched.get("image_path"):
             reused = await run_in_threadpool(
                 render_cached_image_to_output,
@@ -1989,14 +2797,19 @@ async def _resolve_segment_image(
             return reused, "cache", str(matched.get("entry_id") or "") or None
 
     try:
-        generated = await use_reference_or_generate(
-            prompt=prompt,
-            output_path=image_path,
-            resolution=resolution,
-            reference_image_path=character.reference_image_path,
-            extra_reference_image_paths=related_reference_image_paths,
-            aspect_ratio=payload.image_aspect_ratio,
-        )
+        if speculative_path is not None:
+            speculative_path.replace(image_path)
+            logger.info("Using speculative image for current scene: %s", image_path.name)
+            generated = image_path
+        else:
+            generated = await use_reference_or_generate(
+                prompt=prompt,
+                output_path=image_path,
+                resolution=resolution,
+                reference_image_path=character.reference_image_path,
+                extra_reference_image_paths=related_reference_image_paths,
+                aspect_ratio=payload.image_aspect_ratio,
+            )
     except ImageGenerationError as generation_error:
         logger.warning("Image generation failed for current scene, trying fallback selection")
 
@@ -2078,22 +2891,445 @@ async def _resolve_segment_image(
         raise ImageGenerationError("image generation failed and no fallback scene/reference image available") from generation_error
 
     cache_entry_id: str | None = None
+    variant_source: str | Path = generated
+    shared_variant = False
     if payload.enable_scene_image_reuse:
         try:
             saved_entry = await run_in_threadpool(save_scene_image_cache_entry, descriptor, generated, prompt)
             cache_entry_id = str((saved_entry or {}).get("id") or "") or None
+            # Key the variant on the cached copy so later reuses of this entry hit the same variant.
+            cached_image_path = str((saved_entry or {}).get("image_path") or "")
+            # A near-duplicate merge points at an older entry's file; this segment still renders its own image.
+            if cached_image_path and not (saved_entry or {}).get("merged"):
+                variant_source = cached_image_path
+                shared_variant = True
         except Exception:
             logger.exception("Failed to persist generated image into scene cache")
 
+    try:
+        # Without a cache entry the source is this job's temp PNG, which no later job can hit:
+        # keep the variant next to the job instead of churning the shared store.
+        generated = await run_in_threadpool(
+            link_image_variant,
+            variant_source,
+            image_path,
+            resolution,
+            shared_variant,
+        )
+    except Exception:
+        logger.exception("Failed to prepare image variant for generated image: %s", generated)
+
     return generated, "generated", cache_entry_id
 
 
+def _estimate_segments_duration(segments: list[str], characters: list[CharacterSuggestion]) -> float:
+    total = 0.0
+    for segment_text in segments:
+        pieces = _build_tts_pieces(segment_text, characters, _NARRATOR_VOICE_ID)
+        # Clips are never shorter than one second, matching the render loop.
+        total += max(1.0, sum(predict_tts_duration(piece_text, piece_voice) for piece_text, piece_voice in pieces))
+    return total
+
+
+def _tts_pieces_signature(pieces: list[tuple[str, str]] | None) -> list[tuple[str, str]]:
+    return [(re.sub(r"[\W_]+", "", piece_text), piece_voice) for piece_text, piece_voice in pieces or []]
+
+
+class _TTSPrefetcher:
+    def __init__(
+        self,
+        segments: list[str],
+        characters: list[CharacterSuggestion],
+        prefetch_root: Path,
+        skip_indexes: set[int],
+        narrator_voice: str = _NARRATOR_VOICE_ID,
+    ) -> None:
+        self.segments = segments
+        self.characters = characters
+        self.prefetch_root = prefetch_root
+        self.skip_indexes = skip_indexes
+        self.narrator_voice = narrator_voice
+        self.tasks: dict[int, asyncio.Task] = {}
+        self.chapter_tasks: list[asyncio.Task] = []
+        self.pieces: dict[int, list[tuple[str, str]]] = {}
+        self.chapter_of: dict[int, list[int]] = {}
+        self.semaphore: asyncio.Semaphore | None = None
+        self.lookahead = max(1, int(settings.tts_prefetch_lookahead))
+        self.next_index = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def start(self) -> None:
+        budget = max(0, int(settings.tts_prefetch_concurrency))
+        if budget <= 0:
+            return
+        self.prefetch_root.mkdir(parents=True, exist_ok=True)
+        self.semaphore = asyncio.Semaphore(budget)
+        for index, segment_text in enumerate(self.segments):
+            if index in self.skip_indexes:
+                continue
+            self.pieces[index] = _build_tts_pieces(segment_text, self.characters, self.narrator_voice)
+        chapter_groups = self._chapter_groups()
+        for group in chapter_groups:
+            for index in group:
+                self.chapter_of[index] = group
+        if self.pieces:
+            logger.info(
+                "TTS prefetch started: segments=%s chapters=%s concurrency=%s lookahead=%s",
+                len(self.pieces),
+                len(chapter_groups),
+                budget,
+                self.lookahead,
+            )
+        self.advance(0)
+
+    def advance(self, index: int) -> None:
+        # Only the next `lookahead` segments get tasks, like the image prefetcher's window; the rest are
+        # queued as the render loop moves on instead of holding one task per segment for the whole job.
+        if self.semaphore is None:
+            return
+        horizon = min(len(self.segments), index + self.lookahead)
+        while self.next_index < horizon:
+            current = self.next_index
+            self.next_index += 1
+            if current not in self.pieces or current in self.tasks:
+                continue
+            group = self.chapter_of.get(current)
+            if group is None:
+                self.tasks[current] = asyncio.create_task(self._prefetch(current, self.segments[current], self.semaphore))
+                continue
+            # A chapter is one request, so all of its members are scheduled together.
+            chapter_task = asyncio.create_task(self._prefetch_chapter(group, self.semaphore))
+            self.chapter_tasks.append(chapter_task)
+            for member in group:
+                self.tasks[member] = asyncio.create_task(self._chapter_member(chapter_task, member, self.semaphore))
+
+    def _chapter_groups(self) -> list[list[int]]:
+        # Chapter mode needs provider word boundaries to slice audio, which only edge-tts returns.
+        if not settings.tts_chapter_mode or settings.tts_api_url or not shutil.which("ffmpeg"):
+            return []
+        max_chars = max(1, int(settings.tts_chapter_max_chars))
+        groups: list[list[int]] = []
+        current: list[int] = []
+        current_chars = 0
+        for index in range(len(self.segments)):
+            pieces = self.pieces.get(index)
+            narrator_only = bool(pieces) and len(pieces) == 1 and pieces[0][1] == self.narrator_voice
+            chars = len(self.segments[index].strip())
+            if not narrator_only or (current and current_chars + chars > max_chars):
+                if len(current) > 1:
+                    groups.append(current)
+                current, current_chars = [], 0
+            if narrator_only:
+                current.append(index)
+                current_chars += chars
+        if len(current) > 1:
+            groups.append(current)
+        return groups
+
+    async def _prefetch_chapter(self, indexes: list[int], semaphore: asyncio.Semaphore) -> dict[int, tuple[Path, float]]:
+        texts = [self.segments[index].strip() for index in indexes]
+        chapter_path = self.prefetch_root / f"chapter_{indexes[0]:04d}_{indexes[-1]:04d}.mp3"
+        async with semaphore:
+            audio_path, _ = await synthesize_tts(
+                text="\n".join(texts),
+                voice=self.narrator_voice,
+                output_path=chapter_path,
+                silent_fallback=False,
+            )
+        try:
+            words = (load_tts_timing(audio_path) or {}).get("words") or []
+            samples = await decode_audio_pcm(str(shutil.which("ffmpeg")), audio_path)
+            sliced = await run_in_threadpool(
+                split_pcm_by_text,
+                samples,
+                words,
+                texts,
+                self.narrator_voice,
+                [self.prefetch_root / f"segment_{index:04d}.wav" for index in indexes],
+            )
+        finally:
+            audio_path.unlink(missing_ok=True)
+            tts_timing_path(audio_path).unlink(missing_ok=True)
+        logger.info("TTS chapter synthesized: segments=%s-%s chars=%s", indexes[0] + 1, indexes[-1] + 1, sum(len(t) for t in texts))
+        return dict(zip(indexes, sliced))
+
+    async def _chapter_member(self, chapter_task: asyncio.Task, index: int, semaphore: asyncio.Semaphore) -> tuple[Path, float]:
+        try:
+            # Shield so one discarded member does not cancel the shared chapter request.
+            return (await asyncio.shield(chapter_task))[index]
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("TTS chapter synthesis failed, fallback to per-segment audio: segment=%s error=%s", index + 1, exc)
+            return await self._prefetch(index, self.segments[index], semaphore)
+
+    async def _prefetch(self, index: int, segment_text: str, semaphore: asyncio.Semaphore) -> tuple[Path, float]:
+        async with semaphore:
+            return await _synthesize_segment_tts(
+                text=segment_text,
+                characters=self.characters,
+                output_path=self.prefetch_root / f"segment_{index:04d}.mp3",
+                narrator_voice=self.narrator_voice,
+            )
+
+    async def resolve(
+        self,
+        index: int,
+        segment_text: str,
+        output_path: Path,
+        sentence_plan: list[dict] | None,
+    ) -> tuple[Path, float]:
+        task = self.tasks.pop(index, None)
+        prefetched_pieces = self.pieces.pop(index, None)
+        if task is not None:
+            planned_pieces = _build_tts_pieces(segment_text, self.characters, self.narrator_voice, sentence_plan=sentence_plan)
+            if _tts_pieces_signature(planned_pieces) == _tts_pieces_signature(prefetched_pieces):
+                try:
+                    prefetched_path, duration = await task
+                    target = output_path.with_suffix(prefetched_path.suffix)
+                    prefetched_path.replace(target)
+                    timing_path = tts_timing_path(target)
+                    timing_path.unlink(missing_ok=True)
+                    if tts_timing_path(prefetched_path).exists():
+                        tts_timing_path(prefetched_path).replace(timing_path)
+                    self.reused += 1
+                    return target, duration
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("TTS prefetch failed for segment %s, synthesize inline", index + 1)
+            else:
+                # The LLM speaker plan changed voices; unchanged pieces still come from the TTS cache.
+                task.cancel()
+                self.discarded += 1
+
+        return await _synthesize_segment_tts(
+            text=segment_text,
+            characters=self.characters,
+            output_path=output_path,
+            narrator_voice=self.narrator_voice,
+            sentence_plan=sentence_plan,
+        )
+
+    async def close(self) -> None:
+        pending = [*self.tasks.values(), *self.chapter_tasks]
+        self.tasks.clear()
+        self.chapter_tasks.clear()
+        self.pieces.clear()
+        self.semaphore = None
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        shutil.rmtree(self.prefetch_root, ignore_errors=True)
+        if self.reused or self.discarded:
+            logger.info("TTS prefetch finished: reused=%s discarded=%s", self.reused, self.discarded)
+
+
+class _ImagePrefetcher:
+    def __init__(
+        self,
+        job_id: str,
+        payload: GenerateVideoRequest,
+        segments: list[str],
+        characters: list[CharacterSuggestion],
+        story_world_context: str,
+        resolution: tuple[int, int],
+        prefetch_root: Path,
+        skip_indexes: set[int],
+        bundle_planner: _SegmentBundlePlanner | None = None,
+    ) -> None:
+        self.job_id = job_id
+        self.payload = payload
+        self.segments = segments
+        self.characters = characters
+        self.story_world_context = story_world_context
+        self.resolution = resolution
+        self.prefetch_root = prefetch_root
+        self.skip_indexes = skip_indexes
+        self.bundle_planner = bundle_planner
+        self.lookahead = max(0, int(settings.image_speculative_lookahead))
+        self.waste_budget = max(0, int(settings.image_speculative_waste_budget))
+        self.entries: dict[int, dict] = {}
+        self.discarded_tasks: list[asyncio.Task] = []
+        self.generated = 0
+        self.cache_hits = 0
+        self.reused = 0
+        self.wasted = 0
+
+    def schedule(self, index: int, character: CharacterSuggestion) -> None:
+        if self.lookahead <= 0 or job_store.is_cancelled(self.job_id):
+            return
+        previous: asyncio.Task | CharacterSuggestion = character
+        scheduled = 0
+        for next_index in range(index + 1, len(self.segments)):
+            if scheduled >= self.lookahead:
+                break
+            if next_index in self.skip_indexes:
+                continue
+            scheduled += 1
+            entry = self.entries.get(next_index)
+            if entry is None:
+                entry = {"previous": previous, "image_task": None}
+                entry["plan_task"] = asyncio.create_task(self._plan(next_index, entry))
+                self.entries[next_index] = entry
+            previous = entry["plan_task"]
+
+    async def _plan(self, index: int, entry: dict) -> dict:
+        previous = entry["previous"]
+        if isinstance(previous, asyncio.Task):
+            # Chain on the speculative plan of the segment before; take() drops the chain if it was wrong.
+            previous = (await previous)["character"]
+        entry["previous_character"] = previous
+        plan = await _plan_segment_image(
+            index=index,
+            segments=self.segments,
+            characters=self.characters,
+            previous_primary_character=previous,
+            model_id=self.payload.model_id,
+            story_world_context=self.story_world_context,
+            bundle_planner=self.bundle_planner,
+            early_image=self.early_image_starter(index, entry),
+        )
+        early_task = plan.pop("early_image", None)
+        if early_task is not None and entry.get("image_task") is early_task:
+            return plan
+        entry["image_task"] = asyncio.create_task(self._speculate_image(index, plan))
+        return plan
+
+    def early_image_starter(
+        self,
+        index: int,
+        entry: dict | None = None,
+    ) -> Callable[[dict, set[str]], asyncio.Task | None]:
+        def start(partial_plan: dict, fields: set[str]) -> asyncio.Task | None:
+            # Scene-cache matching compares metadata, so with reuse on wait until those fields have streamed in too.
+            if self.payload.enable_scene_image_reuse and not _SCENE_METADATA_FIELDS.issubset(fields):
+                return None
+            task = asyncio.create_task(self._speculate_image(index, partial_plan, enforce_budget=entry is not None))
+            if entry is not None:
+                entry["image_task"] = task
+            return task
+
+        return start
+
+    async def _speculate_image(self, index: int, plan: dict, enforce_budget: bool = True) -> dict | None:
+        if job_store.is_cancelled(self.job_id):
+            return None
+        if self.payload.enable_scene_image_reuse:
+            descriptor = build_scene_descriptor(
+                character=plan["character"],
+                segment_text=self.segments[index],
+                prompt=plan["prompt"],
+                metadata=plan["scene_metadata"],
+                related_reference_image_paths=plan["related_reference_paths"],
+            )
+            matched = await find_reusable_scene_image(
+                scene_descriptor=descriptor,
+                model_id=self.payload.model_id,
+                disallow_entry_ids=None,
+            )
+            if matched and matched.get("image_path"):
+                self.cache_hits += 1
+                return {"match": matched}
+
+        if (enforce_budget and self.wasted >= self.waste_budget) or job_store.is_cancelled(self.job_id):
+            return None
+        self.prefetch_root.mkdir(parents=True, exist_ok=True)
+        try:
+            generated = await use_reference_or_generate(
+                prompt=plan["prompt"],
+                # Inline early images get their own file so a cancelled speculative run for this index cannot overwrite them.
+                output_path=self.prefetch_root / (f"segment_{index:04d}.png" if enforce_budget else f"segment_{index:04d}_early.png"),
+                resolution=self.resolution,
+                reference_image_path=plan["character"].reference_image_path,
+                extra_reference_image_paths=plan["related_reference_paths"],
+                aspect_ratio=self.payload.image_aspect_ratio,
+            )
+        except ImageGenerationError as exc:
+            logger.warning("Speculative image generation failed for segment %s: %s", index + 1, exc)
+            return None
+        self.generated += 1
+        return {"image_path": str(generated)}
+
+    def _discard(self, index: int) -> None:
+        entry = self.entries.pop(index, None)
+        if entry is None:
+            return
+        image_task = entry.get("image_task")
+        if image_task is not None:
+            spent = not image_task.done() or (
+                not image_task.cancelled() and image_task.exception() is None and bool((image_task.result() or {}).get("image_path"))
+            )
+            if spent:
+                self.wasted += 1
+            image_task.cancel()
+            self.discarded_tasks.append(image_task)
+        entry["plan_task"].cancel()
+        self.discarded_tasks.append(entry["plan_task"])
+
+    async def take(
+        self,
+        index: int,
+        previous_primary_character: CharacterSuggestion | None,
+    ) -> tuple[dict | None, asyncio.Task | None]:
+        entry = self.entries.get(index)
+        if entry is None:
+            return None, None
+        plan: dict | None = None
+        try:
+            plan = await entry["plan_task"]
+        except asyncio.CancelledError:
+            if not entry["plan_task"].cancelled():
+                raise
+        except Exception:
+            logger.warning("Speculative plan failed for segment %s, plan inline", index + 1, exc_info=True)
+
+        if plan is None or entry.get("previous_character") is not previous_primary_character:
+            # Later entries chained on this plan's character, so they are stale too.
+            for stale_index in [item for item in self.entries if item >= index]:
+                self._discard(stale_index)
+            if self.wasted >= self.waste_budget and self.lookahead > 0:
+                logger.info("Speculative image budget exhausted for job %s: wasted=%s", self.job_id, self.wasted)
+            return None, None
+
+        self.entries.pop(index, None)
+        self.reused += 1
+        return plan, entry.get("image_task")
+
+    async def close(self) -> None:
+        pending: list[asyncio.Task] = list(self.discarded_tasks)
+        self.discarded_tasks.clear()
+        for entry in self.entries.values():
+            pending.append(entry["plan_task"])
+            if entry.get("image_task") is not None:
+                pending.append(entry["image_task"])
+        self.entries.clear()
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        shutil.rmtree(self.prefetch_root, ignore_errors=True)
+        if self.reused or self.wasted:
+            logger.info(
+                "Image speculation finished: plans_reused=%s generated=%s cache_hits=%s wasted=%s",
+                self.reused,
+                self.generated,
+                self.cache_hits,
+                self.wasted,
+            )
+
+
 async def run_video_job(job_id: str, payload: GenerateVideoRequest, base_url: str) -> None:
     temp_root = project_path(settings.temp_dir) / job_id
     clip_root = temp_root / "clips"
     clip_root.mkdir(parents=True, exist_ok=True)
     rendered_clip_count = 0
     total = 0
+    tts_prefetcher: _TTSPrefetcher | None = None
+    image_prefetcher: _ImagePrefetcher | None = None
+    bundle_planner: _SegmentBundlePlanner | None = None
     image_source_counts: dict[str, int] = {
         "cache": 0,
         "generated": 0,
@@ -2129,10 +3365,52 @@ async def run_video_job(job_id: str, payload: GenerateVideoRequest, base_url: st
         resolution = _parse_resolution(payload.resolution)
         characters = _sanitize_character_voices(list(payload.characters), narrator_voice=_NARRATOR_VOICE_ID)
         characters = _normalize_runtime_identity_flags(characters)
+        # Each checkpoint check is an ffprobe subprocess; keep the scan off the job loop.
+        checkpointed_indexes = await run_in_threadpool(_checkpointed_segment_indexes, clip_root, len(segments))
+        tts_prefetcher = _TTSPrefetcher(
+            segments=segments,
+            characters=characters,
+            prefetch_root=temp_root / "tts_prefetch",
+            skip_indexes=checkpointed_indexes,
+        )
+        tts_prefetcher.start()
+        estimated_duration = await run_in_threadpool(_estimate_segments_duration, segments, characters)
+        logger.info("Estimated video length for job %s: %.1fs over %s segments", job_id, estimated_duration, len(segments))
+        _update_job(
+            job_id,
+            base_url,
+            "running",
+            0.08,
+            "segment",
+            f"Segmented into {len(segments)} scenes (estimated length {int(round(estimated_duration))}s)",
+            current_segment=0,
+            total_segments=len(segments),
+            estimated_duration_seconds=estimated_duration,
+        )
         story_world_context = await summarize_story_world_context(payload.text, payload.model_id)
         if story_world_context:
             logger.info("Story world context summary: %s", story_world_context)
         total = len(segments)
+        bundle_planner = _SegmentBundlePlanner(
+            segments=segments,
+            characters=characters,
+            model_id=payload.model_id,
+            story_world_context=story_world_context,
+            skip_indexes=tts_prefetcher.skip_indexes,
+            store_path=temp_root / "segment_bundles.json",
+        )
+        bundle_planner.plan_all()
+        image_prefetcher = _ImagePrefetcher(
+            job_id=job_id,
+            payload=payload,
+            segments=segments,
+            characters=characters,
+            story_world_context=story_world_context,
+            resolution=resolution,
+            prefetch_root=temp_root / "image_prefetch",
+            skip_indexes=tts_prefetcher.skip_indexes,
+            bundle_planner=bundle_planner,
+        )
         no_repeat_window = max(0, int(payload.scene_reuse_no_repeat_window or 0))
         lookback_scenes = no_repeat_window
         recent_scene_entry_ids = deque(maxlen=lookback_scenes if lookback_scenes > 0 else None)
@@ -2153,6 +3431,8 @@ async def run_video_job(job_id: str, payload: GenerateVideoRequest, base_url: st
                 )
                 return
 
+            tts_prefetcher.advance(index)
+
             stage_start = 0.1
             stage_span = 0.75
             segment_progress = index / max(total, 1)
@@ -2169,40 +3449,6 @@ async def run_video_job(job_id: str, payload: GenerateVideoRequest, base_url: st
                 clip_count=rendered_clip_count,
             )
 
-            previous_segment_text = segments[index - 1] if index > 0 else ""
-            next_segment_text = segments[index + 1] if index + 1 < total else ""
-
-            default_character = _pick_character(
-                characters,
-                segment_text,
-                previous_character=previous_primary_character,
-                previous_segment_text=previous_segment_text,
-                next_segment_text=next_segment_text,
-            )
-            default_related_characters = _pick_related_characters(
-                characters,
-                segment_text,
-                default_character,
-                previous_segment_text=previous_segment_text,
-                next_segment_text=next_segment_text,
-            )
-            if default_character not in default_related_characters:
-                default_related_characters.insert(0, default_character)
-
-            default_primary_index = next(
-                (idx for idx, item in enumerate(characters) if item is default_character),
-                0,
-            )
-            default_related_indexes = [
-                idx
-                for idx, item in enumerate(characters)
-                if any(item is selected for selected in default_related_characters)
-            ]
-
-            character = default_character
-            related_characters = list(default_related_characters)
-            related_reference_paths = _collect_related_reference_paths(character, related_characters, limit=3)
-
             image_path = temp_root / f"segment_{index:04d}.png"
             audio_path = temp_root / f"segment_{index:04d}.mp3"
             clip_path = clip_root / f"clip_{index:04d}.mp4"
@@ -2232,56 +3478,27 @@ async def run_video_job(job_id: str, payload: GenerateVideoRequest, base_url: st
                     gc.collect()
                     continue
 
-            prompt_task = asyncio.create_task(
-                build_segment_image_bundle(
-                    character=character,
-                    segment_text=segment_text,
+            segment_plan, speculative_image = await image_prefetcher.take(index, previous_primary_character)
+            if segment_plan is None:
+                segment_plan = await _plan_segment_image(
+                    index=index,
+                    segments=segments,
+                    characters=characters,
+                    previous_primary_character=previous_primary_character,
                     model_id=payload.model_id,
-                    related_reference_image_paths=related_reference_paths,
                     story_world_context=story_world_context,
-                    previous_segment_text=previous_segment_text,
-                    next_segment_text=next_segment_text,
-                    character_candidates=characters,
-                    default_primary_index=default_primary_index,
-                    default_related_indexes=default_related_indexes,
-                )
-            )
-            prompt_bundle = await prompt_task
-            prompt = str(prompt_bundle.get("prompt") or "").strip()
-            scene_metadata = prompt_bundle.get("metadata") or {}
-            tts_sentence_plan = prompt_bundle.get("tts_sentence_plan") if isinstance(prompt_bundle.get("tts_sentence_plan"), list) else []
-
-            assignment = prompt_bundle.get("character_assignment") if isinstance(prompt_bundle.get("character_assignment"), dict) else {}
-            resolved_primary_index = _coerce_character_index(assignment.get("primary_index"), len(characters))
-            resolved_related_indexes = _coerce_character_indexes(assignment.get("related_indexes"), len(characters), limit=4)
-
-            if resolved_primary_index is None:
-                resolved_primary_index = default_primary_index
-            if resolved_primary_index is not None and resolved_primary_index not in resolved_related_indexes:
-                resolved_related_indexes.insert(0, resolved_primary_index)
-            if not resolved_related_indexes:
-                resolved_related_indexes = list(default_related_indexes)
-
-            selected_character, selected_related = _pick_characters_by_indexes(
-                characters,
-                resolved_primary_index,
-                resolved_related_indexes,
-            )
-            if selected_character is not None:
-                character = selected_character
-                related_characters = selected_related or [selected_character]
-                if character not in related_characters:
-                    related_characters.insert(0, character)
-                related_reference_paths = _collect_related_reference_paths(character, related_characters, limit=3)
-                logger.info(
-                    "Segment %s character assignment from prompt call: primary=%s confidence=%.2f reason=%s",
-                    index + 1,
-                    character.name,
-                    float(assignment.get("confidence") or 0.0),
-                    str(assignment.get("reason") or ""),
+                    bundle_planner=bundle_planner,
+                    early_image=image_prefetcher.early_image_starter(index),
                 )
+                speculative_image = segment_plan.pop("early_image", None)
+            character = segment_plan["character"]
+            related_reference_paths = segment_plan["related_reference_paths"]
+            prompt = segment_plan["prompt"]
+            scene_metadata = segment_plan["scene_metadata"]
+            tts_sentence_plan = segment_plan["tts_sentence_plan"]
 
             previous_primary_character = character
+            image_prefetcher.schedule(index, character)
 
             image_task = asyncio.create_task(
                 _resolve_segment_image(
@@ -2294,19 +3511,23 @@ async def run_video_job(job_id: str, payload: GenerateVideoRequest, base_url: st
                     image_path=image_path,
                     resolution=resolution,
                     recent_reuse_entry_ids=set(recent_scene_entry_ids),
+                    speculative_image=speculative_image,
                 )
             )
             audio_task = asyncio.create_task(
-                _synthesize_segment_tts(
-                    text=segment_text,
-                    characters=characters,
+                tts_prefetcher.resolve(
+                    index=index,
+                    segment_text=segment_text,
                     output_path=audio_path,
-                    narrator_voice=_NARRATOR_VOICE_ID,
                     sentence_plan=tts_sentence_plan,
                 )
             )
 
-            image_bundle, audio_bundle = await asyncio.gather(image_task, audio_task)
+            subtitle_task = asyncio.create_task(
+                run_in_threadpool(_rasterize_subtitle_units, segment_text, resolution, payload.subtitle_style)
+            )
+
+            image_bundle, audio_bundle, subtitle_layers = await asyncio.gather(image_task, audio_task, subtitle_task)
             image_result, image_source, reused_entry_id = image_bundle
             source_key_map = {
                 "cache": "cache",
@@ -2342,6 +3563,7 @@ async def run_video_job(job_id: str, payload: GenerateVideoRequest, base_url: st
                 payload.subtitle_style,
                 payload.camera_motion,
                 payload.render_mode,
+                subtitle_layers,
             )
             rendered_clip_count += 1
             _cleanup_segment_artifacts(temp_root, index)
@@ -2480,6 +3702,13 @@ async def run_video_job(job_id: str, payload: GenerateVideoRequest, base_url: st
             image_source_report=_build_image_source_report(image_source_counts, clip_image_sources),
         )
     finally:
+        if image_prefetcher is not None:
+            await image_prefetcher.close()
+        if bundle_planner is not None:
+            await bundle_planner.close()
+        if tts_prefetcher is not None:
+            await tts_prefetcher.close()
+        await close_http_clients()
         job_store.clear_cancel(job_id)
         gc.collect()
 
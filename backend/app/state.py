@@ -64,6 +64,7 @@ class JobStore:
                         clip_preview_urls_json TEXT NOT NULL DEFAULT '[]',
                         clip_image_sources_json TEXT NOT NULL DEFAULT '[]',
                         image_source_report_json TEXT,
+                        estimated_duration_seconds REAL,
                         created_at TEXT NOT NULL,
                         updated_at TEXT NOT NULL
                     )
@@ -71,6 +72,7 @@ class JobStore:
                 )
                 self._ensure_jobs_column(conn, "image_source_report_json", "TEXT")
                 self._ensure_jobs_column(conn, "clip_image_sources_json", "TEXT NOT NULL DEFAULT '[]'")
+                self._ensure_jobs_column(conn, "estimated_duration_seconds", "REAL")
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
                 conn.execute(
                     """
@@ -119,6 +121,14 @@ class JobStore:
                     image_source_report = parsed
             except Exception:
                 image_source_report = None
+
+        estimated_duration_seconds: float | None = None
+        raw_estimate = row["estimated_duration_seconds"] if "estimated_duration_seconds" in row.keys() else None
+        if raw_estimate is not None:
+            try:
+                estimated_duration_seconds = float(raw_estimate)
+            except Exception:
+                estimated_duration_seconds = None
         return JobStatus(
             job_id=str(row["job_id"]),
             status=str(row["status"]),
@@ -133,6 +143,7 @@ class JobStore:
             clip_preview_urls=previews,
             clip_image_sources=clip_image_sources,
             image_source_report=image_source_report,
+            estimated_duration_seconds=estimated_duration_seconds,
             created_at=str(row["created_at"]) if "created_at" in row.keys() and row["created_at"] else None,
             updated_at=str(row["updated_at"]) if "updated_at" in row.keys() and row["updated_at"] else None,
         )
@@ -148,8 +159,8 @@ class JobStore:
                         current_segment, total_segments,
                         output_video_url, output_video_path,
                         clip_count, clip_preview_urls_json, clip_image_sources_json, image_source_report_json,
-                        created_at, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        estimated_duration_seconds, created_at, updated_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     ON CONFLICT(job_id) DO UPDATE SET
                         status=excluded.status,
                         progress=excluded.progress,
@@ -163,6 +174,7 @@ class JobStore:
                         clip_preview_urls_json=excluded.clip_preview_urls_json,
                         clip_image_sources_json=excluded.clip_image_sources_json,
                         image_source_report_json=excluded.image_source_report_json,
+                        estimated_duration_seconds=excluded.estimated_duration_seconds,
                         updated_at=excluded.updated_at
                     """,
                     (
@@ -179,6 +191,7 @@ class JobStore:
                         "[]",
                         json.dumps(status.clip_image_sources, ensure_ascii=False) if status.clip_image_sources else "[]",
                         json.dumps(status.image_source_report, ensure_ascii=False) if status.image_source_report else None,
+                        status.estimated_duration_seconds,
                         now,
                         now,
                     ),
@@ -195,7 +208,7 @@ class JobStore:
                         current_segment, total_segments,
                         output_video_url, output_video_path,
                         clip_count, clip_preview_urls_json, clip_image_sources_json, image_source_report_json,
-                        created_at, updated_at
+                        estimated_duration_seconds, created_at, updated_at
                     FROM jobs
                     WHERE job_id = ?
                     """,
@@ -216,7 +229,7 @@ class JobStore:
                         current_segment, total_segments,
                         output_video_url, output_video_path,
                         clip_count, clip_preview_urls_json, clip_image_sources_json, image_source_report_json,
-                        created_at, updated_at
+                        estimated_duration_seconds, created_at, updated_at
                     FROM jobs
                     ORDER BY created_at DESC, updated_at DESC
                     LIMIT ?
@@ -0,0 +1,32 @@
+from app.services.video_service import _subtitle_timeline
+
+
+def _words(text: str, start: float, end: float) -> list[dict]:
+    step = (end - start) / len(text)
+    return [{"text": char, "start": start + step * i, "end": start + step * (i + 1)} for i, char in enumerate(text)]
+
+
+def test_partial_word_boundaries_fall_back_to_piece_offsets():
+    narrator = "他走进房间。"
+    dialogue = "你终于来了，我等了很久。"
+    offsets = [
+        {"text": narrator, "voice": "narrator", "start": 0.0, "end": 2.0},
+        {"text": dialogue, "voice": "dialogue", "start": 2.0, "end": 6.0},
+    ]
+    # Only the narrator piece (edge-tts) reported word boundaries.
+    timeline = _subtitle_timeline(narrator + dialogue, 6.0, offsets, _words("他走进房间", 0.0, 1.8))
+
+    assert [unit for unit, _, _ in timeline] == ["他走进房间。", "你终于来了，", "我等了很久。"]
+    assert abs(timeline[0][2] - 2.0) < 0.05
+    assert 3.0 < timeline[1][2] < 5.0
+    assert timeline[2] == ("我等了很久。", timeline[1][2], 6.0)
+
+
+def test_full_word_boundaries_are_used():
+    text = "他走进房间。她笑了。"
+    offsets = [{"text": text, "voice": "narrator", "start": 0.0, "end": 4.0}]
+    words = _words("他走进房间", 0.0, 1.0) + _words("她笑了", 3.0, 3.6)
+
+    timeline = _subtitle_timeline(text, 4.0, offsets, words)
+
+    assert abs(timeline[0][2] - 1.0) < 1e-6